@@ -0,0 +1,444 @@
+import os
+import re
+import json
+import time
+import random
+import socket
+import hashlib
+import datetime
+import threading
+import urllib.error
+import urllib.request
+
+# --- 모델 백엔드: 실행마다 한 번 만들어 모든 요청에서 재사용 ---
+DEFAULT_BACKEND = "gemini"
+DEFAULT_TIMEOUT = 600               # 초 - 요청 하나의 최대 대기 시간
+MAX_OUTPUT_TOKENS = 8192
+MAX_CONTINUATIONS = 2               # 응답이 출력 한도에서 잘리면 이어서 받는 최대 횟수
+CONTINUE_PROMPT = "앞의 답변이 출력 길이 한도에서 잘렸다. 이미 쓴 내용은 반복하지 말고, 잘린 지점부터 바로 이어서 써라."
+TRUNCATED_NOTE = "\n\n(응답이 출력 길이 한도에서 잘렸습니다)"
+BATCH_POLL_INTERVAL = 15            # 초 - 배치 작업 상태 확인 간격
+CONTEXT_CACHE_TTL = 3600            # 초 - 서버 쪽 컨텍스트 캐시 보관 시간 (실행이 끝나면 바로 지움)
+
+
+class BackendError(Exception):
+    """백엔드 설정이 잘못됐거나(키 없음, 패키지 없음 등) 지원하지 않는 기능을 요청했을 때 발생합니다."""
+
+
+class HTTPStatusError(Exception):
+    """HTTP 오류 응답. code 속성이 있어 runner 의 429/5xx 재시도 판단에 그대로 쓰입니다."""
+
+    def __init__(self, code, message):
+        super().__init__(f"HTTP {code}: {message}")
+        self.code = code
+
+
+class RequestCancelled(BackendError):
+    """진행 중인 요청이 취소되었습니다. (사용자 중지, 마감 시간 초과, 헤지 요청이 먼저 끝남)"""
+
+
+def check_cancelled(cancel):
+    if cancel is not None and cancel.is_set():
+        raise RequestCancelled("요청이 취소되었습니다.")
+
+
+class PromptContext:
+    """모든 요청에 똑같이 붙는 앞부분(고정 지시문 + 공유 프로젝트 컨텍스트).
+
+    cached 가 True 면 백엔드가 서버 쪽 캐시(또는 그에 해당하는 방식)로 올려 두어, 요청마다 다시 보내지 않습니다.
+    handle 은 백엔드별 객체(캐시된 모델 등)입니다.
+    """
+
+    def __init__(self, text, cached=False, handle=None):
+        self.text = text
+        self.cached = cached
+        self.handle = handle
+
+
+class ModelBackend:
+    """모든 백엔드의 공통 인터페이스.
+
+    generate() 는 여러 작업 스레드에서 동시에 호출됩니다. on_text 가 주어지면 응답을 조각마다 넘기고,
+    반환값은 항상 전체 텍스트입니다. 백엔드는 호출 한 번을 complete() 로 구현하고, 응답이 출력 한도에서 잘렸으면
+    generate() 가 이어서 받아 붙입니다. run_batch() 는 프롬프트 목록을 배치 작업 하나로 처리합니다.
+    context 는 create_context() 로 만든 공통 앞부분이며, 주면 prompt 에는 요청마다 다른 부분만 담습니다.
+    cancel(runner.CancelToken)이 주어지면 취소됐을 때 가능한 한 빨리 연결을 끊고 BackendError 를 냅니다.
+    """
+
+    name = "base"
+    supports_batch = False
+
+    def generate(self, prompt, on_text=None, timeout=DEFAULT_TIMEOUT, context=None, cancel=None, on_continue=None):
+        """응답이 출력 한도(MAX_OUTPUT_TOKENS)에서 잘리면 지금까지의 답을 대화에 넣고 MAX_CONTINUATIONS 번까지 이어서 받습니다.
+        이을 때마다 on_continue() 를 부르며, 그래도 잘려 있으면 끝에 TRUNCATED_NOTE 를 붙입니다."""
+        parts = []
+        for _ in range(MAX_CONTINUATIONS + 1):
+            text, truncated = self.complete(prompt, parts, on_text, timeout, context, cancel)
+            parts.append(text)
+            if not truncated:
+                return "".join(parts)
+            if len(parts) <= MAX_CONTINUATIONS and on_continue:
+                on_continue()
+        if on_text:
+            on_text(TRUNCATED_NOTE)
+        return "".join(parts) + TRUNCATED_NOTE
+
+    def complete(self, prompt, previous, on_text, timeout, context, cancel):
+        """모델 호출 한 번. previous 는 앞서 받은 (잘린) 답 조각 목록으로, 있으면 이어 쓰기 요청입니다. (텍스트, 잘렸는지)를 돌려줍니다."""
+        raise NotImplementedError
+
+    def count_tokens(self, text):
+        """제공자의 토큰 세기 API 로 센 입력 토큰 수. 지원하지 않으면 None (planner 가 로컬 추정으로 셈)."""
+        return None
+
+    def run_batch(self, prompts, stop_event=None, log=None, context=None):
+        """프롬프트 순서대로 결과 텍스트(실패한 항목은 Exception) 목록을 돌려줍니다."""
+        raise BackendError(f"'{self.name}' 백엔드는 배치 작업을 지원하지 않습니다.")
+
+    def create_context(self, text):
+        """공통 앞부분을 실행마다 한 번 준비합니다. 기본 구현은 캐시 없이 요청마다 앞에 붙여 보냅니다."""
+        return PromptContext(text)
+
+    def release_context(self, context):
+        """서버 쪽 캐시를 지웁니다. (실행이 끝날 때 호출)"""
+
+
+def abort_response(response):
+    """다른 스레드에서 읽고 있는 HTTP 응답을 끊습니다. close() 만으로는 대기 중인 recv 가 깨어나지 않아 소켓을 shutdown 합니다."""
+    sock = getattr(getattr(getattr(response, "fp", None), "raw", None), "_sock", None)
+    try:
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+        else:
+            response.close()
+    except OSError:
+        pass
+
+
+# --- Google Gemini ---
+def gemini_truncated(response):
+    """finish_reason 이 MAX_TOKENS 면 출력 한도에서 잘린 응답입니다."""
+    try:
+        reason = response.candidates[0].finish_reason
+    except (AttributeError, IndexError, ValueError):
+        return False
+    return getattr(reason, "name", str(reason)) == "MAX_TOKENS"
+
+
+class GeminiBackend(ModelBackend):
+    supports_batch = True
+
+    def __init__(self, model_name, api_key):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.api_key = api_key
+        self.model_name = model_name
+        self.name = model_name  # 캐시 키 호환을 위해 모델명 그대로 사용
+        self.model = genai.GenerativeModel(model_name)
+        self.generation_config = genai.types.GenerationConfig(max_output_tokens=MAX_OUTPUT_TOKENS)
+
+    def create_context(self, text):
+        # 컨텍스트 캐시(CachedContent)에 올리고 그 캐시를 쓰는 모델을 만듦. 모델이 캐시를 지원하지 않거나
+        # 최소 토큰 수에 못 미치면, 캐시 없이 system_instruction 으로만 분리함
+        try:
+            cache = self.genai.caching.CachedContent.create(
+                model=self.model_name, system_instruction=text, ttl=datetime.timedelta(seconds=CONTEXT_CACHE_TTL))
+            return PromptContext(text, cached=True, handle=(cache, self.genai.GenerativeModel.from_cached_content(cache)))
+        except Exception:
+            return PromptContext(text, handle=(None, self.genai.GenerativeModel(self.model_name, system_instruction=text)))
+
+    def release_context(self, context):
+        cache = context.handle[0] if context.handle else None
+        if cache is not None:
+            try:
+                cache.delete()
+            except Exception:
+                pass    # 지우지 못해도 TTL 이 지나면 서버에서 사라짐
+
+    def count_tokens(self, text):
+        return self.model.count_tokens(text).total_tokens
+
+    def complete(self, prompt, previous, on_text, timeout, context, cancel):
+        model = context.handle[1] if context is not None else self.model
+        contents = prompt
+        if previous:
+            contents = [{"role": "user", "parts": [prompt]}, {"role": "model", "parts": ["".join(previous)]},
+                        {"role": "user", "parts": [CONTINUE_PROMPT]}]
+        response = model.generate_content(contents, stream=on_text is not None,
+                                          generation_config=self.generation_config,
+                                          request_options={"timeout": timeout})
+        # SDK 에 호출을 끊는 방법이 없어, 스트리밍이면 조각 사이에서 멈추고 아니면 응답이 오면 버림
+        check_cancelled(cancel)
+        if on_text is None:
+            return response.text, gemini_truncated(response)
+        parts = []
+        for chunk in response:
+            check_cancelled(cancel)
+            try:
+                text = chunk.text
+            except ValueError:
+                continue  # 안전 필터 등으로 텍스트가 없는 조각
+            if text:
+                parts.append(text)
+                on_text(text)
+        # 스트리밍 응답도 다 받고 나면 candidates 에 합쳐진 마지막 상태(finish_reason)가 남음
+        return "".join(parts), gemini_truncated(response)
+
+    def run_batch(self, prompts, stop_event=None, log=None, context=None):
+        # 배치 API 는 새 SDK(google-genai)에만 있어, 설치된 경우에만 사용
+        try:
+            from google import genai as genai_sdk
+        except ImportError:
+            raise BackendError("Gemini 배치 작업에는 google-genai 패키지가 필요합니다. (pip install google-genai)")
+        client = genai_sdk.Client(api_key=self.api_key)
+        config = {"max_output_tokens": MAX_OUTPUT_TOKENS}
+        if context is not None:
+            config["system_instruction"] = {"parts": [{"text": context.text}]}
+        job = client.batches.create(
+            model=self.model_name,
+            src=[{"contents": [{"role": "user", "parts": [{"text": prompt}]}], "config": config} for prompt in prompts],
+        )
+        while True:
+            job = client.batches.get(name=job.name)
+            state = getattr(job.state, "name", str(job.state))
+            if state in ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"):
+                break
+            if log:
+                log(f"📦 배치 작업 대기 중... ({state})")
+            if stop_event is not None and stop_event.wait(BATCH_POLL_INTERVAL):
+                client.batches.cancel(name=job.name)
+                raise BackendError("배치 작업이 중지되었습니다.")
+            if stop_event is None:
+                time.sleep(BATCH_POLL_INTERVAL)
+        if state != "JOB_STATE_SUCCEEDED":
+            raise BackendError(f"배치 작업 실패: {state}")
+        results = []
+        for item in job.dest.inlined_responses:
+            if getattr(item, "error", None):
+                results.append(BackendError(str(item.error)))
+            else:
+                results.append(item.response.text)
+        return results
+
+
+# --- OpenAI 호환 HTTP 엔드포인트 (vLLM, Ollama, LM Studio, 사내 게이트웨이 등) ---
+class OpenAICompatibleBackend(ModelBackend):
+    supports_batch = True
+
+    def __init__(self, model_name, base_url, api_key=None):
+        self.model_name = model_name
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.name = f"openai:{model_name}"
+
+    def _request(self, method, path, body=None, timeout=DEFAULT_TIMEOUT, content_type="application/json"):
+        headers = {"Content-Type": content_type}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode("utf-8")
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            return urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            raise HTTPStatusError(e.code, e.read().decode("utf-8", errors="replace")[:500])
+
+    def create_context(self, text):
+        # 공통 앞부분을 항상 같은 system 메시지로 보내면, 서버의 자동 접두사 캐시(OpenAI prompt caching,
+        # vLLM prefix caching 등)가 요청마다 그 부분을 다시 계산하지 않음
+        return PromptContext(text, cached=True)
+
+    def _chat_body(self, prompt, stream=False, context=None, previous=None):
+        messages = [{"role": "user", "content": prompt}]
+        if previous:
+            messages += [{"role": "assistant", "content": "".join(previous)}, {"role": "user", "content": CONTINUE_PROMPT}]
+        if context is not None:
+            messages.insert(0, {"role": "system", "content": context.text})
+        return {"model": self.model_name, "max_tokens": MAX_OUTPUT_TOKENS, "stream": stream, "messages": messages}
+
+    def complete(self, prompt, previous, on_text, timeout, context, cancel):
+        body = self._chat_body(prompt, on_text is not None, context, previous)
+        check_cancelled(cancel)
+        with self._request("POST", "/chat/completions", body, timeout) as response:
+            if cancel is not None:
+                cancel.on_cancel(lambda: abort_response(response))
+            if on_text is None:
+                choice = json.loads(response.read())["choices"][0]
+                return choice["message"]["content"] or "", choice.get("finish_reason") == "length"
+            parts = []
+            truncated = False
+            for raw_line in response:
+                check_cancelled(cancel)
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choice = json.loads(data)["choices"][0]
+                truncated = truncated or choice.get("finish_reason") == "length"
+                text = choice.get("delta", {}).get("content")
+                if text:
+                    parts.append(text)
+                    on_text(text)
+            return "".join(parts), truncated
+
+    def run_batch(self, prompts, stop_event=None, log=None, context=None):
+        """OpenAI Batch API (/files + /batches) 로 한 번에 제출하고 완료될 때까지 기다립니다."""
+        lines = [json.dumps({"custom_id": str(i), "method": "POST", "url": "/v1/chat/completions",
+                             "body": self._chat_body(prompt, context=context)}, ensure_ascii=False)
+                 for i, prompt in enumerate(prompts)]
+        boundary = "----analyzer" + hashlib.sha1(os.urandom(8)).hexdigest()
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"purpose\"\r\n\r\nbatch\r\n"
+                f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"batch.jsonl\"\r\n"
+                f"Content-Type: application/jsonl\r\n\r\n" + "\n".join(lines) + f"\r\n--{boundary}--\r\n").encode("utf-8")
+        with self._request("POST", "/files", body, content_type=f"multipart/form-data; boundary={boundary}") as response:
+            file_id = json.loads(response.read())["id"]
+        with self._request("POST", "/batches", {"input_file_id": file_id, "endpoint": "/v1/chat/completions",
+                                                "completion_window": "24h"}) as response:
+            batch = json.loads(response.read())
+        while batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+            if log:
+                log(f"📦 배치 작업 대기 중... ({batch['status']})")
+            if stop_event is not None and stop_event.wait(BATCH_POLL_INTERVAL):
+                self._request("POST", f"/batches/{batch['id']}/cancel").close()
+                raise BackendError("배치 작업이 중지되었습니다.")
+            if stop_event is None:
+                time.sleep(BATCH_POLL_INTERVAL)
+            with self._request("GET", f"/batches/{batch['id']}") as response:
+                batch = json.loads(response.read())
+        if batch["status"] != "completed" or not batch.get("output_file_id"):
+            raise BackendError(f"배치 작업 실패: {batch['status']}")
+        results = [BackendError("배치 결과 없음")] * len(prompts)
+        with self._request("GET", f"/files/{batch['output_file_id']}/content") as response:
+            for raw_line in response:
+                if not raw_line.strip():
+                    continue
+                item = json.loads(raw_line)
+                index = int(item["custom_id"])
+                if item.get("error"):
+                    results[index] = BackendError(str(item["error"]))
+                else:
+                    results[index] = item["response"]["body"]["choices"][0]["message"]["content"] or ""
+        return results
+
+
+# --- 오프라인 스텁: 네트워크 없이 테스트/벤치마크용 결정적(deterministic) 응답 ---
+class StubBackend(ModelBackend):
+    """같은 프롬프트에는 항상 같은 응답을 돌려줍니다. latency 로 모델 지연을, max_output_chars 로 출력 한도에서
+    잘리는 응답(이어 받기)을 흉내낼 수 있습니다."""
+
+    supports_batch = True
+    UNIT_MARKER = re.compile(r"=== 기능 유닛: (.+?) ===")
+    FILE_MARKER = re.compile(r"--- 파일: (.+?) ---")
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=0, max_output_chars=0):
+        self.latency = latency
+        self.max_output_chars = max_output_chars
+        self.jitter = jitter
+        self.seed = seed
+        self.name = "stub"
+        self.request_count = 0
+        self.contexts = {}      # 로컬 컨텍스트 캐시: id -> 공통 앞부분 (서버 쪽 캐시 흉내)
+        self.lock = threading.Lock()
+
+    def _answer_for(self, code, label):
+        digest = hashlib.sha256(f"{self.seed}:{label}:{code}".encode("utf-8")).digest()
+        severity = ("[심각]", "[경고]", "[권장]", "[권장]")[digest[0] % 4]
+        files = self.FILE_MARKER.findall(code) or ["(알 수 없음)"]
+        return f"{severity} {files[digest[1] % len(files)]}: 스텁 분석 결과 #{digest[2:6].hex()}"
+
+    def _respond(self, prompt):
+        # 묶음 요청이면 유닛별 코드 블록마다 따로 답해 demultiplex 경로까지 그대로 거치게 함
+        parts = self.UNIT_MARKER.split(prompt)
+        if len(parts) > 1:
+            return "\n\n".join(f"### 유닛: {name}\n{self._answer_for(code, name)}"
+                                for name, code in zip(parts[1::2], parts[2::2]))
+        return self._answer_for(prompt, "")
+
+    def create_context(self, text):
+        with self.lock:
+            context_id = len(self.contexts) + 1
+            self.contexts[context_id] = text
+        return PromptContext(text, cached=True, handle=context_id)
+
+    def release_context(self, context):
+        with self.lock:
+            self.contexts.pop(context.handle, None)
+
+    def complete(self, prompt, previous, on_text, timeout, context, cancel):
+        if context is not None and context.handle not in self.contexts:
+            raise BackendError("만료된 컨텍스트 캐시입니다.")
+        with self.lock:
+            self.request_count += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            if cancel is not None:
+                cancel.wait(delay)
+            else:
+                time.sleep(delay)
+        check_cancelled(cancel)
+        text = self._respond(prompt)
+        start = len("".join(previous))
+        end = start + self.max_output_chars if self.max_output_chars else len(text)
+        text, truncated = text[start:end], end < len(text)
+        if on_text:
+            for piece in re.findall(r"\s*\S+\s*", text):
+                check_cancelled(cancel)
+                on_text(piece)
+        return text, truncated
+
+    def run_batch(self, prompts, stop_event=None, log=None, context=None):
+        with self.lock:
+            self.request_count += 1
+        return [self._respond(prompt) for prompt in prompts]
+
+
+def load_env():
+    """.env 를 환경 변수로 읽어 들입니다. python-dotenv 는 처음 쓸 때 불러오며, 없으면(오프라인 스텁만 쓸 때) 건너뜁니다."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def preload_backend_modules(backend=None):
+    """설정된 백엔드의 SDK 모듈만 미리 불러 둡니다. 키 확인이나 클라이언트 생성은 하지 않습니다. (GUI 백그라운드 예열용)"""
+    load_env()
+    backend = (backend or os.getenv("ANALYZER_BACKEND", DEFAULT_BACKEND)).strip().lower()
+    if backend == "gemini":
+        try:
+            import google.generativeai  # noqa: F401
+        except ImportError:
+            pass
+
+
+def create_backend(backend=None, model_name=None):
+    """ANALYZER_BACKEND(gemini | openai | stub) 설정에 맞는 백엔드를 만듭니다. (실행마다 한 번만 호출)"""
+    load_env()
+    backend = (backend or os.getenv("ANALYZER_BACKEND", DEFAULT_BACKEND)).strip().lower()
+    if backend == "gemini":
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if not api_key:
+            raise BackendError("GOOGLE_API_KEY를 찾을 수 없습니다. (.env 파일 또는 환경 변수를 확인하세요)")
+        try:
+            return GeminiBackend(model_name or "gemini-2.5-pro", api_key)
+        except ImportError:
+            raise BackendError("google-generativeai 패키지가 설치되어 있지 않습니다.")
+    if backend == "openai":
+        base_url = os.getenv("ANALYZER_OPENAI_BASE_URL", "http://localhost:8000/v1")
+        return OpenAICompatibleBackend(model_name or os.getenv("ANALYZER_OPENAI_MODEL", "local-model"),
+                                       base_url, os.getenv("ANALYZER_OPENAI_API_KEY"))
+    if backend == "stub":
+        try:
+            latency = float(os.getenv("ANALYZER_STUB_LATENCY", "0"))
+        except ValueError:
+            latency = 0.0
+        try:
+            max_output_chars = int(os.getenv("ANALYZER_STUB_MAX_OUTPUT_CHARS", "0"))
+        except ValueError:
+            max_output_chars = 0
+        return StubBackend(latency=latency, max_output_chars=max_output_chars)
+    raise BackendError(f"알 수 없는 백엔드: '{backend}' (gemini, openai, stub 중 하나)")
@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+import threading
+import tracemalloc
+
+from backends import StubBackend
+from engine import DEFAULT_EXTENSIONS, find_project_files, group_files_by_feature, run_folder_analysis
+from packing import build_analysis_requests, build_request_code, estimate_tokens
+from startup import STARTUP_PROBE_ENV, STARTUP_PROBE_MARK
+
+# --- 벤치마크: 가짜 Spring 프로젝트를 만들어 전체 파이프라인을 지연 주입 스텁 모델로 돌려봄 ---
+# 예) python benchmark.py --features 500 --latency 0.05 --workers 8
+#     python benchmark.py --features 2000 --json bench.json --baseline bench_before.json
+#     python benchmark.py --startup --json startup.json        (GUI 모듈 import 시간과 첫 창이 뜨기까지의 시간)
+#     python benchmark.py --startup dist/gui_analyzer/gui_analyzer.exe   (PyInstaller 빌드의 첫 창까지 시간)
+DEFAULT_CORPUS = {
+    "features": 200,        # 기능(도메인) 수 - 기능마다 Controller/Service/Mapper 한 벌
+    "jsp_per_feature": 2,
+    "js_per_feature": 1,
+    "noise_files": 200,     # 분석 대상이 아닌 파일 (.class, .png 등) - 스캐너 부하용
+    "methods": 12,          # Java 파일 하나당 메서드 수 (파일 크기 조절)
+    "statements": 6,        # Mapper.xml 하나당 SQL 문 수
+}
+REGRESSION_THRESHOLD = 0.15  # 기준 결과보다 15% 넘게 느려지면 회귀로 표시
+HERE = os.path.dirname(os.path.abspath(__file__))
+STARTUP_SCRIPTS = ("gui_analyzer.py", "hybrid_analyzer.py")
+STARTUP_TIMEOUT = 120        # 초 - 창이 이 안에 뜨지 않으면 측정 실패로 봄
+
+
+# --- 1. 가짜 프로젝트(코퍼스) 생성 ---
+def java_source(package, class_name, kind, methods, rng):
+    lines = [f"package {package};", "", "import java.util.*;", "",
+             f"@{'RestController' if kind == 'Controller' else 'Service'}",
+             f"public class {class_name} {{", ""]
+    for m in range(methods):
+        lines += [f"    public List<Map<String, Object>> find{class_name}{m}(Map<String, Object> param) {{",
+                  f"        List<Map<String, Object>> rows = new ArrayList<>();"]
+        for s in range(rng.randint(3, 12)):
+            lines.append(f"        rows.add(Collections.singletonMap(\"k{s}\", param.get(\"v{s}\")));")
+        lines += ["        return rows;", "    }", ""]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def mapper_source(feature, statements, rng):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', f'<mapper namespace="{feature}Mapper">']
+    for s in range(statements):
+        columns = ", ".join(f"COL_{c}" for c in range(rng.randint(3, 15)))
+        lines += [f'    <select id="select{feature}{s}" resultType="map">',
+                  f"        SELECT {columns} FROM TB_{feature.upper()} WHERE ID = #{{id}}", "    </select>"]
+    lines.append("</mapper>")
+    return "\n".join(lines) + "\n"
+
+
+def jsp_source(feature, index):
+    return (f'<%@ page contentType="text/html; charset=UTF-8" %>\n<html><body>\n'
+            f"<h1>{feature} 화면 {index}</h1>\n<% String id = request.getParameter(\"id\"); %>\n"
+            f"<div><%= id %></div>\n</body></html>\n")
+
+
+def js_source(feature, index):
+    return (f"function load{feature}{index}(id) {{\n"
+            f"    return fetch('/{feature.lower()}/' + id).then(function (r) {{ return r.json(); }});\n}}\n")
+
+
+def generate_corpus(root, features=200, jsp_per_feature=2, js_per_feature=1, noise_files=200,
+                    methods=12, statements=6, seed=42):
+    """root 아래에 Controller/Service/Mapper/JSP/JS 로 이뤄진 Spring 스타일 폴더 구조를 만듭니다."""
+    rng = random.Random(seed)
+    java_root = os.path.join(root, "src", "main", "java", "com", "example")
+    mapper_root = os.path.join(root, "src", "main", "resources", "mapper")
+    view_root = os.path.join(root, "src", "main", "webapp", "WEB-INF", "views")
+    js_root = os.path.join(root, "src", "main", "webapp", "static", "js")
+    noise_root = os.path.join(root, "target", "classes")
+    for path in (mapper_root, js_root, noise_root):
+        os.makedirs(path, exist_ok=True)
+
+    def write(path, text):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    for n in range(features):
+        feature = f"Feature{n:05d}"
+        package_dir = os.path.join(java_root, feature.lower())
+        os.makedirs(package_dir, exist_ok=True)
+        for kind in ("Controller", "Service"):
+            write(os.path.join(package_dir, f"{feature}{kind}.java"),
+                  java_source(f"com.example.{feature.lower()}", f"{feature}{kind}", kind, methods, rng))
+        write(os.path.join(mapper_root, f"{feature}Mapper.xml"), mapper_source(feature, statements, rng))
+        view_dir = os.path.join(view_root, feature.lower())
+        os.makedirs(view_dir, exist_ok=True)
+        for i in range(jsp_per_feature):
+            # JSP/JS 는 '기능명' 과 같은 파일명이 아니면 별도 유닛이 되므로, 첫 번째만 기능명과 맞춤
+            write(os.path.join(view_dir, f"{feature}.jsp" if i == 0 else f"{feature}View{i}.jsp"), jsp_source(feature, i))
+        for i in range(js_per_feature):
+            write(os.path.join(js_root, f"{feature}.js" if i == 0 else f"{feature}Script{i}.js"), js_source(feature, i))
+    for n in range(noise_files):
+        write(os.path.join(noise_root, f"Noise{n:05d}.class"), "\0" * rng.randint(64, 512))
+    return root
+
+
+# --- 2. 측정 ---
+class CountingBackend:
+    """다른 백엔드를 감싸 요청 수와 보낸 토큰 수(추정)를 셉니다."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.supports_batch = backend.supports_batch
+        self.requests = 0
+        self.tokens_sent = 0
+        self.context_tokens = 0     # 캐시되지 않은 공통 지시문 - 요청마다 함께 보냄
+        self.lock = threading.Lock()
+
+    def _count(self, prompts):
+        tokens = sum(estimate_tokens(prompt) + self.context_tokens for prompt in prompts)
+        with self.lock:
+            self.requests += 1
+            self.tokens_sent += tokens
+
+    def create_context(self, text):
+        # 서버 쪽에 캐시되는 공통 지시문은 올릴 때 한 번만 보낸 것으로 셈
+        context = self.backend.create_context(text)
+        with self.lock:
+            if context.cached:
+                self.tokens_sent += estimate_tokens(text)
+            else:
+                self.context_tokens = estimate_tokens(text)
+        return context
+
+    def release_context(self, context):
+        self.backend.release_context(context)
+
+    def generate(self, prompt, on_text=None, **kwargs):
+        self._count([prompt])
+        return self.backend.generate(prompt, on_text=on_text, **kwargs)
+
+    def run_batch(self, prompts, stop_event=None, log=None, **kwargs):
+        self._count(prompts)
+        return self.backend.run_batch(prompts, stop_event=stop_event, log=log, **kwargs)
+
+
+def timed(stages, name, func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    stages[name] = time.perf_counter() - started
+    return result
+
+
+def run_benchmark(corpus_dir, latency=0.0, workers=None, batch=False):
+    """단계별(스캔/그룹핑/요청 구성/프롬프트 조립) 시간과 전체 파이프라인 시간을 잽니다."""
+    stages = {}
+    files = timed(stages, "scan", lambda: list(find_project_files(corpus_dir, DEFAULT_EXTENSIONS)))
+    units = timed(stages, "group", group_files_by_feature, files)
+    requests = timed(stages, "plan_requests", build_analysis_requests, units)
+    prompt_chars = timed(stages, "assemble_prompts", lambda: sum(len(build_request_code(r)) for r in requests))
+
+    backend = CountingBackend(StubBackend(latency=latency))
+    work_dir = tempfile.mkdtemp(prefix="analyzer-bench-")
+    cwd = os.getcwd()
+    tracemalloc.start()
+    try:
+        os.chdir(work_dir)  # manifest/저널(.analysis_cache)이 실제 프로젝트를 건드리지 않도록
+        started = time.perf_counter()
+        summary = run_folder_analysis(corpus_dir, lambda message: None, report_path="report.md",
+                                      backend=backend, batch=batch, max_workers=workers,
+                                      requests_per_minute=10 ** 9, use_cache=False)
+        stages["pipeline"] = time.perf_counter() - started
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "files": len(files),
+        "units": len(units),
+        "requests_planned": len(requests),
+        "prompt_chars": prompt_chars,
+        "requests_issued": backend.requests,
+        "tokens_sent": backend.tokens_sent,
+        "completed": summary["completed"],
+        "failed": summary["failed"],
+        "peak_memory_mb": round(peak_memory / 1024 / 1024, 2),
+        "stages": {name: round(seconds, 4) for name, seconds in stages.items()},
+    }
+
+
+# --- 시작 시간 (GUI 첫 창) ---
+def measure_import(module):
+    """새 인터프리터에서 모듈 하나를 import 하는 데 걸린 초. 창을 띄우지 않으므로 디스플레이 없이도 잴 수 있습니다."""
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    try:
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=HERE,
+                                   timeout=STARTUP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return None
+    if completed.returncode:
+        return None     # GUI 패키지(ttkbootstrap 등)가 없는 환경
+    return float(completed.stdout.split()[-1])
+
+
+def measure_first_window(command):
+    """command 를 ANALYZER_STARTUP_PROBE 로 실행해 프로세스 시작부터 첫 창이 그려질 때까지의 초를 잽니다.
+    창을 띄우지 못하면(디스플레이 없음 등) None."""
+    env = dict(os.environ, **{STARTUP_PROBE_ENV: "1"})
+    started = time.time()
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, cwd=HERE, env=env, timeout=STARTUP_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    for line in completed.stdout.splitlines():
+        if line.startswith(STARTUP_PROBE_MARK):
+            return float(line.split()[1]) - started
+    return None
+
+
+def run_startup_benchmark(targets):
+    """.py 면 모듈 import 시간과 python 으로 실행했을 때의 첫 창 시간을, 그 밖(빌드된 실행 파일)은 첫 창 시간만 잽니다."""
+    stages = {}
+    for target in targets:
+        name = os.path.basename(target)
+        if target.endswith(".py"):
+            seconds = measure_import(os.path.splitext(name)[0])
+            if seconds is not None:
+                stages[f"import {name}"] = seconds
+            command = [sys.executable, os.path.abspath(target)]
+        else:
+            command = [os.path.abspath(target)]
+        seconds = measure_first_window(command)
+        if seconds is not None:
+            stages[f"first_window {name}"] = seconds
+    return {"stages": stages}
+
+
+def best_of(results):
+    """여러 번 돌린 결과 중 단계별 최솟값을 씁니다. (다른 프로세스 영향으로 생기는 잡음 제거)"""
+    best = dict(results[0])
+    best["stages"] = {name: min(r["stages"][name] for r in results) for name in results[0]["stages"]}
+    best["peak_memory_mb"] = min(r["peak_memory_mb"] for r in results)
+    return best
+
+
+def compare_with_baseline(result, baseline, threshold=REGRESSION_THRESHOLD):
+    regressions = []
+    for name, seconds in result["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before and seconds > before * (1 + threshold) and seconds - before > 0.005:
+            regressions.append(f"{name}: {before:.4f}s -> {seconds:.4f}s (+{(seconds / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_result(result):
+    print(f"파일 {result['files']}개 / 기능 유닛 {result['units']}개 / 요청 {result['requests_issued']}건 "
+          f"(계획 {result['requests_planned']}건) / 보낸 토큰 약 {result['tokens_sent']:,}")
+    for name, seconds in result["stages"].items():
+        print(f"  {name:<18} {seconds * 1000:10.1f} ms")
+    print(f"  {'peak memory':<18} {result['peak_memory_mb']:10.2f} MB")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="AI 코드 분석기 파이프라인 벤치마크 (모델 호출 없음)")
+    for name, default in DEFAULT_CORPUS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default,
+                            help="가짜 프로젝트 설정 (기본값: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--corpus", help="이 폴더를 코퍼스로 사용 (없으면 만들고, 실행 후 지우지 않음)")
+    parser.add_argument("--latency", type=float, default=0.0, help="스텁 모델의 요청당 지연(초)")
+    parser.add_argument("--workers", type=int, help="동시 요청 수")
+    parser.add_argument("--batch", action="store_true", help="배치 모드로 실행")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 - 단계별 최솟값을 보고")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON - 느려진 단계가 있으면 종료 코드 1")
+    parser.add_argument("--startup", nargs="*", metavar="TARGET",
+                        help="파이프라인 대신 GUI 시작 시간을 잼. 대상을 주지 않으면 gui_analyzer.py / hybrid_analyzer.py, "
+                             "빌드된 실행 파일 경로도 줄 수 있음")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.startup is not None:
+        return startup_main(args)
+    corpus_options = {name: getattr(args, name) for name in DEFAULT_CORPUS}
+    corpus_dir = args.corpus or tempfile.mkdtemp(prefix="analyzer-corpus-")
+    try:
+        if not os.path.isdir(corpus_dir) or not os.listdir(corpus_dir):
+            print(f"가짜 프로젝트 생성 중: {corpus_dir}")
+            generate_corpus(corpus_dir, seed=args.seed, **corpus_options)
+        results = [run_benchmark(os.path.abspath(corpus_dir), args.latency, args.workers, args.batch)
+                   for _ in range(max(1, args.repeat))]
+    finally:
+        if not args.corpus:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    result = best_of(results)
+    result["corpus"] = dict(corpus_options, seed=args.seed)
+    result["latency"] = args.latency
+    print_result(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    return check_baseline(result, args.baseline)
+
+
+def startup_main(args):
+    targets = args.startup or [os.path.join(HERE, name) for name in STARTUP_SCRIPTS]
+    results = [run_startup_benchmark(targets) for _ in range(max(1, args.repeat))]
+    names = [name for name in results[0]["stages"] if all(name in r["stages"] for r in results)]
+    result = {"targets": targets, "stages": {name: round(min(r["stages"][name] for r in results), 4) for name in names}}
+    if not result["stages"]:
+        print("시작 시간을 재지 못했습니다. (GUI 패키지나 디스플레이가 없는 환경인지 확인하세요)")
+    for name, seconds in result["stages"].items():
+        print(f"  {name:<32} {seconds * 1000:10.1f} ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return check_baseline(result, args.baseline)
+
+
+def check_baseline(result, baseline_path):
+    if not baseline_path:
+        return 0
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        regressions = compare_with_baseline(result, json.load(f))
+    for line in regressions:
+        print(f"⚠️ 느려짐 - {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import os
+import re
+import threading
+
+from packing import demultiplex_response
+
+# --- 2단계 모델 캐스케이드: 빠르고 싼 모델이 먼저 위험도를 매기고, 위험한 요청만 비싼 모델로 정밀 분석 ---
+DEFAULT_THRESHOLD = 6               # 1차 위험도(0~10)가 이 값 이상이면 정밀 분석
+DEFAULT_TRIAGE_MODELS = {"gemini": "gemini-2.5-flash"}     # 백엔드별 기본 1차 모델 (없으면 백엔드 기본 모델)
+# 100만 토큰당 (입력, 출력) USD - 절약 비용 추정용. ANALYZER_DEEP_PRICE / ANALYZER_TRIAGE_PRICE="1.25,10" 으로 덮어씀
+MODEL_PRICES = {
+    "gemini-2.5-pro": (1.25, 10.0),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+TAG_SCORES = {"심각": 10, "경고": 5, "권장": 1}   # 위험도 줄이 없을 때 태그로 대신 매기는 점수
+
+TRIAGE_INSTRUCTIONS = """ 이번 분석은 1차 선별이다. 응답의 맨 첫 줄에는 정밀 분석이 필요한 정도를 `위험도: N/10` 형식(0=문제 없음, 10=즉시 장애)으로만 써라. 확신이 없으면 점수를 높게 매겨라."""
+SCORE_LINE_PATTERN = re.compile(r"^\s*\**\s*위험도\s*[:：]\s*(\d+(?:\.\d+)?)\s*(?:/\s*10)?\s*\**\s*$", re.MULTILINE)
+TAG_PATTERN = re.compile(r"\[(심각|경고|권장)\]")
+
+TIER_TRIAGE = "triage"
+TIER_DEEP = "deep"
+TRIAGE_NOTE = "> ⚡ 1차 분석({model}) 결과입니다. 위험도 {score}/10 으로 기준({threshold}) 미만이라 정밀 분석을 생략했습니다.\n\n"
+DEEP_NOTE = "> 🔬 정밀 분석({model}) 결과입니다. ({reason})\n\n"
+
+
+def read_prices(name, default):
+    value = os.getenv(name, "")
+    try:
+        input_price, output_price = (float(part) for part in value.split(","))
+        return input_price, output_price
+    except ValueError:
+        return default
+
+
+def load_cascade_config():
+    """환경 변수에서 캐스케이드 설정을 읽어옵니다. ANALYZER_CASCADE=1 이면 켭니다. (기본값: 끔)"""
+    try:
+        threshold = min(10.0, max(0.0, float(os.getenv("ANALYZER_CASCADE_THRESHOLD", DEFAULT_THRESHOLD))))
+    except ValueError:
+        threshold = DEFAULT_THRESHOLD
+    return {
+        "enabled": os.getenv("ANALYZER_CASCADE", "0").strip().lower() in ("1", "true", "yes", "on"),
+        "backend": os.getenv("ANALYZER_TRIAGE_BACKEND") or None,   # 없으면 본 분석과 같은 백엔드
+        "model": os.getenv("ANALYZER_TRIAGE_MODEL") or None,
+        "threshold": threshold,
+        "deep_price": read_prices("ANALYZER_DEEP_PRICE", None),
+        "triage_price": read_prices("ANALYZER_TRIAGE_PRICE", None),
+    }
+
+
+def triage_model_for(backend_name, model_name=None):
+    """1차 모델명. 직접 주지 않으면 백엔드별 기본 빠른 모델(gemini → gemini-2.5-flash)을 씁니다."""
+    backend_name = (backend_name or os.getenv("ANALYZER_BACKEND", "gemini")).strip().lower()
+    return model_name or DEFAULT_TRIAGE_MODELS.get(backend_name)
+
+
+def model_price(backend_name, override=None):
+    """백엔드 이름(모델명)의 100만 토큰당 (입력, 출력) 단가. 모르면 None."""
+    if override:
+        return override
+    return MODEL_PRICES.get(backend_name.split(":", 1)[-1])
+
+
+# --- 1차 결과 해석 ---
+def parse_triage(text, unit_names=None):
+    """1차 응답에서 위험도 줄을 떼어 (점수, [심각] 후보 여부, 본문)을 돌려줍니다.
+
+    위험도 줄이 없으면 가장 높은 태그로 점수를 매깁니다. 묶음 요청이면 요청에 든 유닛의 결과('### 유닛: 이름' 아래)만 봅니다.
+    """
+    match = SCORE_LINE_PATTERN.search(text)
+    body = (text[:match.start()] + text[match.end():]).strip() if match else text.strip()
+    scored = body
+    if unit_names and len(unit_names) > 1:
+        parts = demultiplex_response(body, unit_names)
+        if parts:
+            scored = "\n".join(parts.values())
+    tags = TAG_PATTERN.findall(scored)
+    score = float(match.group(1)) if match else float(max((TAG_SCORES[tag] for tag in tags), default=0))
+    return min(10.0, score), "심각" in tags, body
+
+
+def needs_deep_analysis(score, critical, threshold):
+    """위험도가 기준 이상이거나 [심각] 후보가 있으면 정밀 분석이 필요합니다."""
+    return score >= threshold or critical
+
+
+def format_score(score):
+    return f"{score:g}"
+
+
+# --- 절약 효과 집계 ---
+class CascadeStats:
+    """요청별 1차/정밀 분석 기록을 모아, 정밀 분석을 생략해 아낀 시간과 비용을 추정합니다. 여러 스레드에서 기록합니다."""
+
+    def __init__(self, triage_name, deep_name, threshold=DEFAULT_THRESHOLD, triage_price=None, deep_price=None):
+        self.lock = threading.Lock()
+        self.triage_name = triage_name
+        self.deep_name = deep_name
+        self.threshold = threshold
+        self.triage_price = model_price(triage_name, triage_price)
+        self.deep_price = model_price(deep_name, deep_price)
+        self.triaged = 0
+        self.escalated = 0
+        self.triage_seconds = 0.0
+        self.triage_tokens = [0, 0]     # 1차 모델에 보낸 (입력, 출력) 토큰
+        self.deep_seconds = []          # 정밀 분석 요청별 모델 시간
+        self.deep_tokens = [0, 0]
+        self.skipped_tokens = [0, 0]    # 정밀 분석을 생략한 요청이 보냈을 (입력, 출력) 토큰 추정
+
+    def record_triage(self, seconds, tokens_in, tokens_out, escalated, deep_tokens_in=0, cached=False):
+        """1차 분석 하나를 기록합니다. cached 면 1차 모델을 부르지 않았으므로 시간/토큰은 더하지 않습니다."""
+        with self.lock:
+            self.triaged += 1
+            if not cached:
+                self.triage_seconds += seconds
+                self.triage_tokens[0] += tokens_in
+                self.triage_tokens[1] += tokens_out
+            if escalated:
+                self.escalated += 1
+            else:
+                # 정밀 모델의 응답 길이는 1차 응답 길이와 비슷하다고 봄
+                self.skipped_tokens[0] += deep_tokens_in
+                self.skipped_tokens[1] += tokens_out
+
+    def record_deep(self, seconds, tokens_in, tokens_out):
+        with self.lock:
+            self.deep_seconds.append(seconds)
+            self.deep_tokens[0] += tokens_in
+            self.deep_tokens[1] += tokens_out
+
+    @staticmethod
+    def cost(price, tokens):
+        if price is None:
+            return None
+        return (tokens[0] * price[0] + tokens[1] * price[1]) / 1_000_000
+
+    def summary(self):
+        """metrics 에 저장할 요약. 단가를 모르는 모델이면 비용은 None, 정밀 분석 기록이 없으면 절약 시간은 None."""
+        with self.lock:
+            skipped = self.triaged - self.escalated
+            deep_mean = sum(self.deep_seconds) / len(self.deep_seconds) if self.deep_seconds else None
+            triage_cost = self.cost(self.triage_price, self.triage_tokens)
+            avoided_cost = self.cost(self.deep_price, self.skipped_tokens)
+            return {
+                "triage_model": self.triage_name,
+                "deep_model": self.deep_name,
+                "threshold": self.threshold,
+                "triaged": self.triaged,
+                "escalated": self.escalated,
+                "deep_skipped": skipped,
+                "triage_seconds": round(self.triage_seconds, 4),
+                "deep_seconds": round(sum(self.deep_seconds), 4),
+                "triage_tokens": list(self.triage_tokens),
+                "deep_tokens": list(self.deep_tokens),
+                "skipped_tokens": list(self.skipped_tokens),
+                "triage_cost": round(triage_cost, 6) if triage_cost is not None else None,
+                "deep_cost": round(self.cost(self.deep_price, self.deep_tokens), 6) if self.deep_price else None,
+                # 생략한 정밀 분석의 추정 비용/시간에서 1차 분석에 든 만큼을 뺀 순절약
+                "saved_cost": (round(avoided_cost - triage_cost, 6)
+                               if avoided_cost is not None and triage_cost is not None else None),
+                "saved_seconds": (round(deep_mean * skipped - self.triage_seconds, 4)
+                                  if deep_mean is not None else None),
+            }
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import hashlib
+
+from incremental import normalize_target_dirs, split_report
+
+# --- 체크포인트 저널: 기능 유닛 하나가 리포트에 기록될 때마다 한 줄씩 추가 (append-only JSONL) ---
+JOURNAL_DIR = ".analysis_cache"
+
+
+def journal_path_for(target_dirs, report_path):
+    key = os.pathsep.join(sorted(normalize_target_dirs(target_dirs))) + "|" + os.path.abspath(report_path)
+    return os.path.join(JOURNAL_DIR, f"journal-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}.jsonl")
+
+
+class CheckpointJournal:
+    """중단된 폴더 분석을 이어서 할 수 있도록 유닛별 완료 기록을 남깁니다.
+
+    첫 줄은 실행 정보(run), 이후 줄은 유닛마다 {"unit", "status", "report", "end"} 기록입니다.
+    end 는 해당 섹션까지 쓴 뒤의 리포트 파일 위치입니다.
+    resume=False 이면 새 실행으로 보고 저널을 비웁니다.
+    """
+
+    def __init__(self, path, target_dirs, report_path, resume=False):
+        self.path = path
+        self.target_dirs = sorted(normalize_target_dirs(target_dirs))
+        self.report_path = report_path
+        self.records = {}
+        self.last_end = None
+        self.file = None
+        if resume:
+            self._load()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if resume and self.records:
+            self.file = open(path, 'a', encoding='utf-8')
+        else:
+            self.start_fresh()
+
+    def start_fresh(self):
+        """지난 기록을 버리고 새 실행으로 저널을 다시 시작합니다."""
+        if self.file:
+            self.file.close()
+        self.records = {}
+        self.last_end = None
+        self.file = open(self.path, 'w', encoding='utf-8')
+        self._append({"type": "run", "target": self.target_dirs,
+                      "report": os.path.abspath(self.report_path), "started_at": time.time()})
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # 마지막 줄이 쓰다 만 상태로 끊긴 경우
+            if number == 0:
+                if record.get("type") != "run" or record.get("target") != self.target_dirs:
+                    return
+                continue
+            self.records[record["unit"]] = record
+            self.last_end = record.get("end", self.last_end)
+
+    @property
+    def completed_units(self):
+        return {unit for unit, record in self.records.items() if record["status"] == "ok"}
+
+    @property
+    def failed_units(self):
+        return {unit for unit, record in self.records.items() if record["status"] != "ok"}
+
+    def restart_with(self, kept_sections):
+        """저널을 새로 시작하고, 다시 쓴 리포트에 남은 [(유닛, 끝 위치), ...] 를 완료로 다시 기록합니다.
+
+        리포트를 다시 쓰면 섹션 위치가 바뀌므로, 옛 위치가 남아 있으면 다음 이어서 분석 때 엉뚱한 곳에서 잘립니다.
+        """
+        self.start_fresh()
+        for unit, end in kept_sections:
+            self.record(unit, "ok", end)
+
+    def record(self, unit, status, end):
+        record = {"unit": unit, "status": status, "report": self.report_path, "end": end, "at": time.time()}
+        self.records[unit] = record
+        self.last_end = end
+        self._append(record)
+
+    def _append(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+def prepare_report_for_resume(report_path, heading, completed_units, last_end):
+    """이어서 쓰기 전에 리포트를 정리합니다.
+
+    마지막 기록 이후 쓰다 만 부분을 잘라내고, 실패했던 유닛의 섹션은 지워서 다시 분석한 결과로 대체되게 합니다.
+    남긴 섹션의 [(유닛, 다시 쓴 리포트에서의 끝 위치), ...] 를 돌려주며(CheckpointJournal.restart_with 용),
+    리포트가 없으면 None 을 돌려줍니다. (처음부터 새로 써야 함)
+    """
+    try:
+        with open(report_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if last_end is not None:
+        data = data[:last_end]
+    header, sections = split_report(data.decode('utf-8', errors='replace'), heading)
+    tmp_path = report_path + ".tmp"
+    kept = []
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for name, body in sections.items():
+            if name in completed_units:
+                f.write(f"\n\n---\n\n{heading}{name}\n\n{body}")
+                kept.append((name, f.tell()))
+    os.replace(tmp_path, report_path)
+    return kept
@@ -0,0 +1,146 @@
+import os
+import re
+import hashlib
+
+from packing import read_part
+
+# --- 중복 제거: 복사/붙여넣기로 생긴 같은(또는 거의 같은) 코드는 한 번만 분석하고 결과를 나눠 씀 ---
+DEFAULT_MAX_DISTANCE = 3        # SimHash 해밍 거리 - 이 이하이면 거의 같은 코드로 봄 (0 이면 완전히 같은 것만)
+MIN_SHINGLES = 32               # 이보다 짧은 코드는 SimHash 가 불안정해 완전히 같은 경우만 묶음
+SIMHASH_BITS = 64
+LANE_BITS = 24                  # 비트별 개수를 큰 정수 하나에 모아 세기 위한 칸 너비 (최대 1600만 shingle)
+BAND_COUNT = 4                  # 거리 3 이하면 16비트 띠 4개 중 하나는 반드시 같음 (후보 찾기용)
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# 바이트 값 하나(8비트)를 LANE_BITS 너비 칸 8개로 펼친 값. 8바이트 해시를 8번 더하기로 64칸에 누적함
+SPREAD_TABLE = [
+    [sum(((value >> bit) & 1) << ((byte_index * 8 + bit) * LANE_BITS) for bit in range(8)) for value in range(256)]
+    for byte_index in range(SIMHASH_BITS // 8)
+]
+
+
+def load_dedup_config():
+    """환경 변수에서 중복 제거 설정을 읽어옵니다. ANALYZER_DEDUP=0 이면 끕니다."""
+    try:
+        max_distance = max(0, int(os.getenv("ANALYZER_DEDUP_DISTANCE", DEFAULT_MAX_DISTANCE)))
+    except ValueError:
+        max_distance = DEFAULT_MAX_DISTANCE
+    return {
+        "enabled": os.getenv("ANALYZER_DEDUP", "1").strip().lower() not in ("0", "false", "off", "no"),
+        "max_distance": min(max_distance, BAND_COUNT - 1),
+    }
+
+
+# --- 지문(fingerprint) ---
+def simhash(shingles):
+    """shingle 집합의 64비트 SimHash. shingle 이 MIN_SHINGLES 보다 적으면 None."""
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    total = 0
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        for byte_index, value in enumerate(digest):
+            total += SPREAD_TABLE[byte_index][value]
+    half = len(shingles) // 2
+    lane_mask = (1 << LANE_BITS) - 1
+    result = 0
+    for bit in range(SIMHASH_BITS):
+        if (total >> (bit * LANE_BITS)) & lane_mask > half:
+            result |= 1 << bit
+    return result
+
+
+def read_tokens(file_path):
+    return TOKEN_PATTERN.findall(read_part(file_path)[0])
+
+
+def exact_key(tokens):
+    """공백 차이를 무시한 내용 해시."""
+    return hashlib.sha256(" ".join(tokens).encode("utf-8")).hexdigest()
+
+
+def fingerprint_files(file_paths):
+    """파일(들)의 (정확 일치 키, SimHash) 를 만듭니다. 공백 차이와 파일 순서는 무시합니다. 읽을 수 없으면 None."""
+    file_hashes = []
+    shingles = set()
+    for file_path in file_paths:
+        try:
+            tokens = read_tokens(file_path)
+        except OSError:
+            return None
+        file_hashes.append(exact_key(tokens))
+        shingles.update(" ".join(tokens[i:i + 3]) for i in range(max(1, len(tokens) - 2)))
+    exact = hashlib.sha256("\0".join(sorted(file_hashes)).encode("utf-8")).hexdigest()
+    return exact, simhash(shingles)
+
+
+def cluster(fingerprints, max_distance):
+    """{키: (정확 일치 키, SimHash)} 를 입력 순서대로 훑어 {중복 키: (대표 키, 완전히 같은지)} 를 돌려줍니다.
+
+    대표는 각 묶음에서 처음 나온 키입니다. 거의 같은 코드는 SimHash 띠(band)가 하나라도 같은 대표만 비교합니다.
+    """
+    duplicates = {}
+    exact_leaders = {}  # 정확 일치 키 -> (대표 키, 대표와 완전히 같은지)
+    bands = {}      # (띠 번호, 띠 값) -> [대표 키, ...]
+    band_bits = SIMHASH_BITS // BAND_COUNT
+    band_mask = (1 << band_bits) - 1
+    for key, fingerprint in fingerprints.items():
+        if fingerprint is None:
+            continue
+        exact, signature = fingerprint
+        if exact in exact_leaders:
+            duplicates[key] = exact_leaders[exact]
+            continue
+        exact_leaders[exact] = (key, True)
+        if signature is None or max_distance == 0:
+            continue
+        keys = [(band, (signature >> (band * band_bits)) & band_mask) for band in range(BAND_COUNT)]
+        match = None
+        for band_key in keys:
+            for leader, leader_signature in bands.get(band_key, ()):
+                if bin(signature ^ leader_signature).count("1") <= max_distance:
+                    match = leader
+                    break
+            if match is not None:
+                break
+        if match is not None:
+            duplicates[key] = exact_leaders[exact] = (match, False)
+            continue
+        for band_key in keys:
+            bands.setdefault(band_key, []).append((key, signature))
+    return duplicates
+
+
+# --- 기능 유닛 / 개별 파일 중복 찾기 ---
+def drop_duplicate_files(files):
+    """한 기능 유닛 안에 내용이 똑같은 파일이 여러 개면 첫 번째만 남깁니다. (모듈마다 복사된 같은 이름의 JSP 등)"""
+    names = [os.path.basename(file_path) for file_path in files]
+    seen = set()
+    kept = []
+    for file_path, name in zip(files, names):
+        if names.count(name) > 1:   # 복사본은 보통 파일명이 같으므로 그런 파일만 비교
+            try:
+                key = (name, exact_key(read_tokens(file_path)))
+            except OSError:
+                key = None
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(file_path)
+    return kept
+
+
+def find_duplicate_units(analysis_units, max_distance=DEFAULT_MAX_DISTANCE):
+    """{유닛명: 파일 목록} 에서 파일 수가 같고 내용이 같거나 거의 같은 유닛을 찾아 {중복 유닛: (대표 유닛, 완전히 같은지)} 로 돌려줍니다."""
+    by_file_count = {}
+    for name, files in analysis_units.items():
+        by_file_count.setdefault(len(files), {})[name] = fingerprint_files(files)
+    duplicates = {}
+    for fingerprints in by_file_count.values():
+        duplicates.update(cluster(fingerprints, max_distance))
+    return duplicates
+
+
+def find_duplicate_files(file_list, max_distance=DEFAULT_MAX_DISTANCE):
+    """개별 파일 목록에서 {중복 파일 번호: (대표 파일 번호, 완전히 같은지)} 를 찾습니다. 대표는 항상 앞 번호입니다."""
+    return cluster({i: fingerprint_files([file_path]) for i, file_path in enumerate(file_list)}, max_distance)
@@ -0,0 +1,911 @@
+import os
+import json
+import time
+import threading
+
+from backends import BackendError, create_backend
+from runner import (AnalysisStopped, LatencyTracker, TokenBucket, call_with_backoff,
+                    load_runner_config, request_timeout, run_units_concurrently)
+from result_cache import make_cache_key, open_result_cache
+from incremental import commit_manifest, merge_report, plan_incremental_run, split_report
+from checkpoint import CheckpointJournal, journal_path_for, prepare_report_for_resume
+from packing import (ReportAssembler, build_analysis_requests, build_request_code, build_shared_context,
+                     estimate_tokens, load_packing_config, read_part, request_instructions)
+from report_writer import StreamingReportWriter
+from metrics import RunMetrics
+from scanner import iter_project_files
+from dedup import drop_duplicate_files, find_duplicate_files, find_duplicate_units, load_dedup_config
+from prefilter import load_prefilter_config, order_requests, request_hints, request_score, score_units, select_units
+from project_index import group_by_graph, load_grouping_config
+from planner import load_plan_config, plan_run
+from cascade import (DEEP_NOTE, TIER_DEEP, TIER_TRIAGE, TRIAGE_INSTRUCTIONS, TRIAGE_NOTE, CascadeStats,
+                     format_score, load_cascade_config, needs_deep_analysis, parse_triage, triage_model_for)
+from findings import (FINDINGS_INSTRUCTIONS, FindingsIndex, JsonBlockStripper, add_fingerprints, findings_path_for,
+                      parse_findings)
+
+# --- 분석 엔진: 스캔 → 그룹핑 → 프롬프트 → 모델 호출 → 리포트 (CLI 와 두 GUI 가 함께 사용) ---
+DEFAULT_EXTENSIONS = ['.java', '.jsp', '.js', '.xml']
+DUPLICATE_NOTE = "> ♻️ '{representative}' 와 {kind} 코드라서 그 분석 결과를 함께 씁니다.\n\n"
+
+FOLDER_REPORT_PATH = "folder_analysis_report.md"
+FOLDER_REPORT_HEADER = "# AI 코드 분석 보고서 (폴더 전체)\n"
+FOLDER_REPORT_HEADING = "## 💎 기능 유닛: "
+FILE_REPORT_PATH = "file_analysis_report.md"
+FILE_REPORT_HEADER = "# AI 코드 분석 보고서 (개별 파일)\n"
+FILE_REPORT_HEADING = "## 📄 분석 파일: "
+
+# 고정 지시문은 실행마다 한 번 컨텍스트로 올리고(backends.PromptContext), 요청에는 아래 템플릿 부분만 보냄
+UNIT_SYSTEM_PROMPT = """너는 운영 서버의 심각한 장애를 막기 위해 긴급 투입된 20년차 시니어 아키텍트다. 아래 코드 묶음에서, 오직 운영에 심각한 문제를 일으킬 수 있는 '치명적인 위험'만 찾아내라. [분석 목표]: 1. 치명적인 런타임 오류(NPE 등) 2. 심각한 보안 취약점 3. 대용량 데이터 처리 시 성능 병목. [분석 제외]: 단순 스타일(변수명, 주석, 포맷팅 등)은 절대 언급하지 마라. 결과는 심각도 순서대로 `[심각]`, `[경고]`, `[권장]` 태그를 붙여서 핵심만 요약 보고해라. """ + FINDINGS_INSTRUCTIONS
+FILE_SYSTEM_PROMPT = """너는 운영 서버의 심각한 장애를 막기 위해 긴급 투입된 20년차 시니어 아키텍트다. 아래 단일 소스코드 파일에서, 오직 운영에 심각한 문제를 일으킬 수 있는 '치명적인 위험'만 찾아내라. [분석 목표]: 1. 치명적인 런타임 오류(NPE 등) 2. 심각한 보안 취약점 3. 대용량 데이터 처리 시 성능 병목. [분석 제외]: 단순 스타일(변수명, 주석, 포맷팅 등)은 절대 언급하지 마라. 결과는 심각도 순서대로 `[심각]`, `[경고]`, `[권장]` 태그를 붙여서 핵심만 요약 보고해라. """ + FINDINGS_INSTRUCTIONS
+UNIT_PROMPT_TEMPLATE = """{instructions}[분석할 코드 묶음]:\n{code}"""
+FILE_PROMPT_TEMPLATE = """[분석할 코드]:\n{code}"""
+
+
+class EngineError(Exception):
+    """API 키가 없거나 분석할 파일이 없는 등, 분석을 시작할 수 없을 때 발생합니다."""
+
+
+# --- 1. 파일 스캔 / 기능 단위 그룹핑 ---
+def find_project_files(target_dir, extensions, stats=None):
+    """분석 대상 파일 경로를 차례로 내보내는 제너레이터. (빌드 폴더·ignore 규칙·큰 파일·압축 JS 제외, scanner.py 참고)"""
+    return iter_project_files(target_dir, extensions, stats=stats)
+
+
+def group_files_by_name(file_list):
+    """파일명에서 Controller/Service/Mapper 를 뗀 이름이 같은 파일끼리 묶습니다."""
+    feature_groups = {}
+    for file_path in file_list:
+        base_name = os.path.basename(file_path).split('.')[0]
+        feature_name = base_name.replace('Controller', '').replace('Service', '').replace('Mapper', '')
+        if feature_name not in feature_groups:
+            feature_groups[feature_name] = []
+        feature_groups[feature_name].append(file_path)
+    return feature_groups
+
+
+def group_files_by_feature(file_list):
+    """파일명 규칙으로 묶은 뒤, 프로젝트 색인의 연결(import, MyBatis namespace, JSP-컨트롤러 URL)을 따라
+    크기 한도 안에서 합칩니다. ANALYZER_GROUPING=name 이면 파일명 규칙만 씁니다. (project_index.py 참고)"""
+    name_groups = group_files_by_name(file_list)
+    if load_grouping_config()["mode"] == "name" or len(file_list) < 2:
+        return name_groups
+    return group_by_graph(file_list, name_groups)
+
+
+def make_unit_lookup(analysis_units):
+    """파일 목록을 이번 실행의 기능 유닛별로 나누는 함수(증분 모드용). 이번에 없는(삭제된) 파일은 파일명 규칙을 따릅니다."""
+    owner = {file_path: name for name, files in analysis_units.items() for file_path in files}
+
+    def group(file_list):
+        groups = {}
+        for file_path in file_list:
+            name = owner.get(file_path) or next(iter(group_files_by_name([file_path])))
+            groups.setdefault(name, []).append(file_path)
+        return groups
+    return group
+
+
+# --- 2. 모델 설정 ---
+def open_backend(backend=None, backend_name=None, model_name=None):
+    """이미 만든 백엔드가 있으면 그대로 쓰고, 없으면 설정에 맞춰 한 번만 만듭니다. (import 시점이 아니라 분석 시작 시)"""
+    if backend is not None:
+        return backend
+    try:
+        return create_backend(backend_name, model_name)
+    except BackendError as e:
+        raise EngineError(str(e))
+
+
+def open_prompt_context(backend, text, log):
+    """고정 지시문(+공유 컨텍스트)을 실행마다 한 번 백엔드에 올립니다. 캐시를 못 쓰는 백엔드는 요청마다 함께 보냅니다."""
+    context = backend.create_context(text)
+    tokens = estimate_tokens(text)
+    if context.cached:
+        log(f"🧷 공통 지시문 {tokens:,}토큰을 컨텍스트 캐시에 올렸습니다. 요청에는 유닛 코드만 담습니다.")
+    else:
+        log(f"공통 지시문 {tokens:,}토큰은 이 백엔드에서 캐시할 수 없어 요청마다 함께 보냅니다.")
+    return context, (0 if context.cached else tokens)
+
+
+def open_cascade(cascade, triage_backend, backend, backend_name, log):
+    """캐스케이드를 쓰면 1차(빠른) 백엔드와 절약 집계를, 아니면 (None, None)을 돌려줍니다. cascade 가 None 이면 ANALYZER_CASCADE 를 따릅니다."""
+    config = load_cascade_config()
+    if not (config["enabled"] if cascade is None else cascade):
+        return None, None
+    if triage_backend is None:
+        triage_backend_name = config["backend"] or backend_name
+        triage_backend = open_backend(None, triage_backend_name, triage_model_for(triage_backend_name, config["model"]))
+    log(f"🪜 캐스케이드: '{triage_backend.name}' 가 먼저 위험도를 매기고, {format_score(config['threshold'])} 이상이거나 "
+        f"[심각] 후보가 있는 요청만 '{backend.name}' 로 정밀 분석합니다.")
+    return triage_backend, CascadeStats(triage_backend.name, backend.name, config["threshold"],
+                                        config["triage_price"], config["deep_price"])
+
+
+def make_rate_limited_config(max_workers=None, requests_per_minute=None, hedge=None):
+    runner_config = load_runner_config()
+    if max_workers:
+        runner_config["max_workers"] = max_workers
+    if requests_per_minute:
+        runner_config["requests_per_minute"] = requests_per_minute
+    if hedge is not None:
+        runner_config["hedge"] = hedge
+    return runner_config
+
+
+def open_latency_tracker(runner_config):
+    """헤징을 쓰면 모델 하나의 호출 시간 기록기(runner.LatencyTracker)를, 아니면 None 을 돌려줍니다."""
+    if not runner_config["hedge"]:
+        return None
+    return LatencyTracker(runner_config["hedge_percentile"], runner_config["hedge_min_samples"])
+
+
+def store_result(result_cache, key, model_name, result, name, log):
+    """결과를 캐시에 넣습니다. 다른 프로세스가 캐시를 잡고 있어 못 써도 분석 결과는 그대로 두고 경고만 남깁니다."""
+    if result_cache and not result_cache.put(key, model_name, result):
+        log(f"⚠️ '{name}' 캐시 저장 실패 - 결과는 그대로 기록하고, 다음 실행에서 다시 분석합니다.")
+
+
+def make_continue_logger(name, metrics, log):
+    def on_continue():
+        metrics.add_continuation()
+        log(f"✂️ '{name}' 응답이 출력 길이 한도에서 잘려 이어서 받습니다.")
+    return on_continue
+
+
+def make_hedge_logger(name, metrics, log):
+    def on_hedge(won):
+        metrics.add_hedge(won)
+        log(f"🪃 '{name}' 응답이 늦어 같은 요청을 하나 더 보냈고, {'나중 요청' if won else '원래 요청'}의 응답을 썼습니다.")
+    return on_hedge
+
+
+# --- 3. 폴더 분석 ---
+def run_folder_analysis(target_dirs, log, stop_event=None, extensions=None, report_path=FOLDER_REPORT_PATH,
+                        report_header=FOLDER_REPORT_HEADER, incremental=False, git_range=None, resume=False,
+                        backend=None, backend_name=None, model_name=None, batch=False,
+                        max_workers=None, requests_per_minute=None, use_cache=True, metrics=None, metrics_path=None,
+                        top_units=None, min_risk_score=None, time_budget=None, request_slots=None,
+                        cascade=None, triage_backend=None, hedge=None, token_budget=None, plan_only=False,
+                        cache_path=None, units=None, touched_units=None):
+    """폴더(들)를 기능 단위로 묶어 분석하고 report_path 에 Markdown 리포트를 씁니다.
+
+    log 는 진행 메시지를 받는 함수(print, log_queue.put 등)입니다. batch=True 면 캐시에 없는 요청을
+    백엔드의 배치 작업 하나로 제출합니다. 단계별 지표는 metrics(RunMetrics)에 모이며, metrics_path 가
+    있으면 끝날 때 JSON/CSV 로 저장합니다. top_units / min_risk_score / time_budget(초) 중 하나라도 주면
+    정적 검사 점수가 높은 유닛부터 분석하고 그 한도 안에서만 분석합니다. request_slots 는 여러 프로세스가
+    함께 쓰는 동시 요청 세마포어입니다(scheduler.py). cascade=True 면(None 이면 ANALYZER_CASCADE) 빠른 모델
+    (triage_backend)이 먼저 위험도를 매기고 기준 이상인 요청만 backend 로 정밀 분석합니다(cascade.py).
+    요청마다 입력 크기에 맞춘 마감 시간을 두고, hedge=True 면(None 이면 ANALYZER_HEDGE) 호출이 이번 실행의 p95 보다
+    늦을 때 같은 요청을 하나 더 보내 먼저 온 응답을 씁니다(runner.py). 모델을 부르기 전에 요청 수·토큰·예상 시간을
+    계산해 log 에 알리고(planner.py), token_budget(None 이면 ANALYZER_TOKEN_BUDGET) 이나 time_budget 이 있으면
+    위험 점수가 높은 요청부터 그 안에 드는 것만 분석합니다. plan_only=True 면 계획만 세우고 모델은 부르지 않습니다.
+    cache_path 를 주면 ANALYZER_CACHE_PATH 대신 그 결과 캐시 파일을 씁니다. units({유닛명: 파일 목록})를 주면 스캔과
+    그룹핑 없이 그 유닛을 그대로 쓰고, 증분 모드에서 touched_units 에 든 유닛은 manifest 비교 결과와 함께 다시
+    분석합니다(watcher.py). 결과 요약 dict 를 반환합니다.
+    """
+    if isinstance(target_dirs, str):
+        target_dirs = [target_dirs]
+    stop_event = stop_event or threading.Event()
+    extensions = extensions or DEFAULT_EXTENSIONS
+    incremental = incremental or bool(git_range)
+    report_heading = FOLDER_REPORT_HEADING
+    metrics = metrics or RunMetrics()
+
+    if units is None:
+        all_files = []
+        scan_stats = {}
+        for target_dir in target_dirs:
+            log(f"'{target_dir}' 에서 파일 스캔을 시작합니다...")
+            with metrics.stage("scan"):
+                all_files.extend(find_project_files(target_dir, extensions, scan_stats))
+        if any(scan_stats.values()):
+            log(f"스캔 제외: 폴더 {scan_stats.get('pruned_dirs', 0)}개, ignore 규칙 {scan_stats.get('ignored', 0)}개, "
+                f"큰 파일 {scan_stats.get('too_large', 0)}개, 압축된 JS {scan_stats.get('minified', 0)}개")
+        if not all_files:
+            raise EngineError("분석할 파일을 찾지 못했습니다. 경로를 확인해주세요.")
+
+        log(f"총 {len(all_files)}개의 파일을 찾았습니다. 기능 단위로 그룹핑합니다...")
+        with metrics.stage("group"):
+            analysis_units = group_files_by_feature(all_files)
+    else:
+        # 감시 모드: 이미 묶어 둔 유닛을 그대로 써서 실행마다 전체를 다시 스캔/그룹핑하지 않음
+        analysis_units = {name: list(files) for name, files in units.items() if files}
+        all_files = [file_path for files in analysis_units.values() for file_path in files]
+        if not all_files:
+            raise EngineError("분석할 파일을 찾지 못했습니다. 경로를 확인해주세요.")
+    backend = open_backend(backend, backend_name, model_name)
+
+    # 이전 실행의 manifest(또는 git 변경 범위)와 비교해 바뀐 기능 유닛만 고름
+    changed_units, previous_manifest, current_manifest, manifest_path = plan_incremental_run(
+        target_dirs, all_files, analysis_units, make_unit_lookup(analysis_units), report_path, git_range)
+    if incremental:
+        units_to_analyze = changed_units
+        if touched_units:
+            # 감시 모드가 알려 준 유닛(파일이 지워진 유닛 등)도 함께 - 내용이 그대로면 결과 캐시로 끝남
+            units_to_analyze = {name: files for name, files in analysis_units.items()
+                                if name in changed_units or name in touched_units}
+        log(f"증분 모드: 전체 {len(analysis_units)}개 중 변경된 기능 유닛 {len(units_to_analyze)}개만 분석합니다.")
+    else:
+        units_to_analyze = analysis_units
+
+    # 이어서 분석: 저널에 완료로 기록된 유닛은 건너뛰고, 실패/미완료 유닛만 다시 분석
+    journal = None
+    resuming = False
+    if not incremental and not plan_only:
+        journal = CheckpointJournal(journal_path_for(target_dirs, report_path), target_dirs, report_path, resume=resume)
+        if resume and journal.completed_units:
+            kept_sections = prepare_report_for_resume(report_path, report_heading, journal.completed_units,
+                                                      journal.last_end)
+            resuming = kept_sections is not None
+            if resuming:
+                journal.restart_with(kept_sections)     # 다시 쓴 리포트 기준의 위치로 기록을 맞춤
+        if not resuming and journal.records:
+            journal.start_fresh()  # 이어 쓸 리포트가 없으면 처음부터 새로 기록
+        if resuming:
+            units_to_analyze = {name: files for name, files in units_to_analyze.items() if name not in journal.completed_units}
+            log(f"⏯️ 이전 실행에서 완료된 {len(journal.completed_units)}개 유닛은 건너뛰고, 남은 {len(units_to_analyze)}개 유닛부터 이어서 분석합니다.")
+
+    # 복사/붙여넣기로 생긴 같은(또는 거의 같은) 유닛은 대표 하나만 보내고, 결과는 리포트에서 나눠 씀
+    units_to_send = units_to_analyze
+    duplicate_members = {}   # 대표 유닛 -> [(중복 유닛, 완전히 같은지), ...]
+    dedup_config = load_dedup_config()
+    if dedup_config["enabled"] and units_to_analyze:
+        with metrics.stage("dedup"):
+            units_to_send = {name: drop_duplicate_files(files) for name, files in units_to_analyze.items()}
+            duplicates = find_duplicate_units(units_to_send, dedup_config["max_distance"])
+        for name, (representative, exact) in duplicates.items():
+            duplicate_members.setdefault(representative, []).append((name, exact))
+        units_to_send = {name: files for name, files in units_to_send.items() if name not in duplicates}
+        if duplicates:
+            log(f"🧬 중복 제거: 기능 유닛 {len(duplicates)}개는 같거나 거의 같은 코드의 대표 유닛 결과를 함께 씁니다.")
+
+    # 정적 검사로 유닛마다 위험 점수를 매기고, 걸린 줄은 프롬프트 힌트로 넣음 (한도가 있으면 위험한 유닛부터)
+    risk_scores = {}
+    skipped_units = 0
+    token_budget = load_plan_config()["token_budget"] if token_budget is None else token_budget
+    prioritize = top_units is not None or min_risk_score is not None or bool(time_budget) or bool(token_budget)
+    if load_prefilter_config()["enabled"] and units_to_send:
+        with metrics.stage("prefilter"):
+            risk_scores = score_units(units_to_send)
+        flagged = sum(1 for score, _ in risk_scores.values() if score)
+        log(f"🔎 정적 검사: 기능 유닛 {len(risk_scores)}개 중 {flagged}개에서 위험 패턴을 찾았습니다.")
+        if prioritize:
+            selected = select_units(units_to_send, risk_scores, top_units, min_risk_score)
+            skipped_units = len(units_to_send) - len(selected)
+            units_to_send = selected
+            if skipped_units:
+                log(f"위험 점수 한도로 {skipped_units}개 유닛은 이번 실행에서 분석하지 않습니다.")
+    elif prioritize and units_to_send:
+        log("⚠️ 정적 검사가 꺼져 있어(ANALYZER_PREFILTER=0) --top/--min-score 와 위험 순서 정렬을 적용하지 않습니다.")
+
+    # 토큰 예산에 맞춰 큰 유닛은 나누고 작은 유닛은 한 요청으로 묶음
+    analysis_requests = build_analysis_requests(units_to_send)
+    if prioritize and risk_scores:
+        analysis_requests = order_requests(analysis_requests, risk_scores)
+    runner_config = make_rate_limited_config(max_workers, requests_per_minute, hedge)
+    result_cache = open_result_cache(cache_path) if use_cache else None
+    shared_context, shared_files = build_shared_context(all_files)
+    context_text = UNIT_SYSTEM_PROMPT + shared_context
+
+    # 실행 계획: 전체 토큰/시간을 미리 알리고, 예산이 있으면 그 안에서 고름
+    # 예산·--plan·API 토큰 세기일 때만 실제와 같은 프롬프트로 세고, 아니면 소스를 읽지 않고 파일 크기로 추정 (분석 때 한 번만 읽도록)
+    precise_plan = plan_only or bool(token_budget) or bool(time_budget) or load_plan_config()["token_count"] == "api"
+    template_tokens = estimate_tokens(UNIT_PROMPT_TEMPLATE)
+
+    def render_prompt(analysis_request):
+        instructions = request_instructions(analysis_request) + request_hints(analysis_request, risk_scores)
+        return UNIT_PROMPT_TEMPLATE.format(instructions=instructions, code=build_request_code(analysis_request))
+
+    def is_cached(prompt):
+        return bool(result_cache) and result_cache.contains(make_cache_key(backend.name, context_text + prompt))
+
+    with metrics.stage("plan"):
+        plan = plan_run(analysis_requests, render_prompt if precise_plan else None, is_cached,
+                        [request_score(analysis_request, risk_scores) for analysis_request in analysis_requests],
+                        estimate_tokens(context_text) + (0 if precise_plan else template_tokens), backend, runner_config)
+    selected = None
+    if token_budget or time_budget:
+        selected = plan.select(token_budget, time_budget)
+    for line in plan.summary_lines(selected):
+        log(line)
+    metrics.set_plan(plan.to_dict(selected))
+    if plan_only:
+        if result_cache:
+            result_cache.close()
+        if metrics_path:
+            metrics.write(metrics_path)
+        return {"report_path": None, "metrics_path": metrics_path, "plan": plan.to_dict(selected),
+                "units": len(units_to_analyze), "requests": len(analysis_requests),
+                "completed": 0, "failed": 0, "skipped": 0, "stopped": False}
+    if selected is not None and len(selected) < len(analysis_requests):
+        kept = [analysis_requests[index] for index in selected]
+        # 나눈 유닛의 조각은 함께 고르거나 빼므로, 빠진 요청에 든 유닛은 통째로 이번 실행에서 빠짐
+        chosen = set(selected)
+        dropped_units = {name for index, analysis_request in enumerate(analysis_requests) if index not in chosen
+                         for name in analysis_request.unit_names}
+        log(f"예산을 넘는 {len(analysis_requests) - len(kept)}개 요청({len(dropped_units)}개 유닛)은 이번 실행에서 분석하지 않습니다.")
+        analysis_requests = kept
+
+    total_requests = len(analysis_requests)
+    metrics.set_total(total_requests)
+    log(f"🎉 총 {len(units_to_send)}개의 기능 단위({total_requests}개 요청)에 대한 '핵심 위험 분석'을 시작합니다.")
+
+    rate_limiter = TokenBucket(runner_config["requests_per_minute"])
+    log(f"동시 요청 수: {runner_config['max_workers']}, 분당 최대 요청: {runner_config['requests_per_minute']}"
+        f"{', 느린 요청 헤징' if runner_config['hedge'] else ''}")
+    completed_units = set()
+    failed_units = set()
+    new_sections = {}
+    assembler = ReportAssembler()
+    # 응답 끝의 JSON 블록은 리포트에서 빼고 발견 사항 인덱스(SQLite)에 저장
+    findings_path = findings_path_for(report_path)
+    findings_index = FindingsIndex(findings_path)
+    findings_index.begin_run(report_path)
+
+    def build_prompt(analysis_request):
+        started = time.perf_counter()
+        problems = []
+        combined_code = build_request_code(analysis_request, problems=problems)
+        for file_path, reason in problems:
+            log(f"⚠️ '{os.path.basename(file_path)}' {reason}")
+        code_bytes = len(combined_code.encode('utf-8'))
+        metrics.add_stage("read", time.perf_counter() - started, bytes_out=code_bytes)
+        started = time.perf_counter()
+        instructions = request_instructions(analysis_request) + request_hints(analysis_request, risk_scores)
+        prompt = UNIT_PROMPT_TEMPLATE.format(instructions=instructions, code=combined_code)
+        metrics.add_stage("prompt", time.perf_counter() - started, bytes_in=code_bytes,
+                          bytes_out=len(prompt.encode('utf-8')))
+        return prompt
+
+    if batch and analysis_requests and not backend.supports_batch:
+        raise EngineError(f"'{backend.name}' 백엔드는 배치 작업을 지원하지 않습니다.")
+    if batch and cascade:
+        log("배치 모드에서는 캐스케이드 없이 모든 요청을 정밀 분석합니다.")
+    triage_backend, cascade_stats = open_cascade(False if batch else cascade, triage_backend, backend, backend_name, log)
+    # 고정 지시문과 (설정했으면) 공통 코드는 한 번만 올리고, 요청마다 유닛 코드만 보냄
+    if shared_files:
+        log(f"공통 코드 {len(shared_files)}개 파일을 공유 컨텍스트로 함께 보냅니다.")
+    context, context_tokens = open_prompt_context(backend, context_text, log)
+    triage_context = None
+    if triage_backend:
+        triage_context, triage_context_tokens = open_prompt_context(
+            triage_backend, UNIT_SYSTEM_PROMPT + TRIAGE_INSTRUCTIONS + shared_context, log)
+    tier_notes = {}     # 요청 번호 -> 리포트 섹션 앞에 붙일 캐스케이드 단계 표시
+    latency = {TIER_DEEP: open_latency_tracker(runner_config), TIER_TRIAGE: open_latency_tracker(runner_config)}
+
+    # 배치 모드: 캐시에 없는 요청을 모아 배치 작업 하나로 제출하고, 결과는 아래 순서 보장 경로로 그대로 기록
+    batch_results = {}
+    batch_prompts = {}      # 요청 번호 -> (프롬프트, 캐시 키). 제출 전에 만든 것을 분석 때 다시 읽지 않고 씀
+    if batch and analysis_requests:
+        pending_prompts = {}
+        for i, analysis_request in enumerate(analysis_requests):
+            prompt = build_prompt(analysis_request)
+            cache_key = make_cache_key(backend.name, context.text + prompt)
+            if result_cache and result_cache.contains(cache_key):
+                batch_prompts[i] = (None, cache_key)    # 캐시 적중이면 프롬프트는 들고 있지 않음
+            else:
+                pending_prompts[i] = prompt
+                batch_prompts[i] = (prompt, cache_key)
+        if pending_prompts:
+            log(f"📦 {len(pending_prompts)}개 요청을 배치 작업 하나로 제출합니다...")
+            started = time.perf_counter()
+            try:
+                results = backend.run_batch(list(pending_prompts.values()), stop_event=stop_event, log=log,
+                                            context=context)
+            except BackendError as e:
+                backend.release_context(context)
+                raise EngineError(str(e))
+            metrics.add_stage("model", time.perf_counter() - started,
+                              tokens_in=sum(estimate_tokens(prompt) + context_tokens for prompt in pending_prompts.values()),
+                              tokens_out=sum(estimate_tokens(r) for r in results if isinstance(r, str)))
+            batch_results = dict(zip(pending_prompts, results))
+
+    def analyze_request(i, analysis_request):
+        feature_name = analysis_request.name
+        log(f"\n[{i+1}/{total_requests}] 기능 유닛 '{feature_name}' 분석 중...")
+        started = time.perf_counter()
+        retries = []
+
+        def on_retry(n, delay, e):
+            retries.append(e)
+            metrics.add_retry(e)
+            log(f"⏳ '{feature_name}' 재시도 {n}회 ({delay:.1f}초 대기) - {e}")
+
+        call_seconds = []
+        prompt_tokens = prompt_bytes = 0
+
+        def request_model(model_backend, model_context, stage, tokens_in):
+            timeout = request_timeout(tokens_in, runner_config)
+
+            def call_model(cancel):
+                # 속도 제한/재시도 대기를 뺀 순수 모델 호출 시간만 잼 (취소된 호출과 진 헤지 요청은 빼고)
+                call_started = time.perf_counter()
+                try:
+                    return model_backend.generate(prompt, context=model_context, timeout=timeout, cancel=cancel,
+                                                  on_continue=make_continue_logger(feature_name, metrics, log))
+                finally:
+                    if not cancel.is_set():
+                        call_seconds.append(time.perf_counter() - call_started)
+
+            first_call = len(call_seconds)
+            model_started = time.perf_counter()
+            result = call_with_backoff(call_model, rate_limiter, stop_event, runner_config["max_retries"],
+                                       on_retry=on_retry, request_slots=request_slots, timeout=timeout,
+                                       latency=latency[TIER_TRIAGE if stage == "triage" else TIER_DEEP],
+                                       on_hedge=make_hedge_logger(feature_name, metrics, log))
+            seconds = sum(call_seconds[first_call:])
+            metrics.add_stage("wait", time.perf_counter() - model_started - seconds)
+            metrics.add_stage(stage, seconds, bytes_in=prompt_bytes, bytes_out=len(result.encode('utf-8')),
+                              tokens_in=tokens_in, tokens_out=estimate_tokens(result))
+            return result, seconds
+
+        def triage():
+            """빠른 모델의 1차 결과. 정밀 분석이 필요 없으면 (본문, 표시)를, 필요하거나 1차 분석이 실패하면 (None, 표시)를 돌려줌"""
+            triage_key = make_cache_key(triage_backend.name, triage_context.text + prompt)
+            triage_result = result_cache.get(triage_key) if result_cache else None
+            triage_cached = triage_result is not None
+            triage_seconds = 0.0
+            tokens_in = estimate_tokens(prompt) + triage_context_tokens
+            if not triage_cached:
+                try:
+                    triage_result, triage_seconds = request_model(triage_backend, triage_context, "triage", tokens_in)
+                except AnalysisStopped:
+                    raise
+                except Exception as e:
+                    log(f"⚠️ '{feature_name}' 1차 분석 실패 - 정밀 분석으로 넘깁니다. ({e})")
+                    return None, DEEP_NOTE.format(model=backend.name, reason="1차 분석 실패")
+                store_result(result_cache, triage_key, triage_backend.name, triage_result, feature_name, log)
+            score, critical, body = parse_triage(triage_result, analysis_request.unit_names)
+            escalate = needs_deep_analysis(score, critical, cascade_stats.threshold)
+            cascade_stats.record_triage(triage_seconds, tokens_in, estimate_tokens(triage_result), escalate,
+                                        deep_tokens_in=prompt_tokens, cached=triage_cached)
+            if escalate:
+                log(f"🔬 '{feature_name}' 1차 위험도 {format_score(score)}/10 - 정밀 분석합니다.")
+                return None, DEEP_NOTE.format(model=backend.name, reason=f"1차 위험도 {format_score(score)}/10")
+            return body, TRIAGE_NOTE.format(model=triage_backend.name, score=format_score(score),
+                                            threshold=format_score(cascade_stats.threshold))
+
+        tier = TIER_DEEP if triage_backend else ""
+        model_seconds = 0.0
+        try:
+            prompt, cache_key = batch_prompts.pop(i, (None, None))
+            if cache_key is None:
+                prompt = build_prompt(analysis_request)
+                # 프롬프트(템플릿 + 소스)가 지난번과 같으면 모델을 다시 부르지 않음
+                cache_key = make_cache_key(backend.name, context.text + prompt)
+            cached_result = result_cache.get(cache_key) if result_cache else None
+            if cached_result is not None:
+                log(f"♻️ '{feature_name}' 변경 없음 - 캐시된 결과를 사용합니다.")
+                if triage_backend:
+                    tier_notes[i] = DEEP_NOTE.format(model=backend.name, reason="캐시")
+                metrics.record_unit(feature_name, "ok", time.perf_counter() - started, cached=True, tier=tier)
+                return cached_result, True
+            if prompt is None:      # 배치 제출 전에는 캐시에 있던 결과가 그 사이 지워진 경우
+                prompt = build_prompt(analysis_request)
+            prompt_bytes = len(prompt.encode('utf-8'))
+            prompt_tokens = estimate_tokens(prompt) + context_tokens
+
+            if i in batch_results:
+                analysis_result = batch_results.pop(i)
+                if isinstance(analysis_result, Exception):
+                    raise analysis_result
+                # 배치 작업 시간은 제출할 때 한꺼번에 기록됨
+            else:
+                analysis_result = None
+                if triage_backend:
+                    analysis_result, tier_notes[i] = triage()
+                if analysis_result is not None:
+                    tier = TIER_TRIAGE
+                    model_seconds = sum(call_seconds)
+                else:
+                    analysis_result, model_seconds = request_model(backend, context, "model", prompt_tokens)
+                    if triage_backend:
+                        cascade_stats.record_deep(model_seconds, prompt_tokens, estimate_tokens(analysis_result))
+            log(f"✅ '{feature_name}' 분석 완료.")
+            # 1차 결과만 쓴 경우는 정밀 분석 캐시에 넣지 않음 (캐스케이드를 끄고 다시 돌리면 정밀 분석)
+            if tier != TIER_TRIAGE:
+                store_result(result_cache, cache_key, backend.name, analysis_result, feature_name, log)
+        except AnalysisStopped:
+            raise
+        except Exception as e:
+            analysis_result = f"오류 발생: '{feature_name}' 유닛 분석 중 문제 발생 - {e}"
+            log(analysis_result)
+            metrics.record_unit(feature_name, "failed", time.perf_counter() - started,
+                                model_seconds=sum(call_seconds), tokens_in=prompt_tokens,
+                                bytes_in=prompt_bytes, retries=len(retries), error=e, tier=tier)
+            return analysis_result, False
+        metrics.record_unit(feature_name, "ok", time.perf_counter() - started, model_seconds=model_seconds,
+                            tokens_in=prompt_tokens, tokens_out=estimate_tokens(analysis_result),
+                            bytes_in=prompt_bytes, bytes_out=len(analysis_result.encode('utf-8')),
+                            retries=len(retries), tier=tier)
+        return analysis_result, True
+
+    # 전체 모드는 리포트를 새로 쓰고(이어서 분석이면 뒤에 붙이고), 증분 모드는 끝난 뒤 기존 리포트에 병합
+    report_file = None if incremental else open(report_path, "a" if resuming else "w", encoding='utf-8')
+    try:
+        if report_file and not resuming:
+            report_file.write(report_header)
+
+        def with_duplicates(sections):
+            for feature_name, analysis_result, ok in sections:
+                yield feature_name, analysis_result, ok
+                for member, exact in duplicate_members.get(feature_name, []):
+                    note = DUPLICATE_NOTE.format(representative=feature_name, kind="같은" if exact else "거의 같은")
+                    yield member, note + analysis_result, ok
+
+        # 분석은 병렬로 진행하되, 리포트는 항상 요청 순서대로 기록 (묶음/조각 결과는 유닛별로 되돌림)
+        def write_sections(i, analysis_request, outcome):
+            write_unit_sections(i, assembler.add(analysis_request, *outcome))
+
+        def write_unit_sections(i, sections):
+            with metrics.stage("report"):
+                for feature_name, analysis_result, ok in with_duplicates(sections):
+                    (completed_units if ok else failed_units).add(feature_name)
+                    if ok:
+                        analysis_result, unit_findings = parse_findings(analysis_result)
+                        findings_index.record(feature_name, add_fingerprints(unit_findings, analysis_units[feature_name]))
+                        analysis_result = tier_notes.get(i, "") + analysis_result
+                    if report_file:
+                        report_file.write(f"\n\n---\n\n{report_heading}{feature_name}\n\n{analysis_result}")
+                        # 섹션마다 디스크에 반영해, 중간에 꺼져도 그때까지의 리포트는 남도록 함
+                        report_file.flush()
+                        os.fsync(report_file.fileno())
+                        journal.record(feature_name, "ok" if ok else "failed", report_file.tell())
+                    else:
+                        new_sections[feature_name] = analysis_result
+
+        # 시간 예산이 있으면 그 뒤로는 새 요청을 보내지 않음 (보낸 요청은 끝까지 기다림)
+        deadline = time.monotonic() + time_budget if time_budget else None
+        # analyze_request 밖에서 난 예외도 그 요청의 실패로 기록하고 다음 요청을 계속 씀
+        def write_failure(i, analysis_request, e):
+            analysis_result = f"오류 발생: '{analysis_request.name}' 유닛 분석 중 문제 발생 - {e}"
+            log(analysis_result)
+            metrics.record_unit(analysis_request.name, "failed", 0.0, error=e)
+            write_sections(i, analysis_request, (analysis_result, False))
+
+        processed = run_units_concurrently(analysis_requests, analyze_request, write_sections,
+                                           stop_event, runner_config["max_workers"], deadline, on_error=write_failure)
+        if processed < total_requests and not stop_event.is_set():
+            log(f"⏱️ 시간 예산을 다 써서 남은 {total_requests - processed}개 요청은 분석하지 않았습니다.")
+        # 시간 예산이나 중지로 일부 조각만 끝난 유닛은 실패로 기록해, 다음 실행에서 유닛 전체를 다시 분석하게 함
+        partial_sections = assembler.flush()
+        if partial_sections:
+            log(f"⚠️ 나눈 유닛 {len(partial_sections)}개는 일부 조각만 분석되어 실패로 기록합니다.")
+            write_unit_sections(None, partial_sections)
+    finally:
+        if report_file:
+            report_file.close()
+        else:
+            merge_report(report_path, report_header, report_heading, new_sections, analysis_units.keys())
+        if journal:
+            journal.close()
+        backend.release_context(context)
+        if triage_context is not None:
+            triage_backend.release_context(triage_context)
+            metrics.set_cascade(cascade_stats.summary())
+        findings_index.finish_run(analysis_units.keys())
+        log_findings_summary(findings_index, log)
+        findings_index.close()
+        commit_manifest(manifest_path, previous_manifest, current_manifest, make_unit_lookup(analysis_units),
+                        set(units_to_analyze) - completed_units)
+        if result_cache:
+            log(f"캐시 적중 {result_cache.hits}건 / 신규 분석 {result_cache.misses}건")
+            result_cache.close()
+        if metrics_path:
+            metrics.write(metrics_path)
+
+    if stop_event.is_set():
+        log("\n!!! 분석이 사용자에 의해 중지되었습니다 !!!")
+    else:
+        log(f"\n\n🎉🎉🎉 분석 완료! '{report_path}' 파일을 확인하세요! 🎉🎉🎉")
+    return {
+        "report_path": report_path,
+        "metrics_path": metrics_path,
+        "findings_path": findings_path,
+        "units": len(units_to_analyze),
+        "requests": total_requests,
+        "completed": len(completed_units),
+        "failed": len(failed_units),
+        "skipped": len(units_to_analyze) - len(completed_units) - len(failed_units) if not stop_event.is_set() else 0,
+        "stopped": stop_event.is_set(),
+    }
+
+
+# --- 4. 개별 파일 분석 ---
+def run_file_analysis(file_list, log, stop_event=None, report_path=FILE_REPORT_PATH, report_header=FILE_REPORT_HEADER,
+                      backend=None, backend_name=None, model_name=None, max_workers=None,
+                      requests_per_minute=None, use_cache=True, metrics=None, metrics_path=None, request_slots=None,
+                      cascade=None, triage_backend=None, hedge=None):
+    """파일마다 따로 분석하며, 응답은 도착하는 대로 리포트와 log 에 흘려보냅니다. 결과 요약 dict 를 반환합니다.
+
+    캐스케이드 모드에서는 1차 결과를 받은 뒤 정밀 분석이 필요한 파일만 본 모델의 응답을 흘려보냅니다.
+    리포트로 흘려보내는 본 분석은 헤징하지 않고(두 응답이 섞이므로), 마감 시간과 중지 시 취소만 적용합니다.
+    """
+    stop_event = stop_event or threading.Event()
+    metrics = metrics or RunMetrics()
+    total_files = len(file_list)
+    metrics.set_total(total_files)
+    log(f"총 {total_files}개의 개별 파일 분석을 시작합니다...")
+    backend = open_backend(backend, backend_name, model_name)
+
+    runner_config = make_rate_limited_config(max_workers, requests_per_minute, hedge)
+    rate_limiter = TokenBucket(runner_config["requests_per_minute"])
+    triage_latency = open_latency_tracker(runner_config)
+    result_cache = open_result_cache() if use_cache else None
+    max_request_bytes = load_packing_config()["max_request_bytes"] or None
+    failed_files = set()
+    completed_files = set()
+
+    # 같은(또는 거의 같은) 파일은 앞쪽 대표 파일만 분석하고, 나머지는 대표의 결과가 나오면 그대로 씀
+    duplicates = {}
+    dedup_config = load_dedup_config()
+    if dedup_config["enabled"] and total_files > 1:
+        with metrics.stage("dedup"):
+            duplicates = find_duplicate_files(file_list, dedup_config["max_distance"])
+        if duplicates:
+            log(f"🧬 중복 제거: 파일 {len(duplicates)}개는 같거나 거의 같은 앞쪽 파일의 결과를 함께 씁니다.")
+    representative_done = {index: threading.Event() for index, _ in duplicates.values()}
+    representative_results = {}
+
+    def share_duplicate_result(i, file_path, representative, exact):
+        started = time.perf_counter()
+        # 대표 파일은 항상 앞 번호라 먼저 제출되므로, 기다리다 멈춰 버리는 일은 없음
+        while not representative_done[representative].wait(0.2):
+            if stop_event.is_set():
+                raise AnalysisStopped()
+        if representative not in representative_results:
+            raise AnalysisStopped()  # 대표 파일 분석이 중지로 끝남
+        analysis_result, ok = representative_results[representative]
+        note = DUPLICATE_NOTE.format(representative=file_list[representative], kind="같은" if exact else "거의 같은")
+        markdown, file_findings = parse_findings(analysis_result)
+        report_writer.write(i, note + markdown)
+        report_writer.finish(i)
+        if ok:
+            findings_index.record(file_path, add_fingerprints(file_findings, [file_path]))
+        (completed_files if ok else failed_files).add(file_path)
+        metrics.record_unit(file_path, "ok" if ok else "failed", time.perf_counter() - started, cached=True)
+        return analysis_result
+
+    def analyze_file(i, file_path):
+        log(f"\n[{i+1}/{total_files}] 파일 '{os.path.basename(file_path)}' 분석 중...")
+        report_writer.write(i, f"\n\n---\n\n{FILE_REPORT_HEADING}{file_path}\n\n")
+        if i in duplicates:
+            return share_duplicate_result(i, file_path, *duplicates[i])
+        try:
+            analysis_result = analyze_unique_file(i, file_path)
+            if file_path not in failed_files:
+                findings_index.record(file_path, add_fingerprints(parse_findings(analysis_result)[1], [file_path]))
+            representative_results[i] = (analysis_result, file_path not in failed_files)
+        finally:
+            if i in representative_done:
+                representative_done[i].set()
+        return analysis_result
+
+    def triage(i, file_path, prompt, prompt_tokens, retries):
+        """빠른 모델의 1차 결과로 충분하면 (결과, 모델 시간)을, 정밀 분석이 필요하면 (None, 0.0)을 돌려줌.
+        어느 쪽이든 캐스케이드 단계 표시는 리포트에 먼저 씀"""
+        name = os.path.basename(file_path)
+        triage_key = make_cache_key(triage_backend.name, triage_context.text + prompt)
+        triage_result = result_cache.get(triage_key) if result_cache else None
+        triage_cached = triage_result is not None
+        tokens_in = estimate_tokens(prompt) + triage_context_tokens
+        timeout = request_timeout(tokens_in, runner_config)
+        call_seconds = []
+
+        def call_model(cancel):
+            call_started = time.perf_counter()
+            try:
+                return triage_backend.generate(prompt, context=triage_context, timeout=timeout, cancel=cancel,
+                                               on_continue=make_continue_logger(name, metrics, log))
+            finally:
+                if not cancel.is_set():
+                    call_seconds.append(time.perf_counter() - call_started)
+
+        def on_retry(n, delay, e):
+            retries.append(e)
+            metrics.add_retry(e)
+            log(f"⏳ '{name}' 1차 분석 재시도 {n}회 ({delay:.1f}초 대기) - {e}")
+
+        if not triage_cached:
+            model_started = time.perf_counter()
+            try:
+                triage_result = call_with_backoff(call_model, rate_limiter, stop_event, runner_config["max_retries"],
+                                                  on_retry=on_retry, request_slots=request_slots, timeout=timeout,
+                                                  latency=triage_latency, on_hedge=make_hedge_logger(name, metrics, log))
+            except AnalysisStopped:
+                raise
+            except Exception as e:
+                log(f"⚠️ '{name}' 1차 분석 실패 - 정밀 분석으로 넘깁니다. ({e})")
+                report_writer.write(i, DEEP_NOTE.format(model=backend.name, reason="1차 분석 실패"))
+                return None, 0.0
+            metrics.add_stage("wait", time.perf_counter() - model_started - sum(call_seconds))
+            metrics.add_stage("triage", sum(call_seconds), bytes_in=len(prompt.encode('utf-8')),
+                              bytes_out=len(triage_result.encode('utf-8')), tokens_in=tokens_in,
+                              tokens_out=estimate_tokens(triage_result))
+            store_result(result_cache, triage_key, triage_backend.name, triage_result, name, log)
+        score, critical, body = parse_triage(triage_result)
+        escalate = needs_deep_analysis(score, critical, cascade_stats.threshold)
+        cascade_stats.record_triage(sum(call_seconds), tokens_in, estimate_tokens(triage_result), escalate,
+                                    deep_tokens_in=prompt_tokens, cached=triage_cached)
+        if escalate:
+            log(f"🔬 '{name}' 1차 위험도 {format_score(score)}/10 - 정밀 분석합니다.")
+            report_writer.write(i, DEEP_NOTE.format(model=backend.name, reason=f"1차 위험도 {format_score(score)}/10"))
+            return None, 0.0
+        report_writer.write(i, TRIAGE_NOTE.format(model=triage_backend.name, score=format_score(score),
+                                                  threshold=format_score(cascade_stats.threshold)))
+        return body, sum(call_seconds)
+
+    def analyze_unique_file(i, file_path):
+        started = time.perf_counter()
+        retries = []
+        call_seconds = []
+        prompt_tokens = prompt_bytes = 0
+        try:
+            code_to_analyze, code_bytes, truncated, encoding = read_part(file_path, max_bytes=max_request_bytes)
+            if truncated:
+                log(f"⚠️ '{os.path.basename(file_path)}' 요청 크기 상한({max_request_bytes // 1024}KB)에서 잘렸습니다.")
+            elif encoding not in ("utf-8", "utf-8-sig"):
+                log(f"⚠️ '{os.path.basename(file_path)}' {encoding} 인코딩으로 읽었습니다.")
+            metrics.add_stage("read", time.perf_counter() - started, bytes_out=code_bytes)
+            with metrics.stage("prompt", bytes_in=code_bytes):
+                prompt = FILE_PROMPT_TEMPLATE.format(code=code_to_analyze)
+
+            cache_key = make_cache_key(backend.name, context.text + prompt)
+            cached_result = result_cache.get(cache_key) if result_cache else None
+            if cached_result is not None:
+                log(f"♻️ '{os.path.basename(file_path)}' 변경 없음 - 캐시된 결과를 사용합니다.")
+                if triage_backend:
+                    report_writer.write(i, DEEP_NOTE.format(model=backend.name, reason="캐시"))
+                report_writer.write(i, parse_findings(cached_result)[0])
+                report_writer.finish(i)
+                completed_files.add(file_path)
+                metrics.record_unit(file_path, "ok", time.perf_counter() - started, cached=True,
+                                    tier=TIER_DEEP if triage_backend else "")
+                return cached_result
+
+            prompt_bytes = len(prompt.encode('utf-8'))
+            prompt_tokens = estimate_tokens(prompt) + context_tokens
+            if triage_backend:
+                triage_result, triage_seconds = triage(i, file_path, prompt, prompt_tokens, retries)
+                if triage_result is not None:
+                    report_writer.write(i, parse_findings(triage_result)[0])
+                    report_writer.finish(i)
+                    completed_files.add(file_path)
+                    metrics.record_unit(file_path, "ok", time.perf_counter() - started, model_seconds=triage_seconds,
+                                        tokens_in=prompt_tokens, tokens_out=estimate_tokens(triage_result),
+                                        bytes_in=prompt_bytes, bytes_out=len(triage_result.encode('utf-8')),
+                                        retries=len(retries), tier=TIER_TRIAGE)
+                    return triage_result
+
+            attempts = []
+            timeout = request_timeout(prompt_tokens, runner_config)
+
+            def request(cancel):
+                # 재시도 전에 이미 일부가 기록됐다면 끊긴 지점을 표시하고 처음부터 다시 받음
+                if attempts:
+                    report_writer.write(i, "\n\n(응답이 중간에 끊겨 다시 요청합니다)\n\n")
+                attempts.append(1)
+                stripper = JsonBlockStripper()    # 발견 사항 JSON 블록은 리포트에 쓰지 않음
+
+                def on_text(text):
+                    # 마감 시간이 지나 버린 호출이 다시 보낸 요청의 응답과 섞이지 않도록 함
+                    if stop_event.is_set() or cancel.is_set():
+                        raise AnalysisStopped()
+                    report_writer.write(i, stripper.feed(text))
+                call_started = time.perf_counter()
+                try:
+                    return backend.generate(prompt, on_text=on_text, context=context, timeout=timeout, cancel=cancel,
+                                            on_continue=make_continue_logger(os.path.basename(file_path), metrics, log))
+                finally:
+                    if not cancel.is_set():
+                        call_seconds.append(time.perf_counter() - call_started)
+                        report_writer.write(i, stripper.flush())
+
+            def on_retry(n, delay, e):
+                retries.append(e)
+                metrics.add_retry(e)
+                log(f"⏳ '{os.path.basename(file_path)}' 재시도 {n}회 ({delay:.1f}초 대기) - {e}")
+
+            model_started = time.perf_counter()
+            analysis_result = call_with_backoff(request, rate_limiter, stop_event, runner_config["max_retries"],
+                                                on_retry=on_retry, request_slots=request_slots, timeout=timeout)
+            # 스트리밍 응답은 받는 동안 리포트에도 쓰므로, 모델 시간에는 그 쓰기 시간도 포함됨
+            model_seconds = sum(call_seconds)
+            metrics.add_stage("wait", time.perf_counter() - model_started - model_seconds)
+            result_bytes = len(analysis_result.encode('utf-8'))
+            result_tokens = estimate_tokens(analysis_result)
+            metrics.add_stage("model", model_seconds, bytes_in=prompt_bytes, bytes_out=result_bytes,
+                              tokens_in=prompt_tokens, tokens_out=result_tokens)
+            if triage_backend:
+                cascade_stats.record_deep(model_seconds, prompt_tokens, result_tokens)
+            log(f"✅ '{os.path.basename(file_path)}' 분석 완료.")
+            completed_files.add(file_path)
+            store_result(result_cache, cache_key, backend.name, analysis_result, os.path.basename(file_path), log)
+            metrics.record_unit(file_path, "ok", time.perf_counter() - started, model_seconds=model_seconds,
+                                tokens_in=prompt_tokens, tokens_out=result_tokens, bytes_in=prompt_bytes,
+                                bytes_out=result_bytes, retries=len(retries), tier=TIER_DEEP if triage_backend else "")
+        except AnalysisStopped:
+            raise
+        except Exception as e:
+            analysis_result = f"오류 발생: {e}"
+            log(analysis_result)
+            failed_files.add(file_path)
+            report_writer.write(i, analysis_result)
+            metrics.record_unit(file_path, "failed", time.perf_counter() - started,
+                                model_seconds=sum(call_seconds), tokens_in=prompt_tokens, bytes_in=prompt_bytes,
+                                retries=len(retries), error=e, tier=TIER_DEEP if triage_backend else "")
+        report_writer.finish(i)
+        return analysis_result
+
+    def write_file_failure(i, file_path, e):
+        # analyze_unique_file 밖(중복 파일 결과 공유 등)에서 난 예외도 그 파일의 실패로 기록
+        analysis_result = f"오류 발생: {e}"
+        log(analysis_result)
+        completed_files.discard(file_path)
+        failed_files.add(file_path)
+        report_writer.write(i, analysis_result)
+        report_writer.finish(i)
+        metrics.record_unit(file_path, "failed", 0.0, error=e)
+
+    findings_path = findings_path_for(report_path)
+    findings_index = FindingsIndex(findings_path)
+    findings_index.begin_run(report_path)
+    triage_backend, cascade_stats = open_cascade(cascade, triage_backend, backend, backend_name, log)
+    context, context_tokens = open_prompt_context(backend, FILE_SYSTEM_PROMPT, log)
+    triage_context = None
+    if triage_backend:
+        triage_context, triage_context_tokens = open_prompt_context(
+            triage_backend, FILE_SYSTEM_PROMPT + TRIAGE_INSTRUCTIONS, log)
+    with open(report_path, "w", encoding='utf-8') as report_file:
+        report_file.write(report_header)
+        # 응답 토큰을 받는 즉시 리포트와 로그에 흘려보냄 (파일 순서는 유지)
+        report_writer = StreamingReportWriter(report_file, on_line=log)
+        try:
+            run_units_concurrently(file_list, analyze_file, lambda i, file_path, analysis_result: None,
+                                   stop_event, runner_config["max_workers"], on_error=write_file_failure)
+        finally:
+            with metrics.stage("report"):
+                report_writer.close(interrupted_note="\n\n(분석이 중간에 중지되어 결과가 일부만 기록되었습니다)")
+            if result_cache:
+                log(f"캐시 적중 {result_cache.hits}건 / 신규 분석 {result_cache.misses}건")
+                result_cache.close()
+            backend.release_context(context)
+            if triage_context is not None:
+                triage_backend.release_context(triage_context)
+                metrics.set_cascade(cascade_stats.summary())
+            if metrics_path:
+                metrics.write(metrics_path)
+            findings_index.finish_run(file_list)
+            log_findings_summary(findings_index, log)
+            findings_index.close()
+
+    if stop_event.is_set():
+        log("\n!!! 분석이 사용자에 의해 중지되었습니다 !!!")
+    else:
+        log(f"\n\n🎉🎉🎉 개별 파일 분석 완료! '{report_path}' 파일을 확인하세요! 🎉🎉🎉")
+    return {
+        "report_path": report_path,
+        "metrics_path": metrics_path,
+        "findings_path": findings_path,
+        "units": total_files,
+        "requests": total_files,
+        "completed": len(completed_files),
+        "failed": len(failed_files),
+        "stopped": stop_event.is_set(),
+    }
+
+
+# --- 5. 출력 형식 변환 ---
+def log_findings_summary(findings_index, log):
+    counts = findings_index.counts()
+    log(f"발견 사항: 심각 {counts.get('심각', 0)}건 / 경고 {counts.get('경고', 0)}건 / 권장 {counts.get('권장', 0)}건 "
+        f"(인덱스: {findings_index.path})")
+
+
+def export_report_json(report_path, heading, json_path):
+    """Markdown 리포트를 [{"unit": 이름, "result": 본문}, ...] 형태의 JSON 으로 저장합니다."""
+    with open(report_path, 'r', encoding='utf-8') as f:
+        _, sections = split_report(f.read(), heading)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump([{"unit": name, "result": body} for name, body in sections.items()], f, ensure_ascii=False, indent=2)
+    return json_path
@@ -0,0 +1,427 @@
+import os
+import re
+import json
+import time
+import html
+import hashlib
+import sqlite3
+import threading
+from collections import deque
+
+from dedup import TOKEN_PATTERN
+from packing import read_part
+
+# --- 구조화된 발견 사항: 모델 응답의 JSON 블록을 파싱해 SQLite 인덱스에 저장하고, 인덱스에서 리포트를 만듦 ---
+SEVERITIES = ("심각", "경고", "권장")
+SARIF_LEVELS = {"심각": "error", "경고": "warning", "권장": "note"}
+CATEGORIES = ("runtime", "security", "performance")
+JSON_FENCE = "```json"
+MAX_RUNS_KEPT = 20              # 리포트마다 이 개수의 최근 실행만 인덱스에 남김
+FINDINGS_INSTRUCTIONS = (
+    "\n[출력 형식]: 요약 보고 뒤에 ```json 코드 블록 하나로 발견 사항을 덧붙여라. 형식: "
+    '{"findings": [{"severity": "심각|경고|권장", "file": "파일명", "start_line": 숫자, "end_line": 숫자, '
+    '"category": "runtime|security|performance", "title": "한 줄 요약"}]}. 줄 번호를 모르면 null, '
+    "발견 사항이 없으면 빈 목록을 적어라. 여러 유닛이 묶여 있으면 유닛 제목마다 그 아래에 따로 작성하라.\n"
+)
+JSON_BLOCK_PATTERN = re.compile(r"\n?```json\s*(.*?)```", re.DOTALL)
+TAG_LINE_PATTERN = re.compile(r"\[(심각|경고|권장)\]\s*(.+)")
+FILE_NAME_PATTERN = re.compile(r"([\w.-]+\.(?:java|jsp|js|xml))")
+LINE_PATTERN = re.compile(r"(?:줄|line|L)\s*(\d+)(?:\s*[-~]\s*(\d+))?", re.IGNORECASE)
+CATEGORY_KEYWORDS = {
+    "security": ("보안", "인젝션", "injection", "xss", "csrf", "인증", "권한", "노출", "취약"),
+    "performance": ("성능", "병목", "n+1", "대용량", "메모리", "느린", "timeout", "타임아웃", "페이징"),
+}
+
+
+# --- 응답 파싱 ---
+def guess_category(text):
+    lowered = text.lower()
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(keyword in lowered for keyword in keywords):
+            return category
+    return "runtime"
+
+
+def normalize_finding(item):
+    severity = str(item.get("severity", "")).strip("[] ")
+    if severity not in SEVERITIES:
+        severity = {"critical": "심각", "high": "심각", "warning": "경고", "medium": "경고"}.get(severity.lower(), "권장")
+    title = str(item.get("title") or item.get("message") or "").strip()
+    category = str(item.get("category", "")).strip().lower()
+
+    def as_line(value):
+        try:
+            return int(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    start_line = as_line(item.get("start_line"))
+    return {
+        "severity": severity,
+        "file": str(item.get("file") or "").strip(),
+        "start_line": start_line,
+        "end_line": as_line(item.get("end_line")) or start_line,
+        "category": category if category in CATEGORIES else guess_category(title),
+        "title": title,
+    }
+
+
+def parse_tag_lines(text):
+    """JSON 블록이 없을 때: '[심각] Foo.java 줄 12: ...' 같은 태그 줄에서 발견 사항을 뽑습니다."""
+    findings = []
+    for match in TAG_LINE_PATTERN.finditer(text):
+        body = match.group(2).strip()
+        file_match = FILE_NAME_PATTERN.search(body)
+        line_match = LINE_PATTERN.search(body)
+        findings.append(normalize_finding({
+            "severity": match.group(1),
+            "file": file_match.group(1) if file_match else "",
+            "start_line": line_match.group(1) if line_match else None,
+            "end_line": line_match.group(2) if line_match else None,
+            "title": body,
+        }))
+    return findings
+
+
+def parse_findings(text):
+    """응답을 (JSON 블록을 뺀 Markdown, 발견 사항 목록) 으로 나눕니다. JSON 이 없거나 깨졌으면 태그 줄로 대신합니다."""
+    findings = []
+    parsed = False
+    for block in JSON_BLOCK_PATTERN.findall(text):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        items = data.get("findings", []) if isinstance(data, dict) else data
+        if isinstance(items, list):
+            findings.extend(normalize_finding(item) for item in items if isinstance(item, dict))
+            parsed = True
+    markdown = JSON_BLOCK_PATTERN.sub("", text).rstrip()
+    if not parsed:
+        findings = parse_tag_lines(markdown)
+    return markdown, findings
+
+
+class JsonBlockStripper:
+    """스트리밍 응답에서 ```json 블록을 걸러 리포트에는 Markdown 만 흘려보냅니다. (표식이 조각 경계에 걸쳐도 동작)"""
+
+    def __init__(self):
+        self.pending = ""
+        self.in_block = False
+
+    def feed(self, text):
+        self.pending += text
+        output = []
+        while self.pending:
+            if self.in_block:
+                end = self.pending.find("```")
+                if end < 0:
+                    self.pending = self.pending[-2:]    # 닫는 ``` 가 잘려 들어올 수 있음
+                    break
+                self.pending = self.pending[end + 3:]
+                self.in_block = False
+                continue
+            start = self.pending.find(JSON_FENCE)
+            if start >= 0:
+                output.append(self.pending[:start])
+                self.pending = self.pending[start + len(JSON_FENCE):]
+                self.in_block = True
+                continue
+            # 표식의 앞부분일 수 있는 꼬리만 남기고 내보냄
+            keep = next((n for n in range(len(JSON_FENCE) - 1, 0, -1) if self.pending.endswith(JSON_FENCE[:n])), 0)
+            output.append(self.pending[:len(self.pending) - keep])
+            self.pending = self.pending[len(self.pending) - keep:]
+            break
+        return "".join(output)
+
+    def flush(self):
+        text = "" if self.in_block else self.pending
+        self.pending = ""
+        return text
+
+
+# --- 코드 영역 지문: 줄 번호가 밀려도 같은 코드를 가리키는 발견 사항을 이어 주기 위함 ---
+def region_fingerprint(text):
+    """공백과 줄바꿈 차이를 무시한 코드 영역 해시."""
+    return hashlib.blake2b(" ".join(TOKEN_PATTERN.findall(text)).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def add_fingerprints(findings, file_paths):
+    """발견 사항마다 가리키는 코드 영역의 지문을 'fingerprint' 에 채웁니다.
+
+    파일명은 file_paths 중 이름이 같은 파일로 찾습니다. 파일이나 줄 번호를 모르면 빈 문자열이라,
+    그런 발견 사항은 (파일, 분류) 만으로 비교됩니다.
+    """
+    by_name = {}
+    for file_path in file_paths:
+        by_name.setdefault(os.path.basename(file_path).lower(), file_path)
+    file_lines = {}
+    for finding in findings:
+        finding["fingerprint"] = ""
+        file_path = by_name.get(os.path.basename(finding["file"]).lower())
+        if file_path is None or finding["start_line"] is None:
+            continue
+        if file_path not in file_lines:
+            try:
+                file_lines[file_path] = read_part(file_path)[0].splitlines()
+            except OSError:
+                file_lines[file_path] = []
+        lines = file_lines[file_path][finding["start_line"] - 1:finding["end_line"] or finding["start_line"]]
+        if lines:
+            finding["fingerprint"] = region_fingerprint("\n".join(lines))
+    return findings
+
+
+# --- SQLite 인덱스 ---
+def findings_path_for(report_path):
+    return os.path.splitext(report_path)[0] + ".findings.sqlite3"
+
+
+class FindingsIndex:
+    """실행(run)마다 유닛별 발견 사항을 저장합니다. 여러 분석 스레드에서 함께 기록할 수 있습니다.
+
+    다시 분석하지 않은 유닛(증분/이어서 분석)의 발견 사항은 finish_run() 에서 직전 실행의 것을 옮겨 와,
+    실행 하나만 보면 항상 전체 결과가 되도록 합니다.
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.run_id = None
+        self.analyzed_units = set()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY, report TEXT, started_at REAL, finished_at REAL);"
+            "CREATE TABLE IF NOT EXISTS findings ("
+            " id INTEGER PRIMARY KEY, run_id INTEGER, unit TEXT, severity TEXT, file TEXT,"
+            " start_line INTEGER, end_line INTEGER, category TEXT, title TEXT);"
+            "CREATE INDEX IF NOT EXISTS idx_findings_run_unit ON findings(run_id, unit);"
+            "CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(run_id, severity);"
+            "CREATE INDEX IF NOT EXISTS idx_findings_file ON findings(file);"
+            "CREATE INDEX IF NOT EXISTS idx_findings_category ON findings(run_id, category);"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(findings)")]
+        if "fingerprint" not in columns:    # 비교 기능 이전에 만든 인덱스
+            self.conn.execute("ALTER TABLE findings ADD COLUMN fingerprint TEXT DEFAULT ''")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_findings_fingerprint ON findings(run_id, fingerprint)")
+        self.conn.commit()
+
+    def begin_run(self, report_path):
+        with self.lock:
+            cursor = self.conn.execute("INSERT INTO runs (report, started_at) VALUES (?, ?)",
+                                       (os.path.abspath(report_path), time.time()))
+            self.run_id = cursor.lastrowid
+            self.analyzed_units = set()
+            old_runs = [(run_id,) for (run_id,) in self.conn.execute(
+                "SELECT id FROM runs WHERE report = ? ORDER BY id DESC LIMIT -1 OFFSET ?",
+                (os.path.abspath(report_path), MAX_RUNS_KEPT))]
+            self.conn.executemany("DELETE FROM findings WHERE run_id = ?", old_runs)
+            self.conn.executemany("DELETE FROM runs WHERE id = ?", old_runs)
+            self.conn.commit()
+        return self.run_id
+
+    def record(self, unit, findings):
+        """유닛 하나의 발견 사항을 (이번 실행 기준으로) 바꿔 씁니다."""
+        with self.lock:
+            self.analyzed_units.add(unit)
+            self.conn.execute("DELETE FROM findings WHERE run_id = ? AND unit = ?", (self.run_id, unit))
+            self.conn.executemany(
+                "INSERT INTO findings (run_id, unit, severity, file, start_line, end_line, category, title, fingerprint)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.run_id, unit, f["severity"], f["file"], f["start_line"], f["end_line"], f["category"], f["title"],
+                  f.get("fingerprint", "")) for f in findings])
+            self.conn.commit()
+
+    def previous_run_id(self, run_id=None):
+        run_id = run_id or self.run_id
+        row = self.conn.execute("SELECT MAX(id) FROM runs WHERE id < ? AND report = (SELECT report FROM runs WHERE id = ?)",
+                                (run_id, run_id)).fetchone()
+        return row[0] if row else None
+
+    def finish_run(self, current_units):
+        """current_units 중 이번에 분석하지 않은 유닛의 발견 사항을 직전 실행에서 옮겨 오고 실행을 마칩니다."""
+        with self.lock:
+            previous = self.previous_run_id()
+            carried = [unit for unit in current_units if unit not in self.analyzed_units]
+            if previous and carried:
+                self.conn.executemany(
+                    "INSERT INTO findings (run_id, unit, severity, file, start_line, end_line, category, title, fingerprint)"
+                    " SELECT ?, unit, severity, file, start_line, end_line, category, title, fingerprint"
+                    " FROM findings WHERE run_id = ? AND unit = ?",
+                    [(self.run_id, previous, unit) for unit in carried])
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id))
+            self.conn.commit()
+
+    def findings(self, run_id=None, severity=None, category=None, file=None):
+        query = ("SELECT unit, severity, file, start_line, end_line, category, title, fingerprint"
+                 " FROM findings WHERE run_id = ?")
+        params = [run_id or self.run_id]
+        for column, value in (("severity", severity), ("category", category), ("file", file)):
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+        query += " ORDER BY id"
+        columns = ("unit", "severity", "file", "start_line", "end_line", "category", "title", "fingerprint")
+        with self.lock:
+            return [dict(zip(columns, row)) for row in self.conn.execute(query, params)]
+
+    def latest_run_id(self):
+        with self.lock:
+            return self.conn.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+
+    def counts(self, run_id=None):
+        """{심각도: 개수}"""
+        with self.lock:
+            rows = self.conn.execute("SELECT severity, COUNT(*) FROM findings WHERE run_id = ? GROUP BY severity",
+                                     (run_id or self.run_id,)).fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# --- 인덱스에서 리포트 만들기 ---
+def location(finding):
+    if finding["start_line"] is None:
+        return finding["file"]
+    if finding["end_line"] and finding["end_line"] != finding["start_line"]:
+        return f"{finding['file']}:{finding['start_line']}-{finding['end_line']}"
+    return f"{finding['file']}:{finding['start_line']}"
+
+
+def render_markdown(findings, title="AI 코드 분석 발견 사항"):
+    lines = [f"# {title}", ""]
+    for severity in SEVERITIES:
+        group = [f for f in findings if f["severity"] == severity]
+        if not group:
+            continue
+        lines += ["", f"## [{severity}] {len(group)}건", "", "| 유닛 | 위치 | 분류 | 내용 |", "|---|---|---|---|"]
+        for f in group:
+            cells = (f["unit"], location(f), f["category"], f["title"])
+            lines.append("| " + " | ".join(str(cell).replace("|", "\\|").replace("\n", " ") for cell in cells) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def render_html(findings, title="AI 코드 분석 발견 사항"):
+    rows = "\n".join(
+        f"<tr class=\"{SARIF_LEVELS[f['severity']]}\"><td>{html.escape(f['severity'])}</td><td>{html.escape(f['unit'])}</td>"
+        f"<td>{html.escape(location(f))}</td><td>{html.escape(f['category'])}</td><td>{html.escape(f['title'])}</td></tr>"
+        for f in sorted(findings, key=lambda f: SEVERITIES.index(f["severity"])))
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>\n"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:4px}"
+            ".error td:first-child{color:#c00}.warning td:first-child{color:#c80}</style></head><body>\n"
+            f"<h1>{html.escape(title)}</h1>\n<table><tr><th>심각도</th><th>유닛</th><th>위치</th><th>분류</th><th>내용</th></tr>\n"
+            f"{rows}\n</table></body></html>\n")
+
+
+def render_sarif(findings, tool_name="ai-analyzer"):
+    results = []
+    for f in findings:
+        region = {}
+        if f["start_line"] is not None:
+            region = {"startLine": f["start_line"], "endLine": f["end_line"] or f["start_line"]}
+        physical = {"artifactLocation": {"uri": f["file"] or f["unit"]}}
+        if region:
+            physical["region"] = region
+        results.append({"ruleId": f["category"], "level": SARIF_LEVELS[f["severity"]],
+                        "message": {"text": f["title"]}, "locations": [{"physicalLocation": physical}]})
+    sarif = {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{"tool": {"driver": {"name": tool_name, "rules": [{"id": c} for c in CATEGORIES]}}, "results": results}],
+    }
+    return json.dumps(sarif, ensure_ascii=False, indent=2)
+
+
+RENDERERS = {"md": render_markdown, "html": render_html, "sarif": render_sarif}
+
+
+# --- 실행 간 비교 ---
+def match_key(finding):
+    return os.path.basename(finding["file"]).lower(), finding["fingerprint"] or "", finding["category"]
+
+
+def diff_findings(baseline, current):
+    """(파일명, 코드 영역 지문, 분류) 가 같은 발견 사항끼리 짝지어 신규 / 해결 / 심각도 변경을 나눕니다.
+
+    키별 해시 목록으로 한 번씩만 훑으므로 발견 사항 수에 비례하는 시간이 듭니다. 같은 키가 여러 개면 나온 순서대로 짝짓습니다.
+    """
+    remaining = {}
+    for finding in baseline:
+        remaining.setdefault(match_key(finding), deque()).append(finding)
+    new, changed = [], []
+    for finding in current:
+        matches = remaining.get(match_key(finding))
+        if not matches:
+            new.append(finding)
+            continue
+        previous = matches.popleft()
+        if previous["severity"] != finding["severity"]:
+            changed.append((previous, finding))
+    resolved = [finding for matches in remaining.values() for finding in matches]
+    return {"new": new, "resolved": resolved, "changed": changed}
+
+
+def render_diff_markdown(diff, title="AI 코드 분석 변경 사항"):
+    lines = [f"# {title}", "",
+             f"신규 {len(diff['new'])}건 / 해결 {len(diff['resolved'])}건 / 심각도 변경 {len(diff['changed'])}건"]
+
+    def table(heading, rows):
+        if not rows:
+            return
+        lines.extend(["", f"## {heading} {len(rows)}건", "", "| 심각도 | 유닛 | 위치 | 분류 | 내용 |", "|---|---|---|---|---|"])
+        for severity, f in rows:
+            cells = (severity, f["unit"], location(f), f["category"], f["title"])
+            lines.append("| " + " | ".join(str(cell).replace("|", "\\|").replace("\n", " ") for cell in cells) + " |")
+
+    order = lambda f: SEVERITIES.index(f["severity"])
+    table("신규", [(f["severity"], f) for f in sorted(diff["new"], key=order)])
+    table("심각도 변경", [(f"{old['severity']} → {f['severity']}", f)
+                        for old, f in sorted(diff["changed"], key=lambda pair: order(pair[1]))])
+    table("해결", [(f["severity"], f) for f in sorted(diff["resolved"], key=order)])
+    return "\n".join(lines) + "\n"
+
+
+def export_diff(findings_path, output_path, baseline_path=None):
+    """인덱스의 마지막 실행을 기준선과 비교해 Markdown 으로 저장하고 diff 를 돌려줍니다.
+
+    baseline_path 를 주면 그 인덱스(예: main 브랜치 CI 산출물)의 마지막 실행이, 없으면 같은 리포트의 직전 실행이 기준선입니다.
+    """
+    index = FindingsIndex(findings_path)
+    try:
+        run_id = index.latest_run_id()
+        current = index.findings(run_id)
+        if baseline_path:
+            baseline_index = FindingsIndex(baseline_path)
+            try:
+                baseline = baseline_index.findings(baseline_index.latest_run_id())
+            finally:
+                baseline_index.close()
+        else:
+            previous = index.previous_run_id(run_id)
+            baseline = index.findings(previous) if previous else []
+    finally:
+        index.close()
+    diff = diff_findings(baseline, current)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(render_diff_markdown(diff))
+    return diff
+
+
+def export_findings(findings_path, output_path, fmt, run_id=None):
+    """인덱스의 마지막(또는 지정한) 실행 발견 사항을 md / html / sarif 로 저장합니다."""
+    index = FindingsIndex(findings_path)
+    try:
+        if run_id is None:
+            run_id = index.latest_run_id()
+        text = RENDERERS[fmt](index.findings(run_id))
+    finally:
+        index.close()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return output_path
@@ -1,106 +1,41 @@
 import os
-import time
-import google.generativeai as genai
-from dotenv import load_dotenv
 import tkinter as tk
-from tkinter import filedialog, scrolledtext
+from tkinter import filedialog, scrolledtext, ttk
 import threading
 import queue
 
-# --- 핵심 분석 로직 (이전 main.py의 기능을 함수 안으로 옮김) ---
-def start_analysis_logic(target_directory, log_queue, stop_event):
-    """실제 분석을 수행하는 함수. 별도의 스레드에서 실행됩니다."""
-    
-    def find_project_files(target_dir, extensions):
-        found_files = []
-        for root, dirs, files in os.walk(target_dir):
-            for file in files:
-                if file.endswith(tuple(extensions)):
-                    full_path = os.path.join(root, file)
-                    found_files.append(full_path)
-        return found_files
-
-    def group_files_by_feature(file_list):
-        feature_groups = {}
-        for file_path in file_list:
-            base_name = os.path.basename(file_path).split('.')[0]
-            feature_name = base_name.replace('Controller', '').replace('Service', '').replace('Mapper', '')
-            if feature_name not in feature_groups:
-                feature_groups[feature_name] = []
-            feature_groups[feature_name].append(file_path)
-        return feature_groups
-    
-    try:
-        # --- 1. 파일 스캔 ---
-        log_queue.put(f"'{target_directory}' 에서 파일 스캔을 시작합니다...")
-        extensions = ['.java', '.jsp', '.js', '.xml']
-        all_files = find_project_files(target_directory, extensions)
-        
-        if not all_files:
-            log_queue.put("분석할 파일을 찾지 못했습니다. 경로를 확인해주세요.")
-            return
+from gui_log import COMPLETE_MESSAGE, POLL_INTERVAL_MS, LogPipeline, format_progress
+from metrics import RunMetrics
+from startup import probe_startup, schedule_warmup
 
-        log_queue.put(f"총 {len(all_files)}개의 파일을 찾았습니다. 기능 단위로 그룹핑합니다...")
-        analysis_units = group_files_by_feature(all_files)
-        total_units = len(analysis_units)
-        log_queue.put(f"🎉 총 {total_units}개의 기능 단위에 대한 '핵심 위험 분석'을 시작합니다.")
+METRICS_PATH = "critical_issues_metrics.json"
+LOG_PATH = "critical_issues_log.txt"   # 로그 창에서 잘려 나간 줄까지 전체 로그를 저장
+METRICS_REFRESH_MS = 1000   # 실시간 지표 패널 갱신 간격
 
-        # --- 2. AI 설정 ---
-        load_dotenv()
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            log_queue.put("오류: GOOGLE_API_KEY를 .env 파일에서 찾을 수 없습니다.")
-            return
-        genai.configure(api_key=api_key)
-        
-        # --- 3. 분석 및 리포트 생성 ---
-        with open("critical_issues_report.md", "w", encoding='utf-8') as report_file:
-            for i, (feature_name, files_in_unit) in enumerate(analysis_units.items()):
-                # 중지 신호를 확인하고 루프를 탈출
-                if stop_event.is_set():
-                    log_queue.put("\n!!! 분석이 사용자에 의해 중지되었습니다 !!!")
-                    break
-
-                log_queue.put(f"\n[{i+1}/{total_units}] 기능 유닛 '{feature_name}' 분석 중...")
-                
-                combined_code = ""
-                # (이하 코드 결합 및 프롬프트 생성 로직은 이전과 동일)
-                for file_path in files_in_unit:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            file_content = f.read()
-                        combined_code += f"\n\n--- 파일: {os.path.basename(file_path)} ---\n{file_content}"
-                    except Exception:
-                        pass
-                
-                prompt = f"""
-                너는 운영 서버의 심각한 장애를 막기 위해 긴급 투입된 20년차 시니어 아키텍트다.
-                아래 코드 묶음에서, 오직 운영에 심각한 문제를 일으킬 수 있는 '치명적인 위험'만 찾아내야 한다.
-                [분석 목표]: 1. 치명적인 런타임 오류(NPE 등) 2. 심각한 보안 취약점 3. 대용량 데이터 처리 시 성능 병목
-                [분석 제외]: 단순 스타일(변수명, 주석, 포맷팅 등)은 절대 언급하지 마라.
-                결과는 심각도 순서대로 `[심각]`, `[경고]`, `[권장]` 태그를 붙여서 핵심만 요약 보고해라.
-                [분석할 코드 묶음]:\n{combined_code}
-                """
-
-                try:
-                    model = genai.GenerativeModel('gemini-2.5-pro') # 성공했던 모델명 사용
-                    response = model.generate_content(prompt, request_options={"timeout": 600}) # 타임아웃 10분 설정
-                    analysis_result = response.text
-                    log_queue.put(f"✅ 분석 완료. 결과를 리포트에 추가합니다.")
-                except Exception as e:
-                    analysis_result = f"오류 발생: '{feature_name}' 유닛 분석 중 문제 발생 - {e}"
-                    log_queue.put(analysis_result)
-                
-                report_file.write(f"\n\n---\n\n## 💎 기능 유닛: {feature_name}\n\n{analysis_result}")
-                time.sleep(1) # API 과부하 방지
-
-        if not stop_event.is_set():
-            log_queue.put("\n\n🎉🎉🎉 모든 분석 완료! 'critical_issues_report.md' 파일을 확인하세요! 🎉🎉🎉")
+# --- 핵심 분석 로직 (공용 분석 엔진 engine.py 를 호출) ---
+def start_analysis_logic(target_directory, log_queue, stop_event, incremental=False, resume=False, metrics=None,
+                         watch=False, on_cycle=None):
+    """실제 분석을 수행하는 함수. 별도의 스레드에서 실행됩니다.
 
+    watch=True 면 중지할 때까지 폴더를 감시하며 저장된 파일의 기능 유닛만 다시 분석하고, 분석마다 on_cycle(metrics) 를 부릅니다.
+    """
+    # 분석 엔진은 창을 빨리 띄우려고 여기서 불러옴 (보통은 창이 뜬 뒤 startup.warm_up() 이 미리 불러 둠)
+    from engine import EngineError, run_folder_analysis
+    try:
+        if watch:
+            from watcher import watch_folder
+            watch_folder(target_directory, log_queue.put, stop_event, report_path="critical_issues_report.md",
+                         report_header="", on_cycle=on_cycle, metrics_path=METRICS_PATH)
+            return
+        run_folder_analysis(target_directory, log_queue.put, stop_event, report_path="critical_issues_report.md",
+                            report_header="", incremental=incremental, resume=resume,
+                            metrics=metrics, metrics_path=METRICS_PATH)
+    except EngineError as e:
+        log_queue.put(f"오류: {e}")
     except Exception as e:
         log_queue.put(f"\n치명적 오류 발생: 분석 프로세스를 중단합니다. - {e}")
     finally:
-        log_queue.put("ANALYSIS_COMPLETE") # GUI에 종료 신호 전달
+        log_queue.put(COMPLETE_MESSAGE) # GUI에 종료 신호 전달
 
 
 # --- GUI 애플리케이션 클래스 ---
@@ -112,6 +47,7 @@ class App:
 
         self.thread = None
         self.stop_event = threading.Event()
+        self.metrics = None
 
         # 프레임 설정
         top_frame = tk.Frame(root, padx=10, pady=10)
@@ -131,63 +67,95 @@ class App:
         button_frame.pack(fill=tk.X)
         self.start_button = tk.Button(button_frame, text="분석 시작", command=self.start_analysis, bg="lightblue")
         self.start_button.pack(side=tk.LEFT)
+        self.resume_button = tk.Button(button_frame, text="이어서 분석", command=lambda: self.start_analysis(resume=True), bg="lightyellow")
+        self.resume_button.pack(side=tk.LEFT, padx=(5, 0))
         self.stop_button = tk.Button(button_frame, text="분석 중지", command=self.stop_analysis, state=tk.DISABLED, bg="lightcoral")
         self.stop_button.pack(side=tk.LEFT, padx=5)
+        self.incremental_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(button_frame, text="변경된 파일만 분석", variable=self.incremental_var).pack(side=tk.LEFT, padx=10)
+        self.watch_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(button_frame, text="저장할 때 자동 분석(감시)", variable=self.watch_var).pack(side=tk.LEFT)
+
+        # 실시간 지표 패널 (단계별 누적 시간, p50/p95, 토큰, 재시도/오류)
+        metrics_frame = tk.LabelFrame(root, text="실행 지표", padx=10, pady=5)
+        metrics_frame.pack(fill=tk.X, padx=10)
+        self.progress_var = tk.StringVar(value="")
+        self.progress_bar = ttk.Progressbar(metrics_frame, mode="determinate", maximum=1)
+        self.progress_bar.pack(fill=tk.X, pady=(0, 2))
+        tk.Label(metrics_frame, textvariable=self.progress_var, anchor="w").pack(fill=tk.X)
+        self.metrics_var = tk.StringVar(value="분석을 시작하면 단계별 지표가 표시됩니다.")
+        tk.Label(metrics_frame, textvariable=self.metrics_var, justify=tk.LEFT, anchor="w",
+                 font=("Consolas", 9)).pack(fill=tk.X)
 
         # 로그 출력 영역
         log_frame = tk.Frame(root, padx=10, pady=10)
         log_frame.pack(expand=True, fill=tk.BOTH)
         self.log_area = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, state=tk.DISABLED)
         self.log_area.pack(expand=True, fill=tk.BOTH)
+        self.log_pipeline = LogPipeline(self.log_area, LOG_PATH)
 
         # 메시지 큐 설정
         self.log_queue = queue.Queue()
-        self.root.after(100, self.process_queue)
+        self.root.after(POLL_INTERVAL_MS, self.process_queue)
+        self.root.after(METRICS_REFRESH_MS, self.refresh_metrics)
 
     def browse_folder(self):
         directory = filedialog.askdirectory()
         if directory:
             self.path_var.set(directory)
 
-    def start_analysis(self):
+    def start_analysis(self, resume=False):
         target_path = self.path_var.get()
         if not target_path or not os.path.isdir(target_path):
             tk.messagebox.showerror("오류", "유효한 폴더 경로를 선택해주세요.")
             return
         
         self.start_button.config(state=tk.DISABLED)
+        self.resume_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
-        self.log_area.config(state=tk.NORMAL)
-        self.log_area.delete('1.0', tk.END)
+        self.log_pipeline.start()
         
         self.stop_event.clear()
-        self.thread = threading.Thread(target=start_analysis_logic, args=(target_path, self.log_queue, self.stop_event))
+        self.metrics = RunMetrics()
+        self.thread = threading.Thread(target=start_analysis_logic, args=(target_path, self.log_queue, self.stop_event),
+                                       kwargs={"incremental": self.incremental_var.get(), "resume": resume,
+                                               "metrics": self.metrics, "watch": self.watch_var.get() and not resume,
+                                               "on_cycle": self.set_metrics})
         self.thread.start()
 
+    def set_metrics(self, metrics):
+        # 감시 모드에서 분석을 새로 시작할 때마다 작업 스레드가 부름 - 지표 패널은 refresh_metrics 가 다음 틱에 갱신
+        self.metrics = metrics
+
     def stop_analysis(self):
         if self.thread and self.thread.is_alive():
             self.stop_event.set()
             self.stop_button.config(state=tk.DISABLED)
 
     def process_queue(self):
+        # 쌓인 메시지를 틱마다 한 번에 붙임 (로그 창은 최근 줄만 유지, 전체 로그는 LOG_PATH)
         try:
-            while True:
-                message = self.log_queue.get_nowait()
-                if message == "ANALYSIS_COMPLETE":
-                    self.start_button.config(state=tk.NORMAL)
-                    self.stop_button.config(state=tk.DISABLED)
-                else:
-                    self.log_area.config(state=tk.NORMAL)
-                    self.log_area.insert(tk.END, message + "\n")
-                    self.log_area.see(tk.END)
-                    self.log_area.config(state=tk.DISABLED)
-        except queue.Empty:
-            pass
+            if self.log_pipeline.poll(self.log_queue):
+                self.refresh_metrics(reschedule=False)
+                self.start_button.config(state=tk.NORMAL)
+                self.resume_button.config(state=tk.NORMAL)
+                self.stop_button.config(state=tk.DISABLED)
         finally:
-            self.root.after(100, self.process_queue)
+            self.root.after(POLL_INTERVAL_MS, self.process_queue)
+
+    def refresh_metrics(self, reschedule=True):
+        if self.metrics is not None:
+            self.metrics_var.set("\n".join(self.metrics.summary_lines()))
+            done, total, eta = self.metrics.progress()
+            self.progress_bar.config(maximum=max(total, 1), value=min(done, total))
+            self.progress_var.set(format_progress(done, total, eta))
+        if reschedule:
+            self.root.after(METRICS_REFRESH_MS, self.refresh_metrics)
 
 # --- 애플리케이션 실행 ---
 if __name__ == "__main__":
     root = tk.Tk()
     app = App(root)
+    probe_startup(root)
+    schedule_warmup(root)
     root.mainloop()
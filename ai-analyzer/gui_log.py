@@ -0,0 +1,86 @@
+import queue
+
+# --- GUI 로그 파이프라인: 큐에 쌓인 메시지를 틱마다 한 번에 붙이고, 화면에는 최근 줄만 남기며 전체 로그는 파일로 ---
+POLL_INTERVAL_MS = 100          # 로그 큐를 비우는 간격
+DEFAULT_MAX_LINES = 5000        # 로그 창에 남길 최근 줄 수 (그보다 오래된 줄은 로그 파일에서 확인)
+MAX_MESSAGES_PER_TICK = 2000    # 틱 하나에서 처리할 최대 메시지 수 - 나머지는 다음 틱에 (메인 루프가 멈추지 않게)
+COMPLETE_MESSAGE = "ANALYSIS_COMPLETE"
+
+
+class LogPipeline:
+    """ScrolledText 하나에 로그를 붙이는 도우미. 메인(Tk) 스레드에서만 사용합니다.
+
+    메시지마다 insert/see 를 부르지 않고 틱마다 모아서 한 번에 붙이며, 창은 최근 max_lines 줄의 링 버퍼로 유지합니다.
+    log_path 가 있으면 잘려 나간 줄까지 전체 로그를 그 파일에 씁니다.
+    """
+
+    def __init__(self, widget, log_path=None, max_lines=DEFAULT_MAX_LINES):
+        self.widget = widget
+        self.log_path = log_path
+        self.max_lines = max_lines
+        self.log_file = None
+
+    def start(self):
+        """새 분석을 시작할 때 창을 비우고 로그 파일을 새로 엽니다."""
+        self.close()
+        self.widget.config(state="normal")
+        self.widget.delete("1.0", "end")
+        self.widget.config(state="disabled")
+        if self.log_path:
+            self.log_file = open(self.log_path, 'w', encoding='utf-8')
+
+    def close(self):
+        if self.log_file:
+            self.log_file.close()
+            self.log_file = None
+
+    def poll(self, log_queue):
+        """큐에서 메시지를 최대 MAX_MESSAGES_PER_TICK 개 꺼내 한 번에 붙입니다. 종료 신호를 꺼냈으면 True 를 반환합니다."""
+        messages = []
+        complete = False
+        try:
+            while len(messages) < MAX_MESSAGES_PER_TICK:
+                message = log_queue.get_nowait()
+                if message == COMPLETE_MESSAGE:
+                    complete = True
+                    break
+                messages.append(message)
+        except queue.Empty:
+            pass
+        if messages:
+            self.append(messages)
+        if complete:
+            self.close()
+        return complete
+
+    def append(self, messages):
+        if self.log_file:
+            self.log_file.write("\n".join(messages) + "\n")
+            self.log_file.flush()
+        text = "\n".join(messages[-self.max_lines:]) + "\n"
+        self.widget.config(state="normal")
+        self.widget.insert("end", text)
+        # 'end-1c' 는 마지막 빈 줄을 가리키므로 실제 줄 수는 그 줄 번호 - 1
+        excess = int(self.widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+        self.widget.see("end")
+        self.widget.config(state="disabled")
+
+
+def format_progress(done, total, eta_seconds):
+    """진행률 표시 문구. 예) '진행 12/340 (3%) · 남은 시간 약 5분 20초'"""
+    if not total:
+        return "분석 준비 중..."
+    text = f"진행 {min(done, total)}/{total} ({min(done, total) * 100 // total}%)"
+    if done >= total:
+        return text
+    if eta_seconds is None:
+        return text + " · 남은 시간 계산 중"
+    minutes, seconds = divmod(int(eta_seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return text + f" · 남은 시간 약 {hours}시간 {minutes}분"
+    if minutes:
+        return text + f" · 남은 시간 약 {minutes}분 {seconds}초"
+    return text + f" · 남은 시간 약 {seconds}초"
@@ -1,5 +1,4 @@
 import os
-import time
 import tkinter as tk
 from tkinter import filedialog, scrolledtext, messagebox
 from tkinter.font import nametofont
@@ -10,138 +9,43 @@ from ttkbootstrap.constants import *
 from tkinterdnd2 import DND_FILES, TkinterDnD
 
 # --- 백엔드 분석 로직 (AI 관련) ---
-import google.generativeai as genai
-from dotenv import load_dotenv
 import threading
 import queue
 
-# --- 백엔드 로직: 폴더 분석 ---
-def start_folder_analysis_logic(target_directory, log_queue, stop_event):
-    def find_project_files(target_dir, extensions):
-        found_files = []
-        for root, dirs, files in os.walk(target_dir):
-            for file in files:
-                if file.endswith(tuple(extensions)):
-                    full_path = os.path.join(root, file)
-                    found_files.append(full_path)
-        return found_files
-
-    def group_files_by_feature(file_list):
-        feature_groups = {}
-        for file_path in file_list:
-            base_name = os.path.basename(file_path).split('.')[0]
-            feature_name = base_name.replace('Controller', '').replace('Service', '').replace('Mapper', '')
-            if feature_name not in feature_groups:
-                feature_groups[feature_name] = []
-            feature_groups[feature_name].append(file_path)
-        return feature_groups
+from gui_log import COMPLETE_MESSAGE, POLL_INTERVAL_MS, LogPipeline, format_progress
+from metrics import RunMetrics
+from startup import probe_startup, schedule_warmup
+
+LOG_PATH = "analysis_log.txt"       # 로그 창에서 잘려 나간 줄까지 전체 로그를 저장
+PROGRESS_REFRESH_MS = 1000          # 진행률/남은 시간 갱신 간격
 
+# --- 백엔드 로직: 폴더 분석 ---
+def start_folder_analysis_logic(target_directory, log_queue, stop_event, incremental=False, git_range=None, resume=False,
+                                metrics=None):
+    # 분석 엔진은 창을 빨리 띄우려고 분석을 시작할 때 불러옴 (보통은 창이 뜬 뒤 startup.warm_up() 이 미리 불러 둠)
+    from engine import EngineError, run_folder_analysis
     try:
         log_queue.put(f"'{target_directory}' 에서 폴더 전체 분석을 시작합니다...")
-        extensions = ['.java', '.jsp', '.js', '.xml']
-        all_files = find_project_files(target_directory, extensions)
-        
-        if not all_files:
-            log_queue.put("분석할 파일을 찾지 못했습니다.")
-            return
-
-        analysis_units = group_files_by_feature(all_files)
-        total_units = len(analysis_units)
-        log_queue.put(f"🎉 총 {total_units}개의 기능 단위에 대한 분석을 시작합니다.")
-
-        load_dotenv()
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            log_queue.put("오류: GOOGLE_API_KEY를 찾을 수 없습니다.")
-            return
-        genai.configure(api_key=api_key)
-
-        with open("folder_analysis_report.md", "w", encoding='utf-8') as report_file:
-            report_file.write("# AI 코드 분석 보고서 (폴더 전체)\n")
-            for i, (feature_name, files_in_unit) in enumerate(analysis_units.items()):
-                if stop_event.is_set():
-                    log_queue.put("\n!!! 분석이 중지되었습니다 !!!")
-                    break
-                
-                log_queue.put(f"\n[{i+1}/{total_units}] 기능 유닛 '{feature_name}' 분석 중...")
-                combined_code = ""
-                for file_path in files_in_unit:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            combined_code += f"\n\n--- 파일: {os.path.basename(file_path)} ---\n{f.read()}"
-                    except Exception: pass
-                
-                prompt = f"""너는 운영 서버의 심각한 장애를 막기 위해 긴급 투입된 20년차 시니어 아키텍트다. 아래 코드 묶음에서, 오직 운영에 심각한 문제를 일으킬 수 있는 '치명적인 위험'만 찾아내라. [분석 목표]: 1. 치명적인 런타임 오류(NPE 등) 2. 심각한 보안 취약점 3. 대용량 데이터 처리 시 성능 병목. [분석 제외]: 단순 스타일(변수명, 주석, 포맷팅 등)은 절대 언급하지 마라. 결과는 심각도 순서대로 `[심각]`, `[경고]`, `[권장]` 태그를 붙여서 핵심만 요약 보고해라. [분석할 코드 묶음]:\n{combined_code}"""
-                
-                try:
-                    model = genai.GenerativeModel('gemini-2.5-pro')
-                    generation_config = genai.types.GenerationConfig(max_output_tokens=8192)
-                    response = model.generate_content(prompt, 
-                                  generation_config=generation_config,
-                                  request_options={"timeout": 600})
-                    analysis_result = response.text
-                    log_queue.put(f"✅ 분석 완료.")
-                except Exception as e:
-                    analysis_result = f"오류 발생: {e}"
-                    log_queue.put(analysis_result)
-                
-                report_file.write(f"\n\n---\n\n## 💎 기능 유닛: {feature_name}\n\n{analysis_result}")
-                time.sleep(1)
-
-        if not stop_event.is_set():
-            log_queue.put("\n\n🎉🎉🎉 폴더 분석 완료! 'folder_analysis_report.md' 파일을 확인하세요! 🎉🎉🎉")
-
+        run_folder_analysis(target_directory, log_queue.put, stop_event, report_path="folder_analysis_report.md",
+                            incremental=incremental, git_range=git_range, resume=resume, metrics=metrics)
+    except EngineError as e:
+        log_queue.put(f"오류: {e}")
     except Exception as e:
         log_queue.put(f"\n치명적 오류 발생: {e}")
     finally:
-        log_queue.put("ANALYSIS_COMPLETE")
+        log_queue.put(COMPLETE_MESSAGE)
 
 # --- 백엔드 로직: 개별 파일 분석 ---
-def start_file_analysis_logic(file_list, log_queue, stop_event):
+def start_file_analysis_logic(file_list, log_queue, stop_event, metrics=None):
+    from engine import EngineError, run_file_analysis
     try:
-        total_files = len(file_list)
-        log_queue.put(f"총 {total_files}개의 개별 파일 분석을 시작합니다...")
-
-        load_dotenv()
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            log_queue.put("오류: GOOGLE_API_KEY를 찾을 수 없습니다.")
-            return
-        genai.configure(api_key=api_key)
-
-        with open("file_analysis_report.md", "w", encoding='utf-8') as report_file:
-            report_file.write("# AI 코드 분석 보고서 (개별 파일)\n")
-            for i, file_path in enumerate(file_list):
-                if stop_event.is_set():
-                    log_queue.put("\n!!! 분석이 중지되었습니다 !!!")
-                    break
-
-                log_queue.put(f"\n[{i+1}/{total_files}] 파일 '{os.path.basename(file_path)}' 분석 중...")
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        code_to_analyze = f.read()
-                    
-                    prompt = f"""너는 운영 서버의 심각한 장애를 막기 위해 긴급 투입된 20년차 시니어 아키텍트다. 아래 단일 소스코드 파일에서, 오직 운영에 심각한 문제를 일으킬 수 있는 '치명적인 위험'만 찾아내라. [분석 목표]: 1. 치명적인 런타임 오류(NPE 등) 2. 심각한 보안 취약점 3. 대용량 데이터 처리 시 성능 병목. [분석 제외]: 단순 스타일(변수명, 주석, 포맷팅 등)은 절대 언급하지 마라. 결과는 심각도 순서대로 `[심각]`, `[경고]`, `[권장]` 태그를 붙여서 핵심만 요약 보고해라. [분석할 코드]:\n{code_to_analyze}"""
-                    
-                    model = genai.GenerativeModel('gemini-2.5-pro')
-                    response = model.generate_content(prompt, request_options={"timeout": 600})
-                    analysis_result = response.text
-                    log_queue.put(f"✅ 분석 완료.")
-                except Exception as e:
-                    analysis_result = f"오류 발생: {e}"
-                    log_queue.put(analysis_result)
-
-                report_file.write(f"\n\n---\n\n## 📄 분석 파일: {file_path}\n\n{analysis_result}")
-                time.sleep(1)
-
-        if not stop_event.is_set():
-            log_queue.put("\n\n🎉🎉🎉 개별 파일 분석 완료! 'file_analysis_report.md' 파일을 확인하세요! 🎉🎉🎉")
-
+        run_file_analysis(file_list, log_queue.put, stop_event, report_path="file_analysis_report.md", metrics=metrics)
+    except EngineError as e:
+        log_queue.put(f"오류: {e}")
     except Exception as e:
         log_queue.put(f"\n치명적 오류 발생: {e}")
     finally:
-        log_queue.put("ANALYSIS_COMPLETE")
+        log_queue.put(COMPLETE_MESSAGE)
 
 # --- GUI 애플리케이션 클래스 ---
 class App:
@@ -152,6 +56,7 @@ class App:
 
         self.thread = None
         self.stop_event = threading.Event()
+        self.metrics = None
 
         main_frame = ttk.Frame(root, padding=15)
         main_frame.pack(expand=True, fill=BOTH)
@@ -173,15 +78,25 @@ class App:
         self.stop_button = ttk.Button(main_frame, text="⏹️ 분석 중지", command=self.stop_analysis, bootstyle=(DANGER, OUTLINE), state=DISABLED)
         self.stop_button.pack(pady=(10, 0), ipady=5)
 
+        # 진행률 / 남은 시간 (유닛 처리 속도로 계산)
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.pack(fill=X, pady=(10, 0))
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate", maximum=1, bootstyle=(SUCCESS, STRIPED))
+        self.progress_bar.pack(side=LEFT, expand=True, fill=X)
+        self.progress_var = tk.StringVar(value="")
+        ttk.Label(progress_frame, textvariable=self.progress_var, width=36).pack(side=LEFT, padx=(10, 0))
+
         log_frame = ttk.Labelframe(main_frame, text="분석 로그", padding=10)
         log_frame.pack(expand=True, fill=BOTH, pady=10)
         
         self.log_area = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, state=DISABLED)
         self.log_area.configure(bg="#2a2a2a", fg="#cccccc", insertbackground="white", relief="flat", font=("Malgun Gothic", 9))
         self.log_area.pack(expand=True, fill=BOTH)
+        self.log_pipeline = LogPipeline(self.log_area, LOG_PATH)
 
         self.log_queue = queue.Queue()
-        self.root.after(100, self.process_queue)
+        self.root.after(POLL_INTERVAL_MS, self.process_queue)
+        self.root.after(PROGRESS_REFRESH_MS, self.refresh_progress)
 
     def create_folder_tab_widgets(self):
         frame = self.folder_tab
@@ -197,8 +112,21 @@ class App:
         # 유니코드 기호를 아이콘으로 사용
         ttk.Button(path_frame, text="📂 찾아보기", command=self.browse_folder, bootstyle=SECONDARY).pack(side=LEFT, padx=(5, 0))
 
-        self.start_folder_button = ttk.Button(frame, text="▶️ 폴더 분석 시작", command=self.start_folder_analysis, bootstyle=PRIMARY)
-        self.start_folder_button.pack(pady=20, ipady=10, ipadx=20)
+        option_frame = ttk.Frame(frame)
+        option_frame.pack(fill=X, pady=(0, 10))
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(option_frame, text="변경된 파일만 분석 (증분 모드)", variable=self.incremental_var, bootstyle="round-toggle").pack(side=LEFT)
+        ttk.Label(option_frame, text="git 범위 (선택):").pack(side=LEFT, padx=(20, 5))
+        self.git_range_var = tk.StringVar()
+        ttk.Entry(option_frame, textvariable=self.git_range_var, width=20).pack(side=LEFT)
+
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(pady=20)
+        self.start_folder_button = ttk.Button(button_frame, text="▶️ 폴더 분석 시작", command=self.start_folder_analysis, bootstyle=PRIMARY)
+        self.start_folder_button.pack(side=LEFT, ipady=10, ipadx=20)
+        # 중지/종료된 지난 분석을 저널 기준으로 이어서 진행 (완료 유닛은 건너뛰고 실패 유닛은 재시도)
+        self.resume_folder_button = ttk.Button(button_frame, text="⏯️ 이어서 분석", command=lambda: self.start_folder_analysis(resume=True), bootstyle=(PRIMARY, OUTLINE))
+        self.resume_folder_button.pack(side=LEFT, padx=(10, 0), ipady=10, ipadx=10)
 
     def create_file_tab_widgets(self):
         frame = self.file_tab
@@ -262,7 +190,7 @@ class App:
         self.file_listbox.insert(tk.END, "'파일 추가' 버튼을 눌러 선택하세요.")
         self.file_listbox.config(fg="grey")
 
-    def start_folder_analysis(self):
+    def start_folder_analysis(self, resume=False):
         target_path = self.folder_path_var.get()
         if not target_path or not os.path.isdir(target_path):
             messagebox.showerror("오류", "유효한 폴더 경로를 선택해주세요.")
@@ -272,7 +200,10 @@ class App:
 
         # 분석 스레드 직접 시작
         self.stop_event.clear()
-        self.thread = threading.Thread(target=start_folder_analysis_logic, args=(target_path, self.log_queue, self.stop_event))
+        self.thread = threading.Thread(target=start_folder_analysis_logic, args=(target_path, self.log_queue, self.stop_event),
+                                       kwargs={"incremental": self.incremental_var.get(),
+                                               "git_range": self.git_range_var.get().strip() or None,
+                                               "resume": resume, "metrics": self.metrics})
         self.thread.start()
 
     def start_file_analysis(self):
@@ -294,7 +225,8 @@ class App:
         
         # 필터링된, 진짜 파일 목록만 분석 스레드로 전달합니다.
         self.stop_event.clear()
-        self.thread = threading.Thread(target=start_file_analysis_logic, args=(files_to_analyze, self.log_queue, self.stop_event))
+        self.thread = threading.Thread(target=start_file_analysis_logic, args=(files_to_analyze, self.log_queue, self.stop_event),
+                                       kwargs={"metrics": self.metrics})
         self.thread.start()
 
     def disable_ui(self):
@@ -304,8 +236,9 @@ class App:
             self.notebook.tab(i, state="disabled")
         
         self.stop_button.config(state=tk.NORMAL)
-        self.log_area.config(state=tk.NORMAL)
-        self.log_area.delete('1.0', tk.END)
+        self.log_pipeline.start()
+        self.metrics = RunMetrics()
+        self.refresh_progress(reschedule=False)
 
     def enable_ui(self):
         """분석 종료 시 UI 컨트롤들을 다시 활성화합니다."""
@@ -321,20 +254,21 @@ class App:
             self.stop_button.config(state=tk.DISABLED)
 
     def process_queue(self):
+        # 쌓인 메시지를 틱마다 한 번에 붙임 (로그 창은 최근 줄만 유지, 전체 로그는 LOG_PATH)
         try:
-            while True:
-                message = self.log_queue.get_nowait()
-                if message == "ANALYSIS_COMPLETE":
-                    self.enable_ui() # UI 활성화 함수 호출
-                else:
-                    self.log_area.config(state=tk.NORMAL)
-                    self.log_area.insert(tk.END, message + "\n")
-                    self.log_area.see(tk.END)
-                    self.log_area.config(state=tk.DISABLED)
-        except queue.Empty:
-            pass
+            if self.log_pipeline.poll(self.log_queue):
+                self.refresh_progress(reschedule=False)
+                self.enable_ui() # UI 활성화 함수 호출
         finally:
-            self.root.after(100, self.process_queue)
+            self.root.after(POLL_INTERVAL_MS, self.process_queue)
+
+    def refresh_progress(self, reschedule=True):
+        if self.metrics is not None:
+            done, total, eta = self.metrics.progress()
+            self.progress_bar.config(maximum=max(total, 1), value=min(done, total))
+            self.progress_var.set(format_progress(done, total, eta))
+        if reschedule:
+            self.root.after(PROGRESS_REFRESH_MS, self.refresh_progress)
 
 if __name__ == "__main__":
     root = TkinterDnD.Tk()
@@ -346,4 +280,6 @@ if __name__ == "__main__":
     root.option_add("*Font", default_font)
 
     app = App(root)
+    probe_startup(root)
+    schedule_warmup(root)
     root.mainloop()
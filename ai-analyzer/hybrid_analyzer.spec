@@ -10,25 +10,41 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # 분석에 쓰지 않는 빌드/REPL/과학 계산 패키지 - 번들 크기와 시작 시 풀어야 할 양을 줄임
+    excludes=[
+        'setuptools',
+        'pkg_resources',
+        '_distutils_hack',
+        'distutils',
+        '_pyrepl',
+        'pydoc',
+        'doctest',
+        'pdb',
+        'lib2to3',
+        'tkinter.test',
+        'test',
+        'IPython',
+        'matplotlib',
+        'numpy',
+        'pandas',
+    ],
     noarchive=False,
     optimize=0,
 )
 pyz = PYZ(a.pure)
 
+# onefile 대신 onedir: 실행할 때마다 임시 폴더에 의존성 전체를 풀지 않으므로 첫 창이 바로 뜸
+# (배포는 dist/hybrid_analyzer/ 폴더째로)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='hybrid_analyzer',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +52,12 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='hybrid_analyzer',
+)
@@ -0,0 +1,151 @@
+import os
+import json
+import hashlib
+import subprocess
+
+# --- 증분 분석: 이전 실행의 파일 목록(manifest)과 비교해 바뀐 기능 유닛만 다시 분석 ---
+MANIFEST_DIR = ".analysis_cache"
+
+
+def normalize_target_dirs(target_dirs):
+    """폴더 하나(문자열) 또는 여러 개(목록)를 절대 경로 목록으로 맞춥니다."""
+    if isinstance(target_dirs, str):
+        target_dirs = [target_dirs]
+    return [os.path.abspath(target_dir) for target_dir in target_dirs]
+
+
+def manifest_path_for(target_dirs, report_path):
+    """분석 대상 폴더(들) + 리포트 파일 조합마다 manifest 를 따로 둡니다."""
+    key = os.pathsep.join(sorted(normalize_target_dirs(target_dirs))) + "|" + os.path.abspath(report_path)
+    return os.path.join(MANIFEST_DIR, f"manifest-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}.json")
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def hash_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(file_list, previous):
+    """(크기, mtime) 이 그대로인 파일은 이전 해시를 재사용하고, 바뀐 파일만 다시 해시합니다."""
+    manifest = {}
+    for file_path in file_list:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        old = previous.get(file_path)
+        if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+            manifest[file_path] = old
+            continue
+        try:
+            file_hash = hash_file(file_path)
+        except OSError:
+            continue
+        manifest[file_path] = {"size": st.st_size, "mtime": st.st_mtime_ns, "hash": file_hash}
+    return manifest
+
+
+def diff_manifests(previous, current):
+    """내용이 바뀌었거나 새로 생기거나 삭제된 파일 경로 집합."""
+    changed = {p for p, entry in current.items()
+               if p not in previous or previous[p]["hash"] != entry["hash"]}
+    changed.update(p for p in previous if p not in current)
+    return changed
+
+
+def git_changed_files(target_dir, revision_range):
+    """git diff --name-only <revision_range> 결과를 절대 경로 집합으로 돌려줍니다. (삭제된 파일 포함)"""
+    top = subprocess.run(["git", "-C", target_dir, "rev-parse", "--show-toplevel"],
+                         capture_output=True, text=True, check=True).stdout.strip()
+    output = subprocess.run(["git", "-C", target_dir, "diff", "--name-only", revision_range, "--", "."],
+                            capture_output=True, text=True, check=True).stdout
+    return {os.path.normpath(os.path.join(top, line)) for line in output.splitlines() if line.strip()}
+
+
+def plan_incremental_run(target_dirs, all_files, analysis_units, group_func, report_path, git_range=None):
+    """이번 실행에서 다시 분석할 기능 유닛을 고릅니다.
+
+    반환값: (다시 분석할 유닛 dict, 이전 manifest, 현재 manifest, manifest 경로)
+    manifest 가 없으면(첫 실행) 모든 유닛을 분석 대상으로 돌려줍니다.
+    """
+    manifest_path = manifest_path_for(target_dirs, report_path)
+    previous = load_manifest(manifest_path)
+    current = build_manifest(all_files, previous)
+
+    if git_range:
+        found = {os.path.normpath(p): p for p in all_files}
+        known = {os.path.normpath(p): p for p in previous}
+        changed = set()
+        for target_dir in normalize_target_dirs(target_dirs):
+            changed.update(found.get(p) or known.get(p) or p for p in git_changed_files(target_dir, git_range))
+    elif previous:
+        changed = diff_manifests(previous, current)
+    else:
+        return dict(analysis_units), previous, current, manifest_path
+
+    changed_names = set(group_func(sorted(changed)).keys())
+    units_to_analyze = {name: files for name, files in analysis_units.items() if name in changed_names}
+    return units_to_analyze, previous, current, manifest_path
+
+
+def commit_manifest(manifest_path, previous, current, group_func, pending_names):
+    """분석을 끝내지 못한(중지/실패) 유닛의 파일은 이전 기록을 유지해, 다음 실행에서 다시 분석되게 합니다."""
+    pending_names = set(pending_names)
+    manifest = {}
+    for file_path in set(previous) | set(current):
+        source = previous if next(iter(group_func([file_path]))) in pending_names else current
+        if file_path in source:
+            manifest[file_path] = source[file_path]
+    save_manifest(manifest_path, manifest)
+
+
+# --- 리포트 병합: 기존 리포트에서 바뀐 유닛의 섹션만 교체 ---
+def split_report(text, heading):
+    """리포트를 (머리말, {유닛명: 본문}) 으로 나눕니다. heading 예: '## 💎 기능 유닛: '"""
+    separator = f"\n\n---\n\n{heading}"
+    parts = text.split(separator)
+    sections = {}
+    for part in parts[1:]:
+        name, _, body = part.partition("\n\n")
+        sections[name] = body
+    return parts[0], sections
+
+
+def merge_report(report_path, header, heading, new_sections, current_names):
+    """기존 섹션 순서를 유지하며 new_sections 로 교체하고, 새 유닛은 뒤에 붙이고, 사라진 유닛은 지웁니다."""
+    try:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            existing_header, sections = split_report(f.read(), heading)
+        header = existing_header or header
+    except OSError:
+        sections = {}
+
+    current_names = set(current_names)
+    merged = {name: body for name, body in sections.items() if name in current_names}
+    merged.update(new_sections)
+
+    tmp_path = report_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for name, body in merged.items():
+            f.write(f"\n\n---\n\n{heading}{name}\n\n{body}")
+    os.replace(tmp_path, report_path)
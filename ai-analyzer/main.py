@@ -1,107 +1,144 @@
 import os
-import time
-import google.generativeai as genai
-from dotenv import load_dotenv
+import sys
+import argparse
+import threading
 
-# --- 1단계: 프로젝트 설정 ---
-TARGET_DIRECTORY = r"D:\workspace_ifez\ifez\web-user\src\main\java\com\pentachord\ctrl\commissioner" # 사용자님의 실제 경로
-TARGET_EXTENSIONS = ['.java', '.jsp', '.js', '.xml']
+from engine import (DEFAULT_EXTENSIONS, FILE_REPORT_HEADING, FOLDER_REPORT_HEADING, EngineError,
+                    export_report_json, run_file_analysis, run_folder_analysis)
+from findings import export_diff, export_findings
+from metrics import RunMetrics
 
-# --- 2단계: 프로젝트 파일 스캔 ---
-def find_project_files(target_dir, extensions):
-    # (이 부분은 이전과 동일하므로 생략)
-    found_files = []
-    for root, dirs, files in os.walk(target_dir):
-        for file in files:
-            if file.endswith(tuple(extensions)):
-                full_path = os.path.join(root, file)
-                found_files.append(full_path)
-    return found_files
+# --- 헤드리스 CLI: GUI 없이 (CI 빌드 에이전트 등에서) 분석을 실행 ---
+# 예) python main.py ./src/main/java ./src/main/webapp -o critical_issues_report.md --workers 8
+#     python main.py ./src --incremental --git-range origin/main..HEAD
+#     python main.py --files Foo.java bar.jsp --format json
+#     python main.py ./src --diff              (직전 실행과 비교해 신규/해결/심각도 변경만 <리포트명>.diff.md 로 저장)
+#     python main.py ./src --format sarif      (발견 사항 인덱스에서 SARIF 도 함께 저장 - 코드 리뷰 도구 연동용)
+#     python main.py ./src --backend stub      (네트워크 없이 파이프라인만 점검)
+#     python main.py ./src --metrics run_metrics.json   (단계별 시간/토큰/재시도 지표 저장)
+#     python main.py ./src --top 200 --time-budget 90     (정적 검사 점수가 높은 유닛부터, 최대 200개/90분)
+#     python main.py ./src --watch            (저장할 때마다 바뀐 기능 유닛만 다시 분석해 리포트의 그 섹션만 교체, Ctrl+C 로 종료)
+#     python main.py ./src --cascade          (빠른 모델로 먼저 선별하고 위험한 요청만 본 모델로 정밀 분석)
+#     python main.py ./src --plan             (모델을 부르지 않고 요청 수/입출력 토큰/예상 시간만 출력)
+#     python main.py ./src --token-budget 2000000   (위험 점수가 높은 요청부터 입력+출력 200만 토큰 안에서만 분석)
+#     python main.py ./src --hedge            (이번 실행의 p95 보다 늦는 요청은 한 번 더 보내 먼저 온 응답을 씀)
 
-# --- 3단계: 기능 단위 그룹핑 ---
-def group_files_by_feature(file_list):
-    # (이 부분은 이전과 동일하므로 생략)
-    feature_groups = {}
-    for file_path in file_list:
-        base_name = os.path.basename(file_path).split('.')[0]
-        feature_name = base_name.replace('Controller', '').replace('Service', '').replace('Mapper', '')
-        if feature_name not in feature_groups:
-            feature_groups[feature_name] = []
-        feature_groups[feature_name].append(file_path)
-    return feature_groups
 
-# --- 4단계: AI 분석 설정 ---
-load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    print("오류: GOOGLE_API_KEY를 찾을 수 없습니다.")
-    exit()
-genai.configure(api_key=api_key)
+def build_parser():
+    parser = argparse.ArgumentParser(description="AI 코드 위험 분석기 (헤드리스 실행)")
+    parser.add_argument("targets", nargs="+", help="분석할 폴더 경로 (여러 개 가능). --files 와 함께 쓰면 파일 경로")
+    parser.add_argument("--files", action="store_true", help="폴더 대신 개별 파일을 하나씩 분석")
+    parser.add_argument("--ext", default=",".join(DEFAULT_EXTENSIONS),
+                        help="분석할 확장자 (쉼표 구분, 기본값: %(default)s)")
+    parser.add_argument("-o", "--output", default="critical_issues_report.md", help="리포트 파일 경로 (기본값: %(default)s)")
+    parser.add_argument("--format", choices=["md", "json", "html", "sarif"], default="md",
+                        help="md 외의 형식이면 Markdown 리포트와 같은 이름의 .json/.html/.sarif 파일도 함께 저장")
+    parser.add_argument("--diff", nargs="?", const="", metavar="BASELINE",
+                        help="발견 사항을 기준선과 비교 (값 없이 주면 직전 실행, 경로를 주면 그 .findings.sqlite3 의 마지막 실행)")
+    parser.add_argument("--backend", choices=["gemini", "openai", "stub"],
+                        help="모델 백엔드 (기본값: ANALYZER_BACKEND 또는 gemini)")
+    parser.add_argument("--model", help="사용할 모델명 (기본값: 백엔드별 기본 모델)")
+    parser.add_argument("--batch", action="store_true",
+                        help="캐시에 없는 요청을 배치 작업 하나로 제출 (폴더 분석 전용, 결과가 늦게 오는 대신 저렴)")
+    parser.add_argument("--cascade", action="store_const", const=True,
+                        help="빠른 모델(ANALYZER_TRIAGE_MODEL, gemini 는 기본 gemini-2.5-flash)이 먼저 위험도를 매기고 "
+                             "ANALYZER_CASCADE_THRESHOLD(기본 6) 이상이거나 [심각] 후보가 있는 요청만 본 모델로 정밀 분석")
+    parser.add_argument("--hedge", action="store_const", const=True,
+                        help="모델 호출이 이번 실행의 p95(ANALYZER_HEDGE_PERCENTILE) 보다 늦으면 같은 요청을 하나 더 보내 "
+                             "먼저 온 응답을 씀 (꼬리 지연을 줄이는 대신 요청이 조금 늘어남)")
+    parser.add_argument("--workers", type=int, help="동시 요청 수 (기본값: ANALYZER_MAX_WORKERS 또는 4)")
+    parser.add_argument("--rpm", type=int, help="분당 최대 요청 수 (기본값: ANALYZER_REQUESTS_PER_MINUTE 또는 60)")
+    parser.add_argument("--incremental", action="store_true", help="지난 실행 이후 바뀐 기능 유닛만 다시 분석해 리포트에 병합")
+    parser.add_argument("--git-range", help="예: HEAD~5..HEAD - git diff 로 바뀐 파일을 판단 (--incremental 포함)")
+    parser.add_argument("--resume", action="store_true", help="중단된 지난 실행을 이어서 분석")
+    parser.add_argument("--watch", action="store_true",
+                        help="폴더를 감시하며 파일을 저장할 때마다 그 기능 유닛만 다시 분석 (Ctrl+C 로 종료, 폴더 분석 전용)")
+    parser.add_argument("--no-cache", action="store_true", help="분석 결과 캐시를 사용하지 않음")
+    parser.add_argument("--top", type=int, help="정적 검사 위험 점수가 높은 기능 유닛 N개만 분석 (폴더 분석 전용)")
+    parser.add_argument("--min-score", type=int, help="정적 검사 위험 점수가 이 값 이상인 기능 유닛만 분석 (0 이면 모두)")
+    parser.add_argument("--time-budget", type=float, help="분 단위 - 위험한 유닛부터 분석하고 이 시간이 지나면 새 요청을 보내지 않음")
+    parser.add_argument("--token-budget", type=int,
+                        help="입력+출력 토큰 예산 - 위험 점수가 높은 요청부터 이 안에 드는 것만 분석 (기본값: ANALYZER_TOKEN_BUDGET, 폴더 분석 전용)")
+    parser.add_argument("--plan", action="store_true",
+                        help="모델을 부르지 않고 실행 계획(요청 수, 입출력 토큰, 예상 시간, 예산에 드는 요청)만 출력 (폴더 분석 전용)")
+    parser.add_argument("--metrics", help="단계별 시간/토큰/재시도 지표를 저장할 파일 (.json 또는 유닛별 행의 .csv)")
+    return parser
 
-# --- 5단계: 메인 실행 로직 ---
-if __name__ == "__main__":
-    print(f"'{TARGET_DIRECTORY}' 에서 파일 스캔을 시작합니다...")
-    all_files = find_project_files(TARGET_DIRECTORY, TARGET_EXTENSIONS)
-    
-    if not all_files:
-        print("분석할 파일을 찾지 못했습니다.")
-        exit()
-
-    print(f"총 {len(all_files)}개의 파일을 찾았습니다. 기능 단위로 그룹핑합니다...")
-    analysis_units = group_files_by_feature(all_files)
-    total_units = len(analysis_units)
-    print(f"🎉 총 {total_units}개의 기능 단위에 대한 '핵심 위험 분석'을 시작합니다.")
 
-    # 새로운 리포트 파일 이름
-    with open("critical_issues_report.md", "w", encoding='utf-8') as report_file:
-        
-        for i, (feature_name, files_in_unit) in enumerate(analysis_units.items()):
-            print(f"\n[{i+1}/{total_units}] 기능 유닛 '{feature_name}' 분석 중...")
-            
-            combined_code = ""
-            for file_path in files_in_unit:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                    combined_code += f"\n\n--- 파일: {os.path.basename(file_path)} ---\n"
-                    combined_code += file_content
-                except Exception as e:
-                    pass # 오류가 나는 파일은 일단 무시
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    stop_event = threading.Event()
+    metrics = RunMetrics()
+    common = dict(backend_name=args.backend, model_name=args.model, max_workers=args.workers, requests_per_minute=args.rpm,
+                  use_cache=not args.no_cache, metrics=metrics, metrics_path=args.metrics,
+                  cascade=args.cascade, hedge=args.hedge)
+    if args.watch:
+        return watch_main(args, stop_event, common)
+    if args.plan and args.files:
+        print("오류: --plan 은 폴더 분석에서만 쓸 수 있습니다.", file=sys.stderr)
+        return 2
+    try:
+        if args.files:
+            summary = run_file_analysis(args.targets, print, stop_event, report_path=args.output,
+                                        report_header="", **common)
+            heading = FILE_REPORT_HEADING
+        else:
+            extensions = [ext.strip() for ext in args.ext.split(",") if ext.strip()]
+            summary = run_folder_analysis(args.targets, print, stop_event, extensions=extensions,
+                                          report_path=args.output, report_header="",
+                                          incremental=args.incremental, git_range=args.git_range,
+                                          resume=args.resume, batch=args.batch, top_units=args.top,
+                                          min_risk_score=args.min_score,
+                                          time_budget=args.time_budget * 60 if args.time_budget else None,
+                                          token_budget=args.token_budget, plan_only=args.plan, **common)
+            heading = FOLDER_REPORT_HEADING
+            if args.plan:
+                return 0
+    except EngineError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        # Ctrl+C 로 중단하면 남은 유닛은 제출하지 않음 (다음에 --resume 으로 이어서 분석 가능)
+        stop_event.set()
+        print("\n!!! 분석이 중지되었습니다 !!!")
+        return 130
 
-            # ***** 여기가 핵심! 프롬프트를 완전히 교체했습니다 *****
-            prompt = f"""
-            너는 지금 운영 서버의 심각한 장애를 막기 위해 긴급 투입된 20년차 시니어 아키텍트다.
-            아래 코드 묶음에서, **오직 운영에 심각한 문제를 일으킬 수 있는 '치명적인 위험'만** 찾아내야 한다.
-            
-            [분석할 코드 묶음]
-            {combined_code}
-            ---
+    if args.format == "json":
+        json_path = os.path.splitext(args.output)[0] + ".json"
+        export_report_json(args.output, heading, json_path)
+        print(f"JSON 리포트: {json_path}")
+    elif args.format in ("html", "sarif"):
+        export_path = os.path.splitext(args.output)[0] + "." + args.format
+        export_findings(summary["findings_path"], export_path, args.format)
+        print(f"{args.format.upper()} 리포트: {export_path}")
+    if args.diff is not None:
+        diff_path = os.path.splitext(args.output)[0] + ".diff.md"
+        diff = export_diff(summary["findings_path"], diff_path, baseline_path=args.diff or None)
+        print(f"변경 사항: 신규 {len(diff['new'])}건 / 해결 {len(diff['resolved'])}건 / "
+              f"심각도 변경 {len(diff['changed'])}건 ({diff_path})")
+    print(f"완료 {summary['completed']}건 / 실패 {summary['failed']}건 / 요청 {summary['requests']}건")
+    for line in metrics.summary_lines():
+        print(line)
+    if args.metrics:
+        print(f"실행 지표: {args.metrics}")
+    return 1 if summary["failed"] or summary["stopped"] else 0
 
-            [분석 목표 - 이것만 찾아라]
-            1.  **치명적인 런타임 오류:** NullPointerException(NPE), 배열 인덱스 오류, 잘못된 형 변환 등 프로그램 중단을 유발할 수 있는 코드.
-            2.  **심각한 보안 취약점:** SQL Injection, 크로스 사이트 스크립팅(XSS), CSRF 등 외부 공격에 직접적인 빌미를 제공하는 코드.
-            3.  **대용량 데이터 처리 시 성능 병목:** 데이터가 수만 건 이상으로 늘어났을 때 속도가 급격히 저하될 것이 명백한 쿼리(Full Scan 등)나 비효율적인 루프 로직.
-            
-            [분석 제외 - 이것은 절대 언급하지 마라]
-            -   단순 변수명, 메서드명 등 네이밍 스타일
-            -   주석 관련 스타일
-            -   코드 포맷팅 및 줄 바꿈 스타일
-            -   사소한 성능 개선 (예: String '+' 대신 StringBuilder 사용 등)
 
-            결과는 심각도 순서대로 `[심각]`, `[경고]`, `[권장]` 태그를 붙여서 핵심만 요약 보고해라.
-            """
+def watch_main(args, stop_event, common):
+    if args.files:
+        print("오류: --watch 는 폴더 분석에만 쓸 수 있습니다.", file=sys.stderr)
+        return 2
+    from watcher import watch_folder
+    options = {name: value for name, value in common.items() if name != "metrics"}   # 분석마다 새 지표
+    extensions = [ext.strip() for ext in args.ext.split(",") if ext.strip()]
+    try:
+        watch_folder(args.targets, print, stop_event, extensions=extensions, report_path=args.output,
+                     report_header="", **options)
+    except KeyboardInterrupt:
+        stop_event.set()
+        print("\n감시를 종료했습니다.")
+    return 0
 
-            try:
-                model = genai.GenerativeModel('gemini-2.5-pro') # 성공했던 모델명 사용
-                response = model.generate_content(prompt)
-                analysis_result = response.text
-                print(f"✅ 분석 완료. 위험 요소를 리포트에 추가합니다.")
 
-            except Exception as e:
-                analysis_result = f"오류 발생: '{feature_name}' 유닛 분석 중 문제 발생 - {e}"
-                print(analysis_result)
-            
-            report_file.write(f"\n\n---\n\n## 💎 기능 유닛: {feature_name}\n\n{analysis_result}")
-            time.sleep(1) # 1초 휴식
-
-    print("\n\n🎉🎉🎉 핵심 위험 분석 완료! 'critical_issues_report.md' 파일을 확인하세요! 🎉🎉🎉")
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import csv
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# --- 실행 지표: 단계별(스캔/그룹핑/파일 읽기/프롬프트/대기/모델 호출/리포트 쓰기) 시간과 입출력량을 모음 ---
+STAGES = ("scan", "group", "read", "prompt", "wait", "model", "report")   # wait: 속도 제한/재시도 대기
+LATENCY_BUCKETS = (0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)   # 초 - 히스토그램 상한값
+UNIT_CSV_FIELDS = ("unit", "status", "cached", "seconds", "model_seconds", "tokens_in", "tokens_out",
+                   "bytes_in", "bytes_out", "retries", "tier", "error")
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class StageStats:
+    """단계 하나의 소요 시간 히스토그램과 입출력 바이트/토큰 합계."""
+
+    def __init__(self):
+        self.samples = []
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+
+    def add(self, seconds, bytes_in=0, bytes_out=0, tokens_in=0, tokens_out=0):
+        self.samples.append(seconds)
+        self.buckets[next((i for i, limit in enumerate(LATENCY_BUCKETS) if seconds <= limit), len(LATENCY_BUCKETS))] += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.tokens_in += tokens_in
+        self.tokens_out += tokens_out
+
+    def to_dict(self):
+        ordered = sorted(self.samples)
+        labels = [f"<={limit}s" for limit in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            "count": len(ordered),
+            "total": round(sum(ordered), 4),
+            "mean": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+            "p50": round(percentile(ordered, 0.5), 4),
+            "p95": round(percentile(ordered, 0.95), 4),
+            "max": round(ordered[-1], 4) if ordered else 0.0,
+            "histogram": dict(zip(labels, self.buckets)),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+        }
+
+
+class RunMetrics:
+    """실행 하나의 지표를 모읍니다. 여러 작업 스레드에서 함께 기록할 수 있습니다.
+
+    단계 시간은 stage() 로 감싸거나 add_stage() 로 직접 더하고, 유닛별 결과는 record_unit() 으로 남깁니다.
+    GUI 는 분석 중에 summary_lines() 를 읽어 실시간 요약을 보여주고, 끝나면 write() 로 파일에 저장합니다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.stages = {name: StageStats() for name in STAGES}
+        self.units = []
+        self.units_total = 0    # 엔진이 분석할 요청/파일 수를 정하면 set_total() 로 채움
+        self.total_set_at = None
+        self.retries = 0
+        self.errors = {}        # 오류 클래스명 -> 횟수
+        self.hedges = [0, 0]    # (보낸 헤지 요청 수, 헤지 요청의 응답을 쓴 수)
+        self.continuations = 0  # 출력 한도에서 잘린 응답을 이어 받은 횟수
+        self.plan = None        # 폴더 분석이면 실행 전에 set_plan() 으로 채움 (planner.RunPlan.to_dict())
+        self.cascade = None     # 캐스케이드 모드면 끝날 때 set_cascade() 로 채움 (cascade.CascadeStats.summary())
+
+    @contextmanager
+    def stage(self, name, **amounts):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started, **amounts)
+
+    def add_stage(self, name, seconds, **amounts):
+        with self.lock:
+            self.stages.setdefault(name, StageStats()).add(seconds, **amounts)
+
+    def set_total(self, total):
+        with self.lock:
+            self.units_total = total
+            self.total_set_at = time.perf_counter()
+
+    def progress(self):
+        """(끝난 유닛 수, 전체 유닛 수, 남은 예상 초). 예상 시간은 지금까지의 유닛 처리 속도로 계산하며, 아직 모르면 None."""
+        with self.lock:
+            done = len(self.units)
+            total = self.units_total
+            if not total or not done or self.total_set_at is None:
+                return done, total, None
+            elapsed = time.perf_counter() - self.total_set_at
+            return done, total, max(0, total - done) * elapsed / done
+
+    def set_cascade(self, summary):
+        with self.lock:
+            self.cascade = summary
+
+    def add_retry(self, error):
+        with self.lock:
+            self.retries += 1
+            name = type(error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def set_plan(self, plan):
+        with self.lock:
+            self.plan = plan
+
+    def add_continuation(self):
+        with self.lock:
+            self.continuations += 1
+
+    def add_hedge(self, won):
+        with self.lock:
+            self.hedges[0] += 1
+            if won:
+                self.hedges[1] += 1
+
+    def record_unit(self, unit, status, seconds, cached=False, model_seconds=0.0, tokens_in=0, tokens_out=0,
+                    bytes_in=0, bytes_out=0, retries=0, error=None, tier=""):
+        """유닛(또는 요청) 하나의 결과를 기록합니다. error 는 실패 원인이 된 예외, tier 는 결과를 낸 캐스케이드 단계입니다."""
+        with self.lock:
+            if error is not None:
+                name = type(error).__name__
+                self.errors[name] = self.errors.get(name, 0) + 1
+            self.units.append({
+                "unit": unit, "status": status, "cached": cached, "seconds": round(seconds, 4),
+                "model_seconds": round(model_seconds, 4), "tokens_in": tokens_in, "tokens_out": tokens_out,
+                "bytes_in": bytes_in, "bytes_out": bytes_out, "retries": retries, "tier": tier,
+                "error": type(error).__name__ if error is not None else "",
+            })
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "elapsed": round(time.perf_counter() - self.started, 4),
+                "units_done": len(self.units),
+                "units_total": self.units_total,
+                "units_failed": sum(1 for unit in self.units if unit["status"] != "ok"),
+                "cache_hits": sum(1 for unit in self.units if unit["cached"]),
+                "retries": self.retries,
+                "errors": dict(self.errors),
+                "hedges": {"sent": self.hedges[0], "won": self.hedges[1]},
+                "continuations": self.continuations,
+                "plan": dict(self.plan) if self.plan else None,
+                "cascade": dict(self.cascade) if self.cascade else None,
+                "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+                "units": list(self.units),
+            }
+
+    def summary_lines(self):
+        """사람이 읽을 요약 몇 줄 (GUI 실시간 패널, CLI 종료 메시지용)."""
+        data = self.to_dict()
+        lines = [f"경과 {data['elapsed']:.0f}초 / 유닛 {data['units_done']}건 (실패 {data['units_failed']}, "
+                 f"캐시 {data['cache_hits']}) / 재시도 {data['retries']}회"]
+        for name, stats in data["stages"].items():
+            if stats["count"]:
+                lines.append(f"{name:<7} {stats['total']:9.1f}s  p50 {stats['p50']:7.2f}s  p95 {stats['p95']:7.2f}s"
+                             f"  토큰 {stats['tokens_in']:,} → {stats['tokens_out']:,}")
+        cascade = data["cascade"]
+        if cascade:
+            line = f"캐스케이드: 1차 {cascade['triaged']}건 중 정밀 분석 {cascade['escalated']}건"
+            seconds, cost = cascade["saved_seconds"], cascade["saved_cost"]
+            if seconds is not None:
+                line += f" / 모델 시간 약 {abs(seconds):.1f}초 {'절약' if seconds >= 0 else '증가'}"
+            if cost is not None:
+                line += f" / 비용 약 ${abs(cost):.4f} {'절약' if cost >= 0 else '증가'}"
+            lines.append(line)
+        plan = data["plan"] and data["plan"].get("selected", data["plan"])
+        if plan:
+            spent = sum(stats["tokens_in"] + stats["tokens_out"] for stats in data["stages"].values())
+            lines.append(f"계획 대비: 토큰 {spent:,} / 예상 {plan['tokens_in'] + plan['tokens_out']:,}, "
+                         f"시간 {data['elapsed']:.0f}초 / 예상 {plan['seconds']:.0f}초")
+        if data["continuations"]:
+            lines.append(f"출력 한도에서 잘린 응답 {data['continuations']}회를 이어서 받음")
+        if data["hedges"]["sent"]:
+            lines.append(f"헤징: 느린 요청 {data['hedges']['sent']}건을 한 번 더 보냄 (나중 요청이 먼저 끝난 경우 {data['hedges']['won']}건)")
+        if data["errors"]:
+            lines.append("오류: " + ", ".join(f"{name} {count}" for name, count in sorted(data["errors"].items())))
+        return lines
+
+    def write(self, path):
+        """확장자가 .csv 면 유닛별 행을, 그 밖에는 단계 요약과 유닛 목록을 모두 담은 JSON 을 씁니다."""
+        data = self.to_dict()
+        if path.lower().endswith(".csv"):
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=UNIT_CSV_FIELDS)
+                writer.writeheader()
+                writer.writerows(data["units"])
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        return path
@@ -0,0 +1,413 @@
+import io
+import os
+import re
+import mmap
+import codecs
+import itertools
+
+# --- 토큰 예산 설정 (환경 변수 또는 .env 로 덮어쓸 수 있음) ---
+DEFAULT_MAX_UNIT_TOKENS = 120000    # 이보다 큰 기능 유닛은 여러 요청으로 나눔
+DEFAULT_PACK_TOKENS = 12000         # 이보다 작은 유닛들은 이 예산까지 한 요청에 묶음
+DEFAULT_MAX_UNITS_PER_PACK = 8      # 한 요청에 묶는 최대 유닛 수 (결과 분리 정확도를 위해 제한)
+DEFAULT_OVERLAP_LINES = 20          # 나눈 조각끼리 겹치게 할 줄 수
+FILE_HEADER_TOKENS = 16             # '--- 파일: ... ---' 머리말 몫
+DEFAULT_MAX_REQUEST_KB = 2048       # 요청 하나에 담을 소스의 최대 바이트 - 넘으면 뒷부분은 생략
+READ_CHUNK_BYTES = 256 * 1024       # 파일을 이 크기씩 나눠 읽음
+MMAP_THRESHOLD_BYTES = 8 * 1024 * 1024  # 이보다 큰 파일의 줄 범위는 mmap 으로 찾아 읽음
+ENCODING_SAMPLE_BYTES = 64 * 1024
+CANDIDATE_ENCODINGS = ("utf-8", "cp949")    # 차례로 시도하고, 모두 안 맞으면 latin-1 (바이트 손실 없음)
+DEFAULT_SHARED_CONTEXT_KB = 0       # 공유 프로젝트 컨텍스트(공통 클래스/유틸) 최대 크기 - 0 이면 넣지 않음
+SHARED_DIR_NAMES = {"common", "util", "utils", "base", "core", "support"}
+SHARED_NAME_PATTERN = re.compile(r"^(?:Base|Abstract|Common)\w+$|^\w+(?:Util|Utils|Helper|Constants)$")
+
+# 메서드/함수/SQL 문이 시작되는 줄 - 큰 파일은 가능하면 이 경계에서 자름
+BOUNDARY_PATTERN = re.compile(
+    r"^\s*(?:"
+    r"(?:@\w+|(?:public|private|protected|static|final|synchronized)\s)"   # Java 메서드/어노테이션
+    r"|function\b|(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:function|\()"  # JavaScript
+    r"|<(?:select|insert|update|delete|sql|resultMap)\b"                   # MyBatis XML
+    r"|<script\b|<%!?"                                                     # JSP
+    r")"
+)
+UNIT_HEADING_PATTERN = re.compile(r"^#{1,4}\s*유닛\s*[:：]\s*(.+?)\s*$", re.MULTILINE)
+
+
+def load_packing_config():
+    """환경 변수에서 토큰 예산 설정을 읽어옵니다. ANALYZER_PACK_TOKENS=0 이면 묶지 않습니다."""
+    def read_int(name, default):
+        try:
+            return max(0, int(os.getenv(name, default)))
+        except ValueError:
+            return default
+
+    return {
+        "max_unit_tokens": max(1000, read_int("ANALYZER_MAX_UNIT_TOKENS", DEFAULT_MAX_UNIT_TOKENS)),
+        "pack_tokens": read_int("ANALYZER_PACK_TOKENS", DEFAULT_PACK_TOKENS),
+        "max_units_per_pack": max(1, read_int("ANALYZER_MAX_UNITS_PER_PACK", DEFAULT_MAX_UNITS_PER_PACK)),
+        "overlap_lines": read_int("ANALYZER_CHUNK_OVERLAP_LINES", DEFAULT_OVERLAP_LINES),
+        "max_request_bytes": read_int("ANALYZER_MAX_REQUEST_KB", DEFAULT_MAX_REQUEST_KB) * 1024,  # 0 이면 제한 없음
+        "shared_context_bytes": read_int("ANALYZER_SHARED_CONTEXT_KB", DEFAULT_SHARED_CONTEXT_KB) * 1024,
+    }
+
+
+# --- 토큰 수 추정 (모델 호출 없이 로컬에서 대략 계산) ---
+def estimate_tokens(text):
+    """영문/코드는 약 4글자당 1토큰, 한글 등 비ASCII 문자는 1글자당 약 1토큰으로 계산합니다."""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii + 1
+
+
+def estimate_file_tokens(file_path):
+    """파일을 읽지 않고 크기만으로 추정합니다. (UTF-8 한글이 3바이트이므로 보수적으로 3바이트당 1토큰)"""
+    try:
+        return os.path.getsize(file_path) // 3 + FILE_HEADER_TOKENS
+    except OSError:
+        return FILE_HEADER_TOKENS
+
+
+# --- 분석 요청 단위 ---
+class AnalysisRequest:
+    """모델에 한 번 보내는 요청. 기능 유닛 하나, 큰 유닛의 한 조각, 또는 작은 유닛 여러 개를 담습니다.
+
+    units 는 [(유닛명, [(파일 경로, 시작 줄, 끝 줄), ...]), ...] 형태이며
+    줄 번호가 None 이면 파일 전체를 뜻합니다. tokens 는 묶거나 나눌 때 쓴 코드 토큰 추정치입니다.
+    """
+
+    def __init__(self, units, chunk_index=1, chunk_count=1, tokens=0):
+        self.units = units
+        self.chunk_index = chunk_index
+        self.chunk_count = chunk_count
+        self.tokens = tokens
+
+    @property
+    def unit_names(self):
+        return [name for name, _ in self.units]
+
+    @property
+    def packed(self):
+        return len(self.units) > 1
+
+    @property
+    def name(self):
+        if self.packed:
+            return " + ".join(self.unit_names)
+        if self.chunk_count > 1:
+            return f"{self.units[0][0]} ({self.chunk_index}/{self.chunk_count})"
+        return self.units[0][0]
+
+    @property
+    def files(self):
+        return [file_path for _, parts in self.units for file_path, _, _ in parts]
+
+
+def find_split_points(lines, max_tokens):
+    """줄 목록을 max_tokens 이하 조각으로 자를 위치(줄 번호)를 고릅니다. 가능한 한 메서드 경계에서 자릅니다."""
+    cuts = []
+    start = 0
+    while start < len(lines):
+        used = 0
+        end = start
+        last_boundary = None
+        while end < len(lines):
+            used += estimate_tokens(lines[end])
+            if used > max_tokens and end > start:
+                break
+            if end > start and BOUNDARY_PATTERN.match(lines[end]):
+                last_boundary = end
+            end += 1
+        if end < len(lines) and last_boundary is not None and last_boundary > start + (end - start) // 2:
+            end = last_boundary
+        cuts.append((start, end))
+        start = end
+    return cuts
+
+
+def split_oversized_unit(name, files, file_tokens, config):
+    """max_unit_tokens 를 넘는 유닛을 파일 경계로 먼저 나누고, 그래도 큰 파일은 메서드 경계에서 줄 단위로 자릅니다."""
+    budget = config["max_unit_tokens"]
+    chunks = []     # [(조각에 담을 부분들, 토큰 추정치), ...]
+    current, current_tokens = [], 0
+    for file_path in files:
+        tokens = file_tokens[file_path]
+        if tokens > budget:
+            if current:
+                chunks.append((current, current_tokens))
+                current, current_tokens = [], 0
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    lines = f.readlines()
+            except OSError:
+                continue
+            overlap = config["overlap_lines"]
+            for start, end in find_split_points(lines, budget - FILE_HEADER_TOKENS):
+                # 앞 조각과 조금 겹치게 해서 경계에 걸친 로직도 문맥을 잃지 않도록 함
+                start = max(0, start - overlap)
+                chunk_tokens = FILE_HEADER_TOKENS + sum(estimate_tokens(line) for line in lines[start:end])
+                chunks.append(([(file_path, start + 1, end)], chunk_tokens))
+            continue
+        if current and current_tokens + tokens > budget:
+            chunks.append((current, current_tokens))
+            current, current_tokens = [], 0
+        current.append((file_path, None, None))
+        current_tokens += tokens
+    if current:
+        chunks.append((current, current_tokens))
+    return [AnalysisRequest([(name, parts)], i + 1, len(chunks), tokens)
+            for i, (parts, tokens) in enumerate(chunks)]
+
+
+def build_analysis_requests(analysis_units, config=None):
+    """기능 유닛들을 토큰 예산에 맞는 분석 요청 목록으로 바꿉니다.
+
+    큰 유닛은 나누고, 작은 유닛들은 pack_tokens 예산까지 한 요청에 묶습니다(first-fit).
+    결과 순서는 입력 순서에 따라 항상 같으며, 묶인 요청은 목록 뒤쪽에 옵니다.
+    """
+    config = config or load_packing_config()
+    requests = []
+    bins = []   # [[요청에 담을 유닛들], 토큰 합]
+    for name, files in analysis_units.items():
+        file_tokens = {file_path: estimate_file_tokens(file_path) for file_path in files}
+        total = sum(file_tokens.values())
+        if total > config["max_unit_tokens"]:
+            requests.extend(split_oversized_unit(name, files, file_tokens, config))
+        elif total < config["pack_tokens"] and config["max_units_per_pack"] > 1:
+            unit = (name, [(file_path, None, None) for file_path in files])
+            for packed_bin in bins:
+                if packed_bin[1] + total <= config["pack_tokens"] and len(packed_bin[0]) < config["max_units_per_pack"]:
+                    packed_bin[0].append(unit)
+                    packed_bin[1] += total
+                    break
+            else:
+                bins.append([[unit], total])
+        else:
+            requests.append(AnalysisRequest([(name, [(file_path, None, None) for file_path in files])], tokens=total))
+    requests.extend(AnalysisRequest(units, tokens=total) for units, total in bins)
+    return requests
+
+
+# --- 소스 읽기 (인코딩 자동 감지, 나눠 읽기, 바이트 상한) ---
+def detect_encoding(file_path):
+    """파일 앞부분으로 인코딩을 고릅니다. BOM 이 있으면 utf-8-sig, 그 외에는 utf-8 → cp949 → latin-1 순서입니다."""
+    with open(file_path, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    for encoding in CANDIDATE_ENCODINGS:
+        try:
+            # final=False: 표본 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "latin-1"
+
+
+def iter_line_range(f, start_line, end_line):
+    """바이너리 파일에서 start_line~end_line(1부터, 끝 포함) 줄의 바이트를 조각으로 내보냅니다."""
+    size = os.fstat(f.fileno()).st_size
+    if size < MMAP_THRESHOLD_BYTES:
+        yield from itertools.islice(f, start_line - 1, end_line)
+        return
+    # 큰 파일은 줄마다 파이썬 객체를 만들지 않고 mmap 에서 줄바꿈 위치만 찾아 잘라 읽음
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        def skip_lines(position, count):
+            for _ in range(count):
+                position = mm.find(b"\n", position)
+                if position < 0:
+                    return size
+                position += 1
+            return position
+
+        start = skip_lines(0, start_line - 1)
+        end = skip_lines(start, end_line - start_line + 1)
+        for offset in range(start, end, READ_CHUNK_BYTES):
+            yield mm[offset:min(end, offset + READ_CHUNK_BYTES)]
+
+
+def read_part(file_path, start_line=None, end_line=None, max_bytes=None):
+    """파일(또는 줄 범위)을 나눠 읽어 (본문, 읽은 바이트 수, 상한으로 잘렸는지, 인코딩) 을 돌려줍니다.
+
+    인코딩은 detect_encoding() 으로 정하고, 맞지 않는 바이트는 대체 문자로 바꿔 내용을 버리지 않습니다.
+    max_bytes 가 있으면 그만큼만 읽고 나머지는 읽지 않습니다.
+    """
+    encoding = detect_encoding(file_path)
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    buffer = io.StringIO()
+    used = 0
+    truncated = False
+    with open(file_path, 'rb') as f:
+        if start_line is None:
+            chunks = iter(lambda: f.read(READ_CHUNK_BYTES), b"")
+        else:
+            chunks = iter_line_range(f, start_line, end_line)
+        for chunk in chunks:
+            if max_bytes is not None and used + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - used]
+                truncated = True
+            used += len(chunk)
+            buffer.write(decoder.decode(chunk))
+            if truncated:
+                break
+        buffer.write(decoder.decode(b"", final=True))
+    return buffer.getvalue(), used, truncated, encoding
+
+
+# --- 요청 본문과 안내 문구 ---
+def build_request_code(request, max_bytes=None, problems=None):
+    """요청에 담긴 파일(또는 줄 범위)을 읽어 하나의 코드 묶음 문자열로 만듭니다.
+
+    max_bytes(기본값: ANALYZER_MAX_REQUEST_KB)를 넘는 부분은 읽지 않고 생략 표시를 남깁니다.
+    읽을 수 없는 파일, 잘린 파일, UTF-8 이 아닌 파일은 problems 목록에 (파일 경로, 사유) 로 알려줍니다.
+    """
+    if max_bytes is None:
+        max_bytes = load_packing_config()["max_request_bytes"]
+    remaining = max_bytes or None
+    problems = problems if problems is not None else []
+    blocks = []
+    omitted = 0
+    for name, parts in request.units:
+        if request.packed:
+            blocks.append(f"\n\n=== 기능 유닛: {name} ===")
+        for file_path, start_line, end_line in parts:
+            if remaining == 0:
+                omitted += 1
+                continue
+            try:
+                content, used, truncated, encoding = read_part(file_path, start_line, end_line, remaining)
+            except OSError as e:
+                problems.append((file_path, f"읽을 수 없음 - {e}"))
+                continue
+            if encoding not in ("utf-8", "utf-8-sig"):
+                problems.append((file_path, f"{encoding} 인코딩으로 읽음"))
+            label = os.path.basename(file_path)
+            if start_line is not None:
+                label += f" (줄 {start_line}-{end_line})"
+            blocks.append(f"\n\n--- 파일: {label} ---\n{content}")
+            if remaining is not None:
+                remaining -= used
+            if truncated:
+                problems.append((file_path, f"요청 크기 상한({max_bytes // 1024}KB)에서 잘림"))
+                blocks.append(f"\n\n(요청 크기 상한 {max_bytes // 1024}KB 를 넘어 이후 내용은 생략됨)")
+    if omitted:
+        problems.append((request.name, f"요청 크기 상한을 넘어 파일 {omitted}개 생략"))
+    return "".join(blocks)
+
+
+def find_shared_files(file_list):
+    """여러 기능 유닛이 함께 쓰는 공통 코드로 보이는 Java 파일 (common/util 폴더, Base*/Abstract*, *Util/*Helper 등)."""
+    shared = []
+    for file_path in file_list:
+        if not file_path.endswith(".java"):
+            continue
+        folders = {part.lower() for part in os.path.normpath(os.path.dirname(file_path)).split(os.sep)}
+        if folders & SHARED_DIR_NAMES or SHARED_NAME_PATTERN.match(os.path.basename(file_path)[:-5]):
+            shared.append(file_path)
+    return shared
+
+
+def build_shared_context(file_list, max_bytes=None):
+    """공통 코드를 max_bytes(기본값: ANALYZER_SHARED_CONTEXT_KB)까지 담은 공유 컨텍스트 블록. 넣을 것이 없으면 빈 문자열입니다.
+
+    넘치는 파일은 통째로 뺍니다. 반환값: (블록 문자열, 담은 파일 목록)
+    """
+    if max_bytes is None:
+        max_bytes = load_packing_config()["shared_context_bytes"]
+    if not max_bytes:
+        return "", []
+    blocks = []
+    included = []
+    remaining = max_bytes
+    for file_path in find_shared_files(file_list):
+        try:
+            content, used, truncated, _ = read_part(file_path, max_bytes=remaining)
+        except OSError:
+            continue
+        if truncated:
+            continue
+        blocks.append(f"\n\n--- 공통 파일: {os.path.basename(file_path)} ---\n{content}")
+        included.append(file_path)
+        remaining -= used
+    if not blocks:
+        return "", []
+    return ("\n[프로젝트 공통 코드]: 아래는 여러 기능 유닛이 함께 쓰는 공통 클래스/유틸리티다. 분석할 코드가 이것을 "
+            "어떻게 쓰는지 판단할 때만 참고하고, 공통 코드 자체의 문제는 보고하지 마라." + "".join(blocks) + "\n"), included
+
+
+def request_instructions(request):
+    """묶인 요청/나눈 요청일 때 프롬프트에 덧붙일 안내 문구. 일반 요청이면 빈 문자열입니다."""
+    if request.packed:
+        names = ", ".join(request.unit_names)
+        return (f"\n[여러 기능 유닛 묶음]: 아래 코드에는 {len(request.units)}개의 독립된 기능 유닛({names})이 "
+                f"'=== 기능 유닛: 이름 ===' 구분선으로 들어 있다. 유닛마다 반드시 '### 유닛: 이름' 제목을 달고 "
+                f"그 아래에 해당 유닛의 결과만 따로 작성하라. 문제가 없는 유닛도 제목과 '특이사항 없음'을 적어라.\n")
+    if request.chunk_count > 1:
+        return (f"\n[부분 분석]: 아래 코드는 '{request.units[0][0]}' 기능 유닛의 {request.chunk_index}/{request.chunk_count} "
+                f"부분이며 앞 조각과 일부 줄이 겹칠 수 있다. 이 부분에서 보이는 위험만 보고하라.\n")
+    return ""
+
+
+# --- 응답 분리 ---
+def demultiplex_response(text, unit_names):
+    """묶인 요청의 응답을 '### 유닛: 이름' 제목 기준으로 나눠 {유닛명: 결과} 로 돌려줍니다. 못 찾은 유닛은 빠집니다."""
+    wanted = {name.strip(): name for name in unit_names}
+    matches = list(UNIT_HEADING_PATTERN.finditer(text))
+    results = {}
+    for i, match in enumerate(matches):
+        label = match.group(1).strip("*`'\" ")
+        name = wanted.get(label)
+        if name is None:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end():end].strip()
+        results[name] = results[name] + "\n\n" + body if name in results else body
+    return results
+
+
+class ReportAssembler:
+    """요청별 결과를 기능 유닛별 리포트 섹션으로 되돌립니다.
+
+    add() 는 리포트에 쓸 준비가 된 (유닛명, 본문, 성공 여부) 목록을 돌려줍니다.
+    나눈 유닛은 모든 조각이 도착했을 때 조각 순서대로 한 섹션으로 합쳐집니다.
+    """
+
+    def __init__(self):
+        self.pending_chunks = {}
+
+    def add(self, request, result, ok=True):
+        if request.chunk_count > 1:
+            name = request.units[0][0]
+            chunks = self.pending_chunks.setdefault(name, {})
+            chunks[request.chunk_index] = (f"### 부분 {request.chunk_index}/{request.chunk_count}\n\n{result}", ok)
+            if len(chunks) < request.chunk_count:
+                return []
+            del self.pending_chunks[name]
+            chunks = [chunks[index] for index in sorted(chunks)]
+            return [(name, "\n\n".join(text for text, _ in chunks), all(chunk_ok for _, chunk_ok in chunks))]
+
+        if not request.packed:
+            return [(request.units[0][0], result, ok)]
+
+        if not ok:
+            return [(name, result, False) for name in request.unit_names]
+        parts = demultiplex_response(result, request.unit_names)
+        sections = []
+        for name in request.unit_names:
+            if name in parts:
+                sections.append((name, parts[name], True))
+            else:
+                sections.append((name, f"(묶음 요청 응답에서 이 유닛의 결과를 분리하지 못해 전체 응답을 첨부합니다)\n\n{result}", True))
+        return sections
+
+    def flush(self):
+        """아직 모든 조각이 오지 않은 유닛을 실패 섹션으로 돌려주고 비웁니다.
+
+        시간 예산이나 중지로 일부 조각만 분석된 유닛이 리포트와 기록에서 빠지지 않도록, 실행이 끝날 때 부릅니다.
+        도착한 조각은 본문에 남기되 성공으로 치지 않으므로 다음 실행에서 유닛 전체를 다시 분석합니다.
+        """
+        sections = []
+        for name, chunks in self.pending_chunks.items():
+            texts = [chunks[index][0] for index in sorted(chunks)]
+            sections.append((name, f"(분석이 끝나기 전에 멈춰 {len(chunks)}개 조각만 분석했습니다. 다음 실행에서 다시 분석합니다)\n\n"
+                             + "\n\n".join(texts), False))
+        self.pending_chunks = {}
+        return sections
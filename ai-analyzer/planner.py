@@ -0,0 +1,177 @@
+import os
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from backends import MAX_OUTPUT_TOKENS
+from packing import estimate_tokens
+
+# --- 실행 계획: 모델을 부르기 전에 요청 수·입출력 토큰·예상 시간을 계산하고, 예산이 있으면 그 안에서 분석할 요청을 고름 ---
+# 예) python main.py ./src --plan                          (계획만 출력하고 종료)
+#     python main.py ./src --token-budget 2000000 --time-budget 60   (위험한 요청부터 예산 안에서만 분석)
+DEFAULT_OUTPUT_TOKENS_PER_UNIT = 1200   # 유닛 하나의 예상 응답 토큰 (묶음 요청은 유닛 수만큼, MAX_OUTPUT_TOKENS 까지)
+DEFAULT_OUTPUT_TOKENS_PER_SECOND = 60   # 모델의 응답 생성 속도
+DEFAULT_REQUEST_LATENCY = 2.0           # 초 - 첫 토큰까지의 기본 지연
+INPUT_TOKENS_PER_SECOND = 5000          # 입력 처리 속도 (응답 생성보다 훨씬 빨라 고정값으로 둠)
+TOKEN_COUNT_MODES = ("local", "api")
+
+
+def load_plan_config():
+    """환경 변수에서 실행 계획 설정을 읽어옵니다. ANALYZER_TOKEN_COUNT=api 면 백엔드의 토큰 세기 API 로 셉니다. (기본값: local)"""
+    def read_number(name, default, cast=float):
+        try:
+            return max(0, cast(os.getenv(name, default)))
+        except ValueError:
+            return default
+
+    token_count = os.getenv("ANALYZER_TOKEN_COUNT", "local").strip().lower()
+    return {
+        "token_count": token_count if token_count in TOKEN_COUNT_MODES else "local",
+        "output_tokens_per_unit": read_number("ANALYZER_PLAN_OUTPUT_TOKENS", DEFAULT_OUTPUT_TOKENS_PER_UNIT, int),
+        "output_tokens_per_second": read_number("ANALYZER_PLAN_OUTPUT_TPS", DEFAULT_OUTPUT_TOKENS_PER_SECOND) or 1,
+        "latency": read_number("ANALYZER_PLAN_LATENCY", DEFAULT_REQUEST_LATENCY),
+        "token_budget": read_number("ANALYZER_TOKEN_BUDGET", 0, int) or None,   # 입력+출력 토큰, 0 이면 제한 없음
+    }
+
+
+class PlannedRequest:
+    """요청 하나의 예상 비용. cached 면 결과 캐시에 있어 모델을 부르지 않으므로 토큰과 시간은 0 으로 셉니다.
+    group 이 같은 요청(한 유닛을 나눈 조각들)은 예산 안에서 함께 고르거나 함께 뺍니다."""
+
+    def __init__(self, index, name, tokens_in, tokens_out, seconds, cached, value, group=None):
+        self.index = index
+        self.name = name
+        self.group = group if group is not None else ("request", index)
+        self.tokens_in = tokens_in
+        self.tokens_out = tokens_out
+        self.seconds = seconds
+        self.cached = cached
+        self.value = value      # 정적 검사 위험 점수 - 예산이 모자라면 높은 요청부터 고름
+
+    @property
+    def tokens(self):
+        return 0 if self.cached else self.tokens_in + self.tokens_out
+
+
+def estimate_wall_seconds(seconds_list, max_workers, requests_per_minute):
+    """요청을 순서대로 빈 작업자에게 맡긴다고 보고 전체 시간을 계산합니다. 분당 요청 수 제한보다 빠를 수는 없습니다."""
+    workers = [0.0] * max(1, min(max_workers, len(seconds_list)))
+    for seconds in seconds_list:
+        heapq.heappush(workers, heapq.heappop(workers) + seconds)
+    return max(max(workers, default=0.0), len(seconds_list) * 60 / requests_per_minute)
+
+
+class RunPlan:
+    """실행 하나의 계획. 요청별 예상 비용을 모아 합계와 예상 시간을 내고, 예산에 맞춰 분석할 요청을 고릅니다."""
+
+    def __init__(self, requests, max_workers, requests_per_minute, token_count="local"):
+        self.requests = requests
+        self.max_workers = max_workers
+        self.requests_per_minute = requests_per_minute
+        self.token_count = token_count
+
+    def totals(self, requests=None):
+        requests = self.requests if requests is None else requests
+        sent = [request for request in requests if not request.cached]
+        return {
+            "requests": len(requests),
+            "cached": len(requests) - len(sent),
+            "tokens_in": sum(request.tokens_in for request in sent),
+            "tokens_out": sum(request.tokens_out for request in sent),
+            "seconds": round(estimate_wall_seconds([request.seconds for request in sent], self.max_workers,
+                                                   self.requests_per_minute), 1),
+        }
+
+    def select(self, token_budget=None, time_budget=None):
+        """위험 점수가 높은 요청부터 예산(토큰, 초)에 들어가는 것만 고릅니다. 하나가 넘치면 건너뛰고 더 작은 요청을 계속 봅니다.
+
+        한 유닛을 나눈 조각들은 한 덩어리로 보고, 모두 들어갈 때만 고릅니다(일부 조각만 분석한 유닛이 생기지 않도록).
+        캐시된 요청은 예산을 쓰지 않습니다. 고른 요청 번호를 원래 순서대로 돌려줍니다.
+        """
+        groups = {}
+        for request in self.requests:
+            groups.setdefault(request.group, []).append(request)
+        selected = []
+        tokens = 0
+        work = 0.0      # 작업자 전체의 모델 시간 합 - 예상 시간은 이를 동시 요청 수로 나눈 값으로 봄
+        for members in sorted(groups.values(), key=lambda members: -max(request.value for request in members)):
+            group_tokens = sum(request.tokens for request in members)
+            group_work = sum(request.seconds for request in members if not request.cached)
+            if token_budget and tokens + group_tokens > token_budget:
+                continue
+            if time_budget and group_work and (work + group_work) / self.max_workers > time_budget:
+                continue
+            tokens += group_tokens
+            work += group_work
+            selected.extend(request.index for request in members)
+        return sorted(selected)
+
+    def summary_lines(self, selected=None):
+        totals = self.totals()
+        cached = "캐시 확인 생략" if self.token_count == "size" else f"캐시 {totals['cached']}개"
+        counted = {"api": "API", "size": "파일 크기 추정"}.get(self.token_count, "추정")
+        lines = [f"📋 실행 계획: 요청 {totals['requests']}개({cached}) / 입력 약 {totals['tokens_in']:,}토큰 / "
+                 f"출력 약 {totals['tokens_out']:,}토큰 / 예상 {format_minutes(totals['seconds'])} "
+                 f"(동시 {self.max_workers}, 분당 {self.requests_per_minute}, 토큰 {counted})"]
+        if selected is not None and len(selected) < len(self.requests):
+            chosen = self.totals([self.requests[index] for index in selected])
+            lines.append(f"예산에 맞춰 위험 점수가 높은 요청 {chosen['requests']}개만 분석합니다: 입력 약 {chosen['tokens_in']:,}토큰 / "
+                         f"출력 약 {chosen['tokens_out']:,}토큰 / 예상 {format_minutes(chosen['seconds'])}")
+        return lines
+
+    def to_dict(self, selected=None):
+        data = {"token_count": self.token_count, "max_workers": self.max_workers,
+                "requests_per_minute": self.requests_per_minute, **self.totals()}
+        if selected is not None:
+            data["selected"] = self.totals([self.requests[index] for index in selected])
+        return data
+
+
+def format_minutes(seconds):
+    return f"{seconds / 60:.1f}분" if seconds >= 60 else f"{seconds:.0f}초"
+
+
+def count_tokens(backend, prompts, mode, max_workers):
+    """프롬프트마다 입력 토큰 수. api 모드면 백엔드의 토큰 세기 API 를 쓰고, 지원하지 않거나 실패하면 로컬 추정으로 셉니다."""
+    def count(prompt):
+        if mode == "api":
+            try:
+                tokens = backend.count_tokens(prompt)
+            except Exception:
+                tokens = None
+            if tokens is not None:
+                return tokens
+        return estimate_tokens(prompt)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="planner") as executor:
+        return list(executor.map(count, prompts))
+
+
+def plan_run(analysis_requests, render_prompt, is_cached, values, context_tokens, backend, runner_config, config=None):
+    """요청마다 프롬프트를 만들어 입력 토큰을 세고, 예상 응답 토큰과 모델 시간을 붙여 RunPlan 을 만듭니다.
+
+    render_prompt(request) 는 실제 요청과 같은 프롬프트를, is_cached(prompt) 는 결과 캐시에 있는지를,
+    values[i] 는 i 번째 요청의 위험 점수를 줍니다. context_tokens 는 요청마다 함께 세는 공통 지시문 몫입니다.
+    render_prompt 가 None 이면 소스를 읽지 않고 묶을 때 쓴 파일 크기 추정치(request.tokens)로 세며, 캐시 확인은 생략합니다.
+    """
+    config = config or load_plan_config()
+    token_count = config["token_count"] if render_prompt else "size"
+    planned = []
+    for start in range(0, len(analysis_requests), 64):     # 프롬프트를 한꺼번에 들고 있지 않도록 나눠서 셈
+        batch = analysis_requests[start:start + 64]
+        if render_prompt:
+            prompts = [render_prompt(request) for request in batch]
+            counts = count_tokens(backend, prompts, config["token_count"], runner_config["max_workers"])
+        else:
+            prompts = [None] * len(batch)
+            counts = [request.tokens for request in batch]
+        for offset, (request, prompt, tokens) in enumerate(zip(batch, prompts, counts)):
+            index = start + offset
+            tokens_in = tokens + context_tokens
+            tokens_out = min(MAX_OUTPUT_TOKENS, config["output_tokens_per_unit"] * len(request.unit_names))
+            seconds = (config["latency"] + tokens_in / INPUT_TOKENS_PER_SECOND
+                       + tokens_out / config["output_tokens_per_second"])
+            group = ("unit", request.units[0][0]) if request.chunk_count > 1 else None
+            cached = prompt is not None and is_cached(prompt)
+            planned.append(PlannedRequest(index, request.name, tokens_in, tokens_out, seconds, cached, values[index],
+                                          group))
+    return RunPlan(planned, runner_config["max_workers"], runner_config["requests_per_minute"], token_count)
@@ -0,0 +1,132 @@
+import os
+import re
+
+from packing import read_part
+
+# --- 정적 사전 검사: 모델에 보내기 전에 정규식 규칙으로 위험 패턴을 찾아 유닛 점수를 매김 ---
+MAX_HITS_PER_RULE = 5           # 파일 하나에서 규칙 하나가 점수에 더해지는 최대 횟수
+MAX_HINTS_PER_REQUEST = 20      # 프롬프트에 넣을 힌트 줄 수 상한
+LOOP_WINDOW_LINES = 15          # 반복문 시작 후 이 줄 수 안의 selectList 는 반복 조회로 봄
+LOOP_PATTERN = re.compile(r"^\s*(?:for|while)\s*\(|\.forEach\s*\(")
+
+# (규칙 id, 대상 확장자, 정규식, 가중치, 힌트 문구)
+RULES = [
+    ("mapper-dollar", (".xml",), re.compile(r"\$\{[^}]+\}"), 10,
+     "${} 문자열 치환 - SQL 인젝션 가능"),
+    ("sql-concat", (".java", ".jsp"),
+     re.compile(r'"[^"]*\b(?:SELECT|INSERT|UPDATE|DELETE|WHERE|AND|OR|FROM|ORDER BY)\b[^"]*"\s*\+'
+                r'|\+\s*"[^"]*\b(?:WHERE|AND|OR|FROM|VALUES|ORDER BY)\b'), 8,
+     "문자열 연결로 만든 SQL - SQL 인젝션 가능"),
+    ("jsp-unescaped", (".jsp",),
+     re.compile(r"<%=(?!\s*(?:ESAPI|StringEscapeUtils|Encode)\b)|\$\{\s*param(?:Values)?\.|out\.print(?:ln)?\s*\(\s*request\.getParameter"), 6,
+     "이스케이프 없는 출력 - XSS 가능"),
+    ("selectlist-unbounded", (".java",), re.compile(r"\.selectList\s*\([^,()]*(?:,[^,()]*)?\)"), 2,
+     "페이징 없는 selectList - 대용량 조회 가능"),
+    ("null-deref", (".java", ".jsp"),
+     re.compile(r"\b(?:getParameter|getAttribute|getHeader|get)\s*\([^()]*\)\s*\.\s*"
+                r"(?:equals|toString|trim|length|intValue|longValue|split|substring|isEmpty)\s*\("), 3,
+     "null 확인 없이 바로 호출 - NPE 가능"),
+]
+SELECT_IN_LOOP = ("selectlist-loop", 6, "반복문 안의 selectList - N+1 조회")
+
+
+def load_prefilter_config():
+    """ANALYZER_PREFILTER=0 이면 정적 검사와 프롬프트 힌트를 끕니다."""
+    return {"enabled": os.getenv("ANALYZER_PREFILTER", "1").strip().lower() not in ("0", "false", "off", "no")}
+
+
+def scan_file(file_path):
+    """파일 하나에서 규칙에 걸린 줄을 [(줄 번호, 규칙 id, 가중치, 힌트 문구), ...] 로 돌려줍니다."""
+    rules = [rule for rule in RULES if file_path.endswith(rule[1])]
+    if not rules:
+        return []
+    try:
+        text = read_part(file_path)[0]
+    except OSError:
+        return []
+    hits = []
+    last_loop = None
+    for number, line in enumerate(text.splitlines(), 1):
+        if LOOP_PATTERN.search(line):
+            last_loop = number
+        for rule_id, _, pattern, weight, hint in rules:
+            if not pattern.search(line):
+                continue
+            if rule_id == "selectlist-unbounded" and last_loop is not None and number - last_loop <= LOOP_WINDOW_LINES:
+                rule_id, weight, hint = SELECT_IN_LOOP
+            hits.append((number, rule_id, weight, hint))
+    return hits
+
+
+def score_hits(hits):
+    counts = {}
+    score = 0
+    for _, rule_id, weight, _ in hits:
+        counts[rule_id] = counts.get(rule_id, 0) + 1
+        if counts[rule_id] <= MAX_HITS_PER_RULE:
+            score += weight
+    return score
+
+
+def score_units(analysis_units):
+    """기능 유닛마다 (위험 점수, {파일 경로: 힌트 목록}) 을 계산합니다. 점수가 0 이면 규칙에 걸린 곳이 없다는 뜻입니다."""
+    results = {}
+    for name, files in analysis_units.items():
+        file_hits = {file_path: scan_file(file_path) for file_path in files}
+        file_hits = {file_path: hits for file_path, hits in file_hits.items() if hits}
+        results[name] = (sum(score_hits(hits) for hits in file_hits.values()), file_hits)
+    return results
+
+
+def select_units(analysis_units, scores, top_n=None, min_score=None):
+    """위험 점수가 높은 순서로 유닛을 다시 정렬하고, min_score 미만은 빼고 top_n 개까지만 남깁니다. (점수가 같으면 원래 순서)"""
+    ranked = sorted(analysis_units, key=lambda name: -scores[name][0])
+    if min_score is not None:
+        ranked = [name for name in ranked if scores[name][0] >= min_score]
+    if top_n is not None:
+        ranked = ranked[:top_n]
+    return {name: analysis_units[name] for name in ranked}
+
+
+def request_score(request, scores):
+    """요청에 담긴 유닛 중 가장 높은 위험 점수. 점수가 없는 유닛은 0 으로 봅니다."""
+    return max((scores.get(name, (0,))[0] for name in request.unit_names), default=0)
+
+
+def order_requests(requests, scores):
+    """묶고 나눈 뒤의 요청을 위험 점수가 높은 순서로 다시 정렬합니다.
+
+    묶음 요청은 보통 뒤에 붙으므로, 이렇게 해야 시간 예산이 끝날 때 위험한 작은 유닛이 먼저 잘리지 않습니다.
+    점수가 같으면 원래 순서를 지키므로 한 유닛을 나눈 조각들은 그대로 붙어 있습니다.
+    """
+    return sorted(requests, key=lambda request: -request_score(request, scores))
+
+
+def merge_line_ranges(hits):
+    """같은 규칙이 이어진 줄에 걸리면 한 범위로 합쳐 [(시작 줄, 끝 줄, 힌트 문구), ...] 로 돌려줍니다."""
+    ranges = []
+    for number, rule_id, _, hint in sorted(hits, key=lambda hit: (hit[1], hit[0])):
+        if ranges and ranges[-1][3] == rule_id and number <= ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number, hint, rule_id])
+    return sorted((start, end, hint) for start, end, hint, _ in ranges)
+
+
+def request_hints(request, scores):
+    """요청에 담긴 파일(조각이면 그 줄 범위)에서 걸린 위치를 프롬프트 안내 문구로 만듭니다. 없으면 빈 문자열입니다."""
+    lines = []
+    for name, parts in request.units:
+        file_hits = scores.get(name, (0, {}))[1]
+        for file_path, start_line, end_line in parts:
+            for start, end, hint in merge_line_ranges(file_hits.get(file_path, [])):
+                if start_line is not None and not (start_line <= start <= end_line):
+                    continue
+                where = f"줄 {start}" if start == end else f"줄 {start}-{end}"
+                lines.append(f"- {os.path.basename(file_path)} {where}: {hint}")
+    if not lines:
+        return ""
+    if len(lines) > MAX_HINTS_PER_REQUEST:
+        lines = lines[:MAX_HINTS_PER_REQUEST] + [f"- (외 {len(lines) - MAX_HINTS_PER_REQUEST}곳)"]
+    return ("\n[정적 검사 힌트]: 로컬 정적 검사에서 아래 위치에 위험 패턴이 보였다. 이 부분을 먼저 확인하되, "
+            "실제로 위험하지 않으면 보고하지 마라.\n" + "\n".join(lines) + "\n")
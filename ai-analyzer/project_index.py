@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import hashlib
+
+from packing import estimate_file_tokens, find_shared_files, load_packing_config, read_part
+
+# --- 프로젝트 색인: import / MyBatis namespace / JSP-컨트롤러 URL 연결을 찾아 서로 쓰는 파일을 한 기능 유닛으로 묶음 ---
+INDEX_DIR = ".analysis_cache"
+DEFAULT_MAX_UNIT_FILES = 12     # 연결을 따라 묶을 때 유닛 하나의 최대 파일 수
+HUB_FAN_IN = 6                  # 이보다 많은 파일이 참조하는 클래스는 공통 코드로 보고 연결하지 않음
+STATIC_SUFFIXES = (".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", ".woff", ".woff2", ".map")
+
+PACKAGE_PATTERN = re.compile(r"^\s*package\s+([\w.]+)\s*;", re.MULTILINE)
+IMPORT_PATTERN = re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)(?:\.\*)?\s*;", re.MULTILINE)
+TYPE_NAME_PATTERN = re.compile(r"\b[A-Z]\w*")
+CLASS_DECL_PATTERN = re.compile(r"\b(?:class|interface|enum)\s+\w+")
+MAPPING_PATTERN = re.compile(r"@(?:Request|Get|Post|Put|Delete|Patch)Mapping\s*(?:\(([^)]*)\))?")
+STRING_PATTERN = re.compile(r'"([^"]*)"')
+VIEW_PATTERN = re.compile(r'(?:return\s+|ModelAndView\s*\(\s*|setViewName\s*\(\s*)"([\w\-/]+)"')
+NAMESPACE_PATTERN = re.compile(r'<mapper\s+[^>]*namespace\s*=\s*"([\w.$]+)"')
+# JSP/JS 안의 URL - 컨텍스트 경로 표현식(${pageContext.request.contextPath}, <%= request.getContextPath() %>)은 떼어 냄
+URL_PATTERN = re.compile(r"""["'`](?:\$\{[^}]*\}|<%=[^%]*%>)?(/[\w\-./{}]+)""")
+
+
+def load_grouping_config():
+    """ANALYZER_GROUPING=name 이면 예전처럼 파일명 규칙으로만 묶습니다. (기본값: graph)"""
+    try:
+        max_files = max(1, int(os.getenv("ANALYZER_MAX_UNIT_FILES", DEFAULT_MAX_UNIT_FILES)))
+    except ValueError:
+        max_files = DEFAULT_MAX_UNIT_FILES
+    return {
+        "mode": "name" if os.getenv("ANALYZER_GROUPING", "graph").strip().lower() == "name" else "graph",
+        "max_unit_files": max_files,
+    }
+
+
+# --- 1. 파일별 사실(facts) 추출 ---
+def normalize_url(url):
+    """'/user/list.do?id=1' -> '/user/list'. 끝의 / 와 .do/.action 확장자, 쿼리를 뗍니다."""
+    url = re.sub(r"/+", "/", url.split("?", 1)[0].split("#", 1)[0])
+    url = re.sub(r"\.(?:do|action|html?)$", "", url)
+    return url.rstrip("/") or "/"
+
+
+def join_url(prefix, path):
+    return normalize_url(f"/{prefix}/{path}")
+
+
+def annotation_paths(arguments):
+    """@RequestMapping(...) 괄호 안의 경로 문자열들. 괄호가 없으면 ['']"""
+    if arguments is None:
+        return [""]
+    paths = STRING_PATTERN.findall(arguments)
+    return paths or [""]
+
+
+def parse_java(text):
+    facts = {"imports": IMPORT_PATTERN.findall(text), "types": sorted(set(TYPE_NAME_PATTERN.findall(text)))}
+    package = PACKAGE_PATTERN.search(text)
+    facts["package"] = package.group(1) if package else ""
+    declaration = CLASS_DECL_PATTERN.search(text)
+    if declaration and "Mapping" in text:
+        # 클래스 위의 @RequestMapping 은 접두사, 클래스 안의 것은 메서드 경로
+        prefixes = [""]
+        for match in MAPPING_PATTERN.finditer(text, 0, declaration.start()):
+            prefixes = annotation_paths(match.group(1))
+        facts["urls"] = sorted({join_url(prefix, path) for match in MAPPING_PATTERN.finditer(text, declaration.end())
+                                for prefix in prefixes for path in annotation_paths(match.group(1))})
+        facts["views"] = sorted(set(VIEW_PATTERN.findall(text)))
+    return facts
+
+
+def parse_file(file_path):
+    text = read_part(file_path)[0]
+    if file_path.endswith(".java"):
+        return parse_java(text)
+    if file_path.endswith(".xml"):
+        namespace = NAMESPACE_PATTERN.search(text)
+        return {"namespace": namespace.group(1) if namespace else ""}
+    if file_path.endswith((".jsp", ".js")):
+        urls = {normalize_url(url) for url in URL_PATTERN.findall(text) if not url.lower().endswith(STATIC_SUFFIXES)}
+        return {"refs": sorted(urls)}
+    return {}
+
+
+def index_path_for(file_list):
+    root = os.path.commonpath([os.path.abspath(p) for p in file_list]) if file_list else ""
+    return os.path.join(INDEX_DIR, f"project-index-{hashlib.sha1(root.encode('utf-8')).hexdigest()[:12]}.json")
+
+
+def build_project_index(file_list, index_path=None):
+    """파일마다 import/URL/namespace 등을 뽑아 {파일 경로: facts} 로 돌려줍니다.
+
+    (크기, mtime) 이 그대로인 파일은 지난 실행의 색인을 재사용하고, 결과는 다시 저장합니다.
+    """
+    index_path = index_path or index_path_for(file_list)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    index = {}
+    for file_path in file_list:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        old = previous.get(file_path)
+        if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+            index[file_path] = old
+            continue
+        try:
+            facts = parse_file(file_path)
+        except OSError:
+            continue
+        index[file_path] = {"size": st.st_size, "mtime": st.st_mtime_ns, "facts": facts}
+    if index != previous:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(tmp_path, index_path)
+    return {file_path: entry["facts"] for file_path, entry in index.items()}
+
+
+# --- 2. 연결(edge) 찾기 ---
+def find_edges(index):
+    """같이 분석해야 할 파일 쌍을 강한 연결부터 돌려줍니다: Mapper XML-인터페이스 → 컨트롤러-JSP(뷰 이름) → URL → import."""
+    classes = {}        # 정규화된 클래스명(FQN) -> 파일
+    by_package = {}     # 패키지 -> {단순 클래스명: 파일}
+    for file_path, facts in index.items():
+        if file_path.endswith(".java"):
+            simple = os.path.splitext(os.path.basename(file_path))[0]
+            classes[f"{facts['package']}.{simple}".lstrip(".")] = file_path
+            by_package.setdefault(facts["package"], {})[simple] = file_path
+
+    mapper_edges = [(file_path, classes[facts["namespace"]]) for file_path, facts in index.items()
+                    if facts.get("namespace") in classes]
+
+    views = {}          # 'user/list' 처럼 경로 끝부분 -> JSP 파일
+    for file_path in index:
+        if file_path.endswith(".jsp"):
+            parts = os.path.splitext(file_path)[0].replace(os.sep, "/").split("/")
+            for depth in range(1, min(4, len(parts)) + 1):
+                views.setdefault("/".join(parts[-depth:]), file_path)
+    view_edges = [(file_path, views[view.strip("/")]) for file_path, facts in index.items()
+                  for view in facts.get("views", []) if view.strip("/") in views]
+
+    routes = {}         # URL -> 컨트롤러 파일 ({id} 같은 경로 변수는 정규식으로)
+    patterns = []
+    for file_path, facts in index.items():
+        for url in facts.get("urls", []):
+            if "{" in url:
+                patterns.append((re.compile(re.sub(r"\\\{[^/]*?\\\}", "[^/]+", re.escape(url)) + "$"), file_path))
+            else:
+                routes.setdefault(url, file_path)
+    url_edges = []
+    for file_path, facts in index.items():
+        for ref in facts.get("refs", []):
+            target = routes.get(ref) or next((target for pattern, target in patterns if pattern.match(ref)), None)
+            if target:
+                url_edges.append((file_path, target))
+
+    import_edges = []
+    for file_path, facts in index.items():
+        if not file_path.endswith(".java"):
+            continue
+        targets = {classes[name] for name in facts["imports"] if name in classes}
+        same_package = by_package.get(facts["package"], {})
+        targets.update(same_package[name] for name in facts["types"] if name in same_package)
+        import_edges.extend((file_path, target) for target in sorted(targets) if target != file_path)
+    # 여러 곳에서 참조하는 클래스(공통 코드, 허브)는 연결하지 않음 - 유닛 하나에 몰리지 않게
+    fan_in = {}
+    for _, target in import_edges:
+        fan_in[target] = fan_in.get(target, 0) + 1
+    import_edges = [(source, target) for source, target in import_edges if fan_in[target] <= HUB_FAN_IN]
+    return mapper_edges + view_edges + url_edges + import_edges
+
+
+# --- 3. 크기 제한이 있는 연결 요소(connected component)로 묶기 ---
+def group_by_graph(file_list, name_groups, config=None):
+    """파일명 규칙으로 묶은 name_groups 에서 시작해, 연결된 유닛끼리 크기 한도 안에서 합칩니다.
+
+    한도(파일 수 ANALYZER_MAX_UNIT_FILES, 토큰 ANALYZER_MAX_UNIT_TOKENS)를 넘기는 연결은 건너뜁니다.
+    공통 코드(find_shared_files)는 연결하지 않습니다. 유닛 이름은 합쳐진 유닛 중 가장 큰 것의 이름입니다.
+    """
+    config = config or load_grouping_config()
+    max_tokens = load_packing_config()["max_unit_tokens"]
+    shared = set(find_shared_files(file_list))
+    parent = {}
+    size = {}
+    tokens = {}
+    owner = {}
+    for name, files in name_groups.items():
+        parent[name] = name
+        size[name] = len(files)
+        tokens[name] = sum(estimate_file_tokens(file_path) for file_path in files)
+        for file_path in files:
+            owner[file_path] = name
+
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for source, target in find_edges(build_project_index(file_list)):
+        if source in shared or target in shared:
+            continue
+        a, b = find(owner[source]), find(owner[target])
+        if a == b or size[a] + size[b] > config["max_unit_files"] or tokens[a] + tokens[b] > max_tokens:
+            continue
+        if size[b] > size[a]:
+            a, b = b, a
+        parent[b] = a
+        size[a] += size[b]
+        tokens[a] += tokens[b]
+
+    # 입력 순서(처음 나온 파일 순서)를 유지
+    position = {file_path: i for i, file_path in enumerate(file_list)}
+    units = {}
+    for file_path in sorted(owner, key=position.get):
+        units.setdefault(find(owner[file_path]), []).append(file_path)
+    return units
@@ -0,0 +1,86 @@
+import os
+import time
+import threading
+
+DEFAULT_FLUSH_INTERVAL = 2.0    # 초 - 이 간격마다 리포트를 디스크에 flush/fsync
+
+
+class StreamingReportWriter:
+    """여러 작업 스레드가 받아오는 스트리밍 응답을 유닛 순서대로 리포트 파일에 이어 씁니다.
+
+    지금 순서가 된 유닛(head)의 토큰은 도착하는 즉시 파일과 on_line 콜백으로 흘려보내고,
+    뒤 순서 유닛의 토큰은 메모리에 모아 두었다가 앞 유닛이 끝나면 이어서 씁니다.
+    중간에 중지되거나 프로그램이 죽어도 그때까지 쓴 내용은 디스크에 남습니다.
+    """
+
+    def __init__(self, report_file, on_line=None, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.file = report_file
+        self.on_line = on_line
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.next_index = 0
+        self.buffers = {}       # index -> [text, ...] (아직 순서가 오지 않은 유닛)
+        self.started = set()
+        self.finished = set()
+        self.line_buffer = ""
+        self.last_flush = time.monotonic()
+
+    def write(self, index, text):
+        if not text:
+            return
+        with self.lock:
+            self.started.add(index)
+            if index == self.next_index:
+                self._emit(text)
+            else:
+                self.buffers.setdefault(index, []).append(text)
+            self._flush_if_due()
+
+    def finish(self, index):
+        """유닛 하나의 응답이 모두 도착했음을 알립니다. 다음 순서 유닛의 모아둔 내용이 이어서 쓰입니다."""
+        with self.lock:
+            self.finished.add(index)
+            while self.next_index in self.finished:
+                self.finished.discard(self.next_index)
+                self.next_index += 1
+                for text in self.buffers.pop(self.next_index, []):
+                    self._emit(text)
+            self._flush_if_due()
+
+    def close(self, interrupted_note=None):
+        """남아 있는 내용을 순서대로 모두 쓰고 디스크에 반영합니다. 끝나지 않은 유닛 뒤에는 interrupted_note 를 붙입니다."""
+        with self.lock:
+            if interrupted_note and self.next_index in self.started and self.next_index not in self.finished:
+                self._emit(interrupted_note)
+            for index in sorted(self.buffers):
+                for text in self.buffers[index]:
+                    self._emit(text)
+                if interrupted_note and index not in self.finished:
+                    self._emit(interrupted_note)
+            self.buffers.clear()
+            if self.line_buffer and self.on_line:
+                self.on_line(self.line_buffer)
+            self.line_buffer = ""
+            self._flush()
+
+    def _emit(self, text):
+        self.file.write(text)
+        if self.on_line:
+            # 로그 창에는 줄 단위로만 보냄 (토큰 조각마다 줄바꿈이 생기지 않도록)
+            self.line_buffer += text
+            *lines, self.line_buffer = self.line_buffer.split("\n")
+            for line in lines:
+                self.on_line(line)
+
+    def _flush_if_due(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self):
+        self.file.flush()
+        try:
+            os.fsync(self.file.fileno())
+        except OSError:
+            pass
+        self.last_flush = time.monotonic()
+
@@ -0,0 +1,130 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+# --- 분석 결과 캐시 설정 (환경 변수 또는 .env 로 덮어쓸 수 있음) ---
+DEFAULT_CACHE_PATH = os.path.join(".analysis_cache", "results.sqlite3")
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_SIZE_MB = 200
+BUSY_TIMEOUT_SECONDS = 30       # 다른 프로세스가 쓰는 중이면 잠금이 풀릴 때까지 기다리는 시간
+
+
+def make_cache_key(model_name, prompt):
+    """모델명 + 프롬프트 전체(템플릿과 유닛 소스 포함)의 해시. 하나라도 바뀌면 캐시가 무효화됩니다."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """모델 응답을 SQLite 에 저장하는 영구 캐시. 여러 분석 스레드에서 함께 사용할 수 있습니다.
+
+    여러 프로세스가 같은 파일을 써도 되도록 WAL 모드로 열고 잠금은 BUSY_TIMEOUT_SECONDS 까지 기다립니다.
+    그래도 잠겨 있으면 쓰기(put, last_used 갱신, 정리)는 건너뜁니다. 캐시는 결과를 다시 쓰기 위한 것일 뿐이라
+    캐시에 못 쓴다고 분석이 실패하면 안 되기 때문입니다.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_age_days=DEFAULT_MAX_AGE_DAYS, max_size_mb=DEFAULT_MAX_SIZE_MB):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        self.conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_SECONDS * 1000}")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, model TEXT, result TEXT,"
+            " size INTEGER, created_at REAL, last_used REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used)")
+        self.conn.commit()
+        self.evict()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            try:
+                self.conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()    # 잠겨 있으면 사용 시각만 갱신하지 못함 (정리 순서에만 영향)
+            self.hits += 1
+            return row[0]
+
+    def contains(self, key):
+        """유효한 결과가 있는지만 봅니다. 적중/미스 수와 last_used 는 바꾸지 않습니다. (실행 계획용)"""
+        with self.lock:
+            row = self.conn.execute("SELECT created_at FROM results WHERE key = ?", (key,)).fetchone()
+        return row is not None and time.time() - row[0] <= self.max_age_seconds
+
+    def put(self, key, model_name, result):
+        """결과를 저장하고 성공 여부를 돌려줍니다. 잠금 등 SQLite 오류로 못 쓰면 예외 대신 False 입니다."""
+        now = time.time()
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO results (key, model, result, size, created_at, last_used)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, model_name, result, len(result.encode("utf-8")), now, now),
+                )
+                self.conn.commit()
+            except sqlite3.Error:
+                self.conn.rollback()
+                return False
+        return True
+
+    def evict(self):
+        """오래된 항목을 지우고, 전체 크기가 한도를 넘으면 가장 오래 안 쓴 항목부터 지웁니다. (잠겨 있으면 다음에 정리)"""
+        with self.lock:
+            try:
+                self._evict()
+            except sqlite3.Error:
+                self.conn.rollback()
+
+    def _evict(self):
+        self.conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age_seconds,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total > self.max_size_bytes:
+            removed = 0
+            victims = []
+            for key, size in self.conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+                if total - removed <= self.max_size_bytes:
+                    break
+                victims.append((key,))
+                removed += size
+            self.conn.executemany("DELETE FROM results WHERE key = ?", victims)
+        self.conn.commit()
+
+    def close(self):
+        self.evict()
+        with self.lock:
+            self.conn.close()
+
+
+def open_result_cache(path=None):
+    """환경 설정에 따라 캐시를 엽니다. ANALYZER_CACHE=0 이면 None 을 반환합니다.
+
+    path 를 주면 ANALYZER_CACHE_PATH 대신 그 파일을 씁니다. (scheduler.py 의 저장소별 캐시)
+    """
+    if os.getenv("ANALYZER_CACHE", "1").strip().lower() in ("0", "false", "off", "no"):
+        return None
+    try:
+        max_age_days = float(os.getenv("ANALYZER_CACHE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+        max_size_mb = float(os.getenv("ANALYZER_CACHE_MAX_MB", DEFAULT_MAX_SIZE_MB))
+    except ValueError:
+        max_age_days, max_size_mb = DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_SIZE_MB
+    return ResultCache(path or os.getenv("ANALYZER_CACHE_PATH", DEFAULT_CACHE_PATH), max_age_days, max_size_mb)
@@ -0,0 +1,389 @@
+import os
+import time
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# --- 동시 실행 설정 (환경 변수 또는 .env 로 덮어쓸 수 있음) ---
+DEFAULT_MAX_WORKERS = 4             # 동시에 진행할 최대 모델 요청 수
+DEFAULT_REQUESTS_PER_MINUTE = 60    # 토큰 버킷 기본 속도 (기존 time.sleep(1) 과 같은 수준)
+DEFAULT_MAX_RETRIES = 5             # 429/5xx 응답 시 최대 재시도 횟수
+# 요청 마감 시간 = 기본 + 입력 1000토큰당 추가 (최대값까지). 고정 600초 대신 작은 요청은 빨리 포기하고 재시도
+DEFAULT_TIMEOUT_BASE = 120          # 초 - 응답 생성에 드는 기본 시간
+DEFAULT_TIMEOUT_PER_1K_TOKENS = 4   # 초 - 입력 1000토큰마다 더 기다리는 시간
+DEFAULT_TIMEOUT_MAX = 600           # 초 - 아무리 큰 요청도 이 이상은 기다리지 않음
+DEFAULT_HEDGE_PERCENTILE = 95       # 헤징: 모델 호출이 이번 실행의 이 백분위 시간을 넘기면 같은 요청을 하나 더 보냄
+DEFAULT_HEDGE_MIN_SAMPLES = 10      # 헤징 기준을 계산하기 전에 모을 최소 호출 수
+CALL_POLL_INTERVAL = 0.1            # 초 - 진행 중인 호출을 기다리며 중지/마감/헤징을 확인하는 간격
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "InternalServerError",
+    "ServiceUnavailable", "DeadlineExceeded", "GatewayTimeout", "BadGateway",
+    "RequestTimeout", "TimeoutError", "timeout",
+}
+
+
+def load_runner_config():
+    """환경 변수에서 동시 실행 설정을 읽어옵니다. (load_dotenv() 이후에 호출)"""
+    def read_int(name, default):
+        try:
+            return max(1, int(os.getenv(name, default)))
+        except ValueError:
+            return default
+
+    def read_float(name, default):
+        try:
+            return max(0.0, float(os.getenv(name, default)))
+        except ValueError:
+            return default
+
+    return {
+        "max_workers": read_int("ANALYZER_MAX_WORKERS", DEFAULT_MAX_WORKERS),
+        "requests_per_minute": read_int("ANALYZER_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE),
+        "max_retries": read_int("ANALYZER_MAX_RETRIES", DEFAULT_MAX_RETRIES),
+        "timeout_base": read_float("ANALYZER_TIMEOUT_BASE", DEFAULT_TIMEOUT_BASE),
+        "timeout_per_1k_tokens": read_float("ANALYZER_TIMEOUT_PER_1K_TOKENS", DEFAULT_TIMEOUT_PER_1K_TOKENS),
+        "timeout_max": read_float("ANALYZER_TIMEOUT_MAX", DEFAULT_TIMEOUT_MAX) or DEFAULT_TIMEOUT_MAX,
+        "hedge": os.getenv("ANALYZER_HEDGE", "0").strip().lower() in ("1", "true", "yes", "on"),
+        "hedge_percentile": min(99, read_int("ANALYZER_HEDGE_PERCENTILE", DEFAULT_HEDGE_PERCENTILE)),
+        "hedge_min_samples": read_int("ANALYZER_HEDGE_MIN_SAMPLES", DEFAULT_HEDGE_MIN_SAMPLES),
+    }
+
+
+def request_timeout(tokens_in, runner_config):
+    """입력 토큰 수에 맞춘 요청 마감 시간(초). 기본 시간에 1000토큰당 시간을 더하고 최대값에서 자릅니다."""
+    seconds = runner_config["timeout_base"] + runner_config["timeout_per_1k_tokens"] * tokens_in / 1000
+    return max(1.0, min(runner_config["timeout_max"], seconds))
+
+
+# --- 적응형 토큰 버킷 ---
+class TokenBucket:
+    """초당 요청 수를 제한하는 토큰 버킷.
+
+    429 응답을 받으면 속도를 절반으로 줄이고, 성공할 때마다 조금씩 원래 속도로 되돌립니다.
+    """
+
+    def __init__(self, requests_per_minute, burst=None):
+        self.max_rate = requests_per_minute / 60.0
+        self.min_rate = self.max_rate / 16
+        self.rate = self.max_rate
+        self.capacity = burst if burst is not None else max(1, int(self.max_rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, stop_event=None):
+        """토큰 하나를 얻을 때까지 대기합니다. 중지 신호가 오면 False 를 반환합니다."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait_time = (1 - self.tokens) / self.rate
+            # 중지 버튼에 빠르게 반응하도록 짧게 나눠서 대기
+            if stop_event is not None:
+                if stop_event.wait(min(wait_time, 0.2)):
+                    return False
+            else:
+                time.sleep(min(wait_time, 0.2))
+
+    def try_acquire(self):
+        """기다리지 않고 토큰 하나를 얻어 봅니다. (헤지 요청처럼 없으면 보내지 않아도 되는 요청용)"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def on_throttled(self):
+        with self.lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+
+    def on_success(self):
+        with self.lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+# --- 재시도(backoff) ---
+def get_status_code(error):
+    """google.api_core 예외 등에서 HTTP 상태 코드를 꺼냅니다. 없으면 None."""
+    for attr in ("code", "status_code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable_error(error):
+    if get_status_code(error) in RETRYABLE_STATUS_CODES:
+        return True
+    if isinstance(getattr(error, "reason", None), TimeoutError):
+        return True     # urllib 의 URLError(<timed out>)
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def acquire_slot(request_slots, stop_event):
+    """request_slots(세마포어)의 자리 하나를 얻을 때까지 대기합니다. 중지 신호가 오면 False 를 반환합니다."""
+    while not request_slots.acquire(timeout=0.2):
+        if stop_event.is_set():
+            return False
+    return True
+
+
+def call_with_backoff(func, rate_limiter, stop_event, max_retries=DEFAULT_MAX_RETRIES,
+                      on_retry=None, base_delay=2.0, max_delay=60.0, request_slots=None,
+                      timeout=None, latency=None, on_hedge=None):
+    """rate_limiter 로 속도를 맞추고, 429/5xx 오류와 마감 시간 초과는 지수 백오프로 재시도합니다.
+
+    func(cancel) 은 작업 스레드에서 실행되며(run_cancellable), 중지 신호가 오면 응답을 기다리지 않고 곧바로
+    AnalysisStopped 를 냅니다. timeout(초)이 지나면 그 호출을 취소하고 RequestTimeout 으로 재시도합니다.
+    latency(LatencyTracker)를 주면 호출 시간이 기준(p95)을 넘을 때 같은 요청을 하나 더 보내(헤징) 먼저 온 응답을
+    쓰고, on_hedge(won) 으로 헤지 요청이 이겼는지 알립니다.
+    request_slots 에 세마포어를 주면 모델 호출 중에는 그 자리 하나를 차지합니다.
+    (여러 프로세스가 함께 쓰는 multiprocessing 세마포어로 전체 동시 요청 수를 제한할 때 사용)
+    """
+    attempt = 0
+    while True:
+        if not rate_limiter.acquire(stop_event):
+            raise AnalysisStopped()
+        if request_slots is not None and not acquire_slot(request_slots, stop_event):
+            raise AnalysisStopped()
+        hedge_slots = []
+
+        def try_hedge():
+            # 헤지 요청은 속도 제한 토큰과 동시 요청 자리가 바로 있을 때만 보냄
+            if not rate_limiter.try_acquire():
+                return False
+            if request_slots is not None:
+                if not request_slots.acquire(False):
+                    return False
+                hedge_slots.append(request_slots)
+            return True
+
+        hedge_delay = latency.threshold() if latency is not None else None
+        started = time.monotonic()
+        try:
+            result, winner, hedged = run_cancellable(func, stop_event, timeout, hedge_delay, try_hedge)
+        except Exception as e:
+            if request_slots is not None:
+                request_slots.release()
+            for slots in hedge_slots:
+                slots.release()
+            if not is_retryable_error(e) or attempt >= max_retries:
+                raise
+            if get_status_code(e) == 429 or type(e).__name__ in ("ResourceExhausted", "TooManyRequests"):
+                rate_limiter.on_throttled()
+            delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            if on_retry:
+                on_retry(attempt, delay, e)
+            if stop_event.wait(delay):
+                raise AnalysisStopped()
+            continue
+        if request_slots is not None:
+            request_slots.release()
+        for slots in hedge_slots:
+            slots.release()
+        if latency is not None:
+            latency.record(time.monotonic() - started)
+        if hedged and on_hedge:
+            on_hedge(winner > 0)
+        rate_limiter.on_success()
+        return result
+
+
+# --- 진행 중인 호출의 취소 / 마감 시간 / 헤징 ---
+class CancelToken(threading.Event):
+    """호출 하나의 취소 신호. 백엔드는 on_cancel() 로 연결을 끊는 함수 등을 등록해 두면 cancel() 때 바로 실행되고,
+    스트리밍 중이면 조각마다 is_set() 을 확인해 멈춥니다."""
+
+    def __init__(self):
+        super().__init__()
+        self.callbacks = []
+        self.callbacks_lock = threading.Lock()
+
+    def on_cancel(self, callback):
+        with self.callbacks_lock:
+            if not self.is_set():
+                self.callbacks.append(callback)
+                return
+        callback()  # 이미 취소됨
+
+    def cancel(self):
+        with self.callbacks_lock:
+            if self.is_set():
+                return
+            self.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+class RequestTimeout(Exception):
+    """모델 호출이 마감 시간 안에 끝나지 않았습니다. (재시도 대상)"""
+
+
+class LatencyTracker:
+    """이번 실행의 모델 호출 시간을 모아 헤징 기준(percentile 백분위)을 계산합니다. 여러 스레드에서 기록합니다."""
+
+    def __init__(self, percentile=DEFAULT_HEDGE_PERCENTILE, min_samples=DEFAULT_HEDGE_MIN_SAMPLES, window=200):
+        self.fraction = percentile / 100
+        self.min_samples = min_samples
+        self.window = window
+        self.samples = []
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            if len(self.samples) > self.window:
+                del self.samples[0]
+
+    def threshold(self):
+        """최근 호출 시간의 백분위 값(초). 표본이 min_samples 보다 적으면 None (아직 헤징하지 않음)."""
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(self.fraction * len(ordered)))]
+
+
+def run_cancellable(func, stop_event, timeout=None, hedge_delay=None, try_hedge=None):
+    """func(cancel) 을 별도 스레드에서 실행하고, 끝나거나 중지/마감될 때까지 기다립니다.
+
+    중지 신호가 오면 AnalysisStopped, timeout(초)이 지나면 RequestTimeout 을 곧바로 내고 진행 중인 호출은 취소합니다.
+    hedge_delay 초가 지나도 끝나지 않으면(try_hedge() 가 True 일 때) 같은 요청을 하나 더 보내 먼저 성공한 응답을 쓰고
+    나머지는 취소합니다. 반환값은 (결과, 이긴 호출 번호(0=원래 요청), 헤지 요청을 보냈는지).
+    """
+    outcomes = queue.Queue()
+    cancels = []
+
+    def launch():
+        cancel = CancelToken()
+        index = len(cancels)
+        cancels.append(cancel)
+
+        def run():
+            try:
+                outcomes.put((index, None, func(cancel)))
+            except BaseException as e:
+                outcomes.put((index, e, None))
+        # 취소해도 응답을 바로 못 끊는 SDK 가 있어, 기다리는 쪽이 먼저 빠져나올 수 있게 데몬 스레드로 실행
+        threading.Thread(target=run, daemon=True, name=f"analyzer-call-{index}").start()
+
+    started = time.monotonic()
+    launch()
+    running = 1
+    first_error = None
+    try:
+        while True:
+            if stop_event.is_set():
+                raise AnalysisStopped()
+            elapsed = time.monotonic() - started
+            if timeout is not None and elapsed >= timeout:
+                raise RequestTimeout(f"{timeout:.0f}초 안에 응답이 오지 않았습니다.")
+            if hedge_delay is not None and len(cancels) == 1 and elapsed >= hedge_delay and try_hedge():
+                launch()
+                running += 1
+            try:
+                index, error, result = outcomes.get(timeout=CALL_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            running -= 1
+            if error is None:
+                return result, index, len(cancels) > 1
+            first_error = first_error or error
+            if not running:
+                raise first_error
+    finally:
+        for cancel in cancels:
+            cancel.cancel()
+
+
+class AnalysisStopped(Exception):
+    """사용자가 중지 버튼을 눌러 작업이 취소되었음을 나타냅니다."""
+
+
+# --- 순서 보장 병렬 실행기 ---
+def run_units_concurrently(units, analyze_func, on_result, stop_event, max_workers=DEFAULT_MAX_WORKERS, deadline=None,
+                           on_error=None):
+    """units 를 스레드 풀에서 병렬로 분석하고, 결과는 입력 순서대로 on_result 에 전달합니다.
+
+    analyze_func(index, unit) 은 작업 스레드에서, on_result(index, unit, result) 는
+    호출한 스레드에서 실행되므로 리포트 파일 쓰기는 on_result 안에서 하면 됩니다.
+    중지 신호가 오면 새 작업을 더 이상 제출하지 않고 대기 중인 작업은 취소합니다.
+    deadline(time.monotonic() 기준)이 지나면 새 작업만 제출하지 않고, 이미 시작한 작업은 끝까지 기다립니다.
+    analyze_func 가 예외로 끝나면 그 차례에 on_result 대신 on_error(index, unit, error) 를 부르고,
+    on_error 가 없으면 그 예외를 다시 던집니다. (예외 객체가 결과로 넘어가지 않도록)
+    반환값은 on_result 까지 처리된 유닛 수입니다.
+    """
+    units = list(units)
+    pending = {}        # future -> index
+    finished = {}       # index -> result (순서를 기다리는 중)
+    errors = {}         # index -> 작업 중 난 예외
+    next_to_submit = 0
+    next_to_emit = 0
+    max_in_flight = max_workers * 2
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analyzer") as executor:
+        try:
+            while next_to_emit < len(units):
+                while (not stop_event.is_set() and next_to_submit < len(units)
+                       and len(pending) + len(finished) < max_in_flight
+                       and (deadline is None or time.monotonic() < deadline)):
+                    future = executor.submit(analyze_func, next_to_submit, units[next_to_submit])
+                    pending[future] = next_to_submit
+                    next_to_submit += 1
+
+                if not pending and next_to_emit not in finished:
+                    break  # 중지되어 더 이상 기다릴 작업이 없음
+
+                if pending:
+                    done, _ = wait(list(pending), timeout=0.2, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = pending.pop(future)
+                        try:
+                            finished[index] = future.result()
+                        except AnalysisStopped:
+                            finished[index] = AnalysisStopped
+                        except Exception as e:
+                            finished[index] = None
+                            errors[index] = e
+
+                while next_to_emit in finished:
+                    result = finished.pop(next_to_emit)
+                    if result is AnalysisStopped:
+                        return next_to_emit
+                    if next_to_emit in errors:
+                        error = errors.pop(next_to_emit)
+                        if on_error is None:
+                            raise error
+                        on_error(next_to_emit, units[next_to_emit], error)
+                    else:
+                        on_result(next_to_emit, units[next_to_emit], result)
+                    next_to_emit += 1
+        except BaseException:
+            # Ctrl+C 등으로 호출 스레드가 빠져나가면 작업 스레드들도 곧바로 멈추게 함
+            stop_event.set()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+    return next_to_emit
@@ -0,0 +1,244 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 파일 스캐너 설정 (환경 변수 또는 .env 로 덮어쓸 수 있음) ---
+DEFAULT_SCAN_WORKERS = 8            # 최상위 하위 폴더를 동시에 탐색할 스레드 수
+DEFAULT_MAX_FILE_KB = 1024          # 이보다 큰 파일은 생성된 코드로 보고 건너뜀
+IGNORE_FILES = (".gitignore", ".analyzerignore")
+# 빌드 산출물, 의존성, VCS 메타데이터 - 들어가 보지도 않고 건너뜀
+DEFAULT_PRUNE_DIRS = {
+    ".git", ".svn", ".hg", ".idea", ".vscode", ".gradle", ".settings", ".analysis_cache", "__pycache__",
+    "node_modules", "bower_components", "target", "build", "dist", "out", "bin",
+}
+MINIFIED_SUFFIXES = (".min.js", "-min.js", ".bundle.js", ".min.css")
+MINIFIED_SAMPLE_BYTES = 64 * 1024
+MINIFIED_LINE_LENGTH = 500          # 평균 줄 길이가 이보다 길면 압축(minified)된 JS 로 봄
+
+
+def load_scanner_config():
+    """환경 변수에서 스캐너 설정을 읽어옵니다. ANALYZER_SCAN_PRUNE_DIRS 에 쉼표로 폴더명을 더 줄 수 있습니다."""
+    def read_int(name, default):
+        try:
+            return max(0, int(os.getenv(name, default)))
+        except ValueError:
+            return default
+
+    extra_dirs = {name.strip() for name in os.getenv("ANALYZER_SCAN_PRUNE_DIRS", "").split(",") if name.strip()}
+    return {
+        "workers": max(1, read_int("ANALYZER_SCAN_WORKERS", DEFAULT_SCAN_WORKERS)),
+        "max_file_bytes": read_int("ANALYZER_MAX_FILE_KB", DEFAULT_MAX_FILE_KB) * 1024,  # 0 이면 크기 제한 없음
+        "prune_dirs": DEFAULT_PRUNE_DIRS | extra_dirs,
+    }
+
+
+# --- .gitignore 규칙 (자주 쓰는 문법: *, **, ?, [..], !부정, /고정, 끝의 / 는 폴더 전용) ---
+POSIX_CLASSES = {
+    "alnum": "a-zA-Z0-9", "alpha": "a-zA-Z", "digit": "0-9", "lower": "a-z", "upper": "A-Z",
+    "xdigit": "0-9A-Fa-f", "space": r"\s", "blank": r" \t",
+}
+
+
+def bracket_to_regex(pattern, start):
+    """pattern[start] 의 '[' 로 시작하는 문자 집합을 정규식으로 바꿔 (정규식, 닫는 ']' 다음 위치) 를 돌려줍니다.
+
+    git 처럼 맨 앞의 ! 또는 ^ 는 부정, 맨 앞의 ] 는 문자 그대로, [:digit:] 같은 POSIX 이름을 지원합니다.
+    닫는 ']' 가 없으면 None 입니다. ('[' 를 문자 그대로 봄)
+    """
+    i = start + 1
+    parts = []
+    if i < len(pattern) and pattern[i] in "!^":
+        parts.append("^/")     # 부정 집합도 폴더 구분자는 맞추지 않음
+        i += 1
+    first = True
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "]" and not first:
+            return "[" + "".join(parts) + "]", i + 1
+        first = False
+        if pattern.startswith("[:", i) and ":]" in pattern[i + 2:]:
+            end = pattern.index(":]", i + 2)
+            name = pattern[i + 2:end]
+            if name not in POSIX_CLASSES:
+                raise re.error(f"unknown character class [:{name}:]")
+            parts.append(POSIX_CLASSES[name])
+            i = end + 2
+            continue
+        if ch == "\\" and i + 1 < len(pattern):
+            i += 1
+            ch = pattern[i]
+        parts.append("\\" + ch if ch in "\\[]^" else ch)
+        i += 1
+    return None
+
+
+def glob_to_regex(pattern):
+    """gitignore 패턴 하나를 정규식으로 바꿉니다. git 이 받아들여도 re 가 못 읽는 패턴([z-a] 등)은 re.error 입니다."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if ch == "*":
+            parts.append("[^/]*")
+        elif ch == "?":
+            parts.append("[^/]")
+        elif ch == "[":
+            bracket = bracket_to_regex(pattern, i)
+            if bracket is None:
+                parts.append(re.escape(ch))
+            else:
+                parts.append(bracket[0])
+                i = bracket[1]
+                continue
+        elif ch == "\\" and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(ch))
+        i += 1
+    return re.compile("".join(parts))
+
+
+def parse_ignore_file(path, base):
+    """ignore 파일 하나를 (기준 폴더, 정규식, 부정 여부, 폴더 전용, 경로 고정 여부) 규칙 목록으로 읽습니다."""
+    rules = []
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.strip("/") if dir_only else line
+        anchored = "/" in line
+        try:
+            regex = glob_to_regex(line.lstrip("/"))
+        except re.error:
+            continue    # git 은 잘못된 패턴([z-a] 등)을 아무것에도 맞지 않는 규칙으로 봄
+        rules.append((base, regex, negate, dir_only, anchored))
+    return rules
+
+
+def is_ignored(rules, rel_path, is_dir):
+    """마지막으로 일치한 규칙이 결과를 정합니다. rel_path 는 스캔 시작 폴더 기준의 '/' 구분 경로입니다."""
+    ignored = False
+    for base, regex, negate, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            sub_path = rel_path[len(base) + 1:]
+        else:
+            sub_path = rel_path
+        target = sub_path if anchored else sub_path.rsplit("/", 1)[-1]
+        if regex.fullmatch(target):
+            ignored = not negate
+    return ignored
+
+
+# --- 파일 필터 ---
+def is_minified(file_path, name):
+    if name.endswith(MINIFIED_SUFFIXES):
+        return True
+    if not name.endswith(".js"):
+        return False
+    try:
+        with open(file_path, 'rb') as f:
+            sample = f.read(MINIFIED_SAMPLE_BYTES)
+    except OSError:
+        return False
+    return len(sample) > 4096 and len(sample) / (sample.count(b"\n") + 1) > MINIFIED_LINE_LENGTH
+
+
+def scan_directory(root, rel, inherited, extensions, config, stats):
+    """폴더 하나를 os.scandir 로 읽어 (분석 대상 파일 목록, [(하위 폴더, 적용할 규칙), ...]) 을 돌려줍니다.
+
+    심볼릭 링크 폴더는 따라가지 않습니다. rel 은 스캔 시작 폴더 기준의 '/' 구분 경로입니다.
+    """
+    current = os.path.join(root, rel) if rel else root
+    try:
+        with os.scandir(current) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return [], []
+    rules = inherited
+    for ignore_file in IGNORE_FILES:
+        if any(entry.name == ignore_file for entry in entries):
+            rules = rules + parse_ignore_file(os.path.join(current, ignore_file), rel)
+    found = []
+    subdirs = []
+    for entry in entries:
+        rel_path = f"{rel}/{entry.name}" if rel else entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in config["prune_dirs"] or is_ignored(rules, rel_path, True):
+                    stats["pruned_dirs"] = stats.get("pruned_dirs", 0) + 1
+                else:
+                    subdirs.append((rel_path, rules))
+                continue
+            if not entry.name.endswith(extensions) or not entry.is_file():
+                continue
+            if is_ignored(rules, rel_path, False):
+                stats["ignored"] = stats.get("ignored", 0) + 1
+            elif config["max_file_bytes"] and entry.stat().st_size > config["max_file_bytes"]:
+                stats["too_large"] = stats.get("too_large", 0) + 1
+            elif is_minified(entry.path, entry.name):
+                stats["minified"] = stats.get("minified", 0) + 1
+            else:
+                found.append(entry.path)
+        except OSError:
+            continue
+    return found, subdirs
+
+
+def walk_tree(root, rel, rules, extensions, config, stats):
+    """root/rel 아래 전체를 이름 순서대로 깊이 우선 탐색해 분석 대상 파일 목록을 돌려줍니다."""
+    found = []
+    stack = [(rel, rules)]
+    while stack:
+        files, subdirs = scan_directory(root, *stack.pop(), extensions, config, stats)
+        found.extend(files)
+        stack.extend(reversed(subdirs))
+    return found
+
+
+def iter_project_files(target_dir, extensions, config=None, stats=None):
+    """target_dir 아래에서 확장자가 맞는 파일 경로를 차례로 내보내는 제너레이터.
+
+    빌드/의존성 폴더와 .gitignore·.analyzerignore 에 걸린 경로는 들어가지 않고, 너무 큰 파일과
+    압축된 JS 는 건너뜁니다. 최상위 하위 폴더는 스레드 풀에서 동시에 훑되, 결과는 항상 이름 순서입니다.
+    stats 에 dict 를 주면 건너뛴 폴더/파일 수를 종류별로 채웁니다.
+    """
+    config = config or load_scanner_config()
+    stats = stats if stats is not None else {}
+    extensions = tuple(extensions)
+
+    # 최상위 폴더의 파일은 바로 내보내고, 하위 폴더는 폴더별로 나눠 병렬 탐색
+    files, subdirs = scan_directory(target_dir, "", [], extensions, config, stats)
+    yield from files
+    if not subdirs:
+        return
+    worker_stats = [{} for _ in subdirs]
+    with ThreadPoolExecutor(max_workers=config["workers"], thread_name_prefix="scanner") as executor:
+        results = executor.map(lambda job: walk_tree(target_dir, job[0][0], job[0][1], extensions, config, job[1]),
+                               zip(subdirs, worker_stats))
+        for files in results:
+            yield from files
+    for partial in worker_stats:
+        for key, value in partial.items():
+            stats[key] = stats.get(key, 0) + value
@@ -0,0 +1,226 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import DEFAULT_EXTENSIONS, FOLDER_REPORT_HEADER, EngineError, find_project_files, run_folder_analysis
+from findings import FindingsIndex
+from metrics import RunMetrics
+from runner import load_runner_config
+
+# --- 여러 저장소 스케줄러: 저장소(폴더)마다 프로세스 하나에서 분석하고, 모델 동시 요청 수는 전체에서 함께 제한 ---
+# 예) python scheduler.py repos.txt -o nightly_reports --processes 4 --max-requests 8
+#     python scheduler.py ../shop-api ../shop-admin --backend stub --incremental
+# repos.txt 는 한 줄에 경로 하나 (# 으로 시작하는 줄과 빈 줄은 무시)
+DEFAULT_PROCESSES = 4           # 동시에 분석할 저장소 수
+DEFAULT_MAX_REQUESTS = 8        # 모든 프로세스를 합친 동시 모델 요청 수
+SUMMARY_NAME = "summary"        # 출력 폴더에 summary.md / summary.json 으로 저장
+
+request_slots = None            # 작업 프로세스마다 init_worker() 가 채움
+
+
+def load_scheduler_config():
+    """환경 변수에서 스케줄러 설정을 읽어옵니다."""
+    def read_int(name, default):
+        try:
+            return max(1, int(os.getenv(name, default)))
+        except ValueError:
+            return default
+
+    return {
+        "processes": read_int("ANALYZER_SCHEDULER_PROCESSES", DEFAULT_PROCESSES),
+        "max_requests": read_int("ANALYZER_SCHEDULER_MAX_REQUESTS", DEFAULT_MAX_REQUESTS),
+    }
+
+
+# --- 1. 작업 목록 / 우선순위 ---
+def read_targets(entries):
+    """폴더 경로와 목록 파일(.txt 등, 한 줄에 경로 하나)을 섞어 받아 폴더 경로 목록으로 펼칩니다."""
+    targets = []
+    for entry in entries:
+        if os.path.isfile(entry):
+            base = os.path.dirname(os.path.abspath(entry))
+            with open(entry, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        targets.append(os.path.join(base, line))
+        else:
+            targets.append(entry)
+    return targets
+
+
+def last_changed_at(path):
+    """git 저장소면 마지막 커밋 시각, 아니면 분석 대상 파일 중 가장 최근 수정 시각."""
+    try:
+        output = subprocess.run(["git", "-C", path, "log", "-1", "--format=%ct"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        if output:
+            return float(output)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        pass
+    latest = 0.0
+    for file_path in find_project_files(path, DEFAULT_EXTENSIONS):
+        try:
+            latest = max(latest, os.path.getmtime(file_path))
+        except OSError:
+            continue
+    return latest
+
+
+def plan_jobs(targets, output_dir):
+    """저장소마다 작업 하나를 만들고, 최근에 바뀐 저장소가 먼저 오도록 정렬합니다."""
+    jobs = []
+    used_names = set()
+    for path in targets:
+        path = os.path.abspath(path)
+        base_name = os.path.basename(path.rstrip(os.sep)) or "root"
+        name = base_name
+        n = 2
+        while name in used_names:   # 이름이 같은 저장소는 -2, -3 … 을 붙여 리포트가 겹치지 않게 함
+            name = f"{base_name}-{n}"
+            n += 1
+        used_names.add(name)
+        jobs.append({
+            "name": name,
+            "path": path,
+            "report_path": os.path.join(output_dir, f"{name}.md"),
+            # 저장소마다 결과 캐시를 따로 둬, 여러 프로세스가 한 SQLite 파일의 쓰기 잠금을 다투지 않게 함
+            "cache_path": os.path.join(output_dir, ".analysis_cache", f"{name}.sqlite3"),
+            "changed_at": last_changed_at(path),
+        })
+    jobs.sort(key=lambda job: -job["changed_at"])
+    return jobs
+
+
+# --- 2. 작업 프로세스 ---
+def init_worker(slots):
+    global request_slots
+    request_slots = slots
+
+
+def run_job(job, options):
+    """작업 프로세스에서 저장소 하나를 분석합니다. 진행 로그는 리포트 옆의 .log 파일에 씁니다."""
+    started = time.perf_counter()
+    stem = os.path.splitext(job["report_path"])[0]
+    result = dict(job, status="failed", error="", findings={}, seconds=0.0, log_path=stem + ".log")
+    with open(result["log_path"], 'w', encoding='utf-8') as log_file:
+        def log(message):
+            log_file.write(f"{message}\n")
+            log_file.flush()
+
+        try:
+            summary = run_folder_analysis(job["path"], log, report_path=job["report_path"],
+                                          report_header=FOLDER_REPORT_HEADER.replace("\n", f" - {job['name']}\n", 1),
+                                          metrics=RunMetrics(), metrics_path=stem + ".metrics.json",
+                                          request_slots=request_slots, cache_path=job["cache_path"], **options)
+            index = FindingsIndex(summary["findings_path"])
+            try:
+                result["findings"] = index.counts(index.latest_run_id())
+            finally:
+                index.close()
+            result.update(summary=summary, status="failed" if summary["failed"] else "ok")
+        except EngineError as e:
+            result["error"] = str(e)
+            log(f"오류: {e}")
+    result["seconds"] = round(time.perf_counter() - started, 1)
+    return result
+
+
+# --- 3. 스케줄링 / 통합 요약 ---
+def write_summary(results, output_dir):
+    """저장소별 결과를 summary.json 과 사람이 읽을 summary.md 로 저장하고 두 경로를 돌려줍니다."""
+    json_path = os.path.join(output_dir, SUMMARY_NAME + ".json")
+    md_path = os.path.join(output_dir, SUMMARY_NAME + ".md")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    lines = ["# AI 코드 분석 통합 요약", "",
+             "| 저장소 | 상태 | 완료 | 실패 | 심각 | 경고 | 권장 | 시간(초) | 리포트 |",
+             "|---|---|---|---|---|---|---|---|---|"]
+    for result in results:
+        summary = result.get("summary", {})
+        counts = result["findings"]
+        status = result["status"] if not result["error"] else f"{result['status']} ({result['error']})"
+        lines.append(f"| {result['name']} | {status} | {summary.get('completed', 0)} | {summary.get('failed', 0)} | "
+                     f"{counts.get('심각', 0)} | {counts.get('경고', 0)} | {counts.get('권장', 0)} | "
+                     f"{result['seconds']} | {os.path.basename(result['report_path'])} |")
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return json_path, md_path
+
+
+def run_schedule(targets, output_dir, log=print, processes=None, max_requests=None, **options):
+    """저장소 목록을 프로세스 풀에서 분석하고 통합 요약을 씁니다. 저장소별 결과 목록을 작업 순서대로 돌려줍니다.
+
+    options 는 run_folder_analysis 에 그대로 넘깁니다. 분당 요청 수는 프로세스 수로 나눠 전체 한도를 지킵니다.
+    """
+    config = load_scheduler_config()
+    processes = processes or config["processes"]
+    max_requests = max_requests or config["max_requests"]
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = plan_jobs(targets, output_dir)
+    processes = max(1, min(processes, len(jobs)))
+    requests_per_minute = options.get("requests_per_minute") or load_runner_config()["requests_per_minute"]
+    options["requests_per_minute"] = max(1, requests_per_minute // processes)
+    log(f"저장소 {len(jobs)}개를 프로세스 {processes}개로 분석합니다. (전체 동시 요청 {max_requests}개, "
+        f"프로세스당 분당 {options['requests_per_minute']}회)")
+
+    slots = multiprocessing.BoundedSemaphore(max_requests)
+    results = {}
+    # 풀은 제출 순서대로 작업을 꺼내므로, 우선순위 순으로 제출하면 최근에 바뀐 저장소부터 시작됨
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=(slots,)) as executor:
+        futures = {executor.submit(run_job, job, options): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:     # 작업 프로세스가 비정상 종료한 경우 등
+                result = dict(job, status="failed", error=str(e) or type(e).__name__, findings={}, seconds=0.0)
+            results[job["name"]] = result
+            counts = result["findings"]
+            log(f"{'✅' if result['status'] == 'ok' else '❌'} {job['name']}: {result['status']} "
+                f"(심각 {counts.get('심각', 0)} / 경고 {counts.get('경고', 0)}, {result['seconds']}초)")
+
+    ordered = [results[job["name"]] for job in jobs]
+    _, md_path = write_summary(ordered, output_dir)
+    log(f"통합 요약: {md_path}")
+    return ordered
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="AI 코드 위험 분석기 - 여러 저장소 일괄 분석")
+    parser.add_argument("targets", nargs="+", help="분석할 저장소 폴더 또는 폴더 목록 파일 (여러 개 가능)")
+    parser.add_argument("-o", "--output-dir", default="analysis_reports", help="리포트를 모을 폴더 (기본값: %(default)s)")
+    parser.add_argument("--processes", type=int, help=f"동시에 분석할 저장소 수 (기본값: {DEFAULT_PROCESSES})")
+    parser.add_argument("--max-requests", type=int,
+                        help=f"모든 저장소를 합친 동시 모델 요청 수 (기본값: {DEFAULT_MAX_REQUESTS})")
+    parser.add_argument("--backend", choices=["gemini", "openai", "stub"],
+                        help="모델 백엔드 (기본값: ANALYZER_BACKEND 또는 gemini)")
+    parser.add_argument("--model", help="사용할 모델명 (기본값: 백엔드별 기본 모델)")
+    parser.add_argument("--cascade", action="store_const", const=True,
+                        help="빠른 모델(ANALYZER_TRIAGE_MODEL, gemini 는 기본 gemini-2.5-flash)이 먼저 위험도를 매기고 "
+                             "ANALYZER_CASCADE_THRESHOLD(기본 6) 이상이거나 [심각] 후보가 있는 요청만 본 모델로 정밀 분석")
+    parser.add_argument("--workers", type=int, help="저장소 하나 안의 동시 요청 수 (기본값: ANALYZER_MAX_WORKERS 또는 4)")
+    parser.add_argument("--rpm", type=int, help="모든 저장소를 합친 분당 최대 요청 수 (기본값: ANALYZER_REQUESTS_PER_MINUTE 또는 60)")
+    parser.add_argument("--incremental", action="store_true", help="저장소마다 지난 실행 이후 바뀐 기능 유닛만 다시 분석")
+    parser.add_argument("--no-cache", action="store_true", help="분석 결과 캐시를 사용하지 않음")
+    parser.add_argument("--top", type=int, help="저장소마다 정적 검사 위험 점수가 높은 기능 유닛 N개만 분석")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_schedule(read_targets(args.targets), args.output_dir, processes=args.processes,
+                           max_requests=args.max_requests, backend_name=args.backend, model_name=args.model,
+                           max_workers=args.workers, requests_per_minute=args.rpm, use_cache=not args.no_cache,
+                           incremental=args.incremental, top_units=args.top, cascade=args.cascade)
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import os
+import time
+import threading
+
+# --- GUI 시작 시간: 창을 먼저 띄우고, 분석 엔진과 모델 SDK 는 창이 뜬 뒤 백그라운드에서 미리 불러 둠 ---
+WARMUP_DELAY_MS = 300               # 창이 그려진 뒤 예열을 시작할 때까지 기다리는 시간
+STARTUP_PROBE_ENV = "ANALYZER_STARTUP_PROBE"    # 설정하면 첫 창이 뜬 시각을 출력하고 바로 종료 (benchmark.py --startup)
+STARTUP_PROBE_MARK = "FIRST_WINDOW_AT"
+
+
+def warm_up():
+    """분석 엔진과 설정된 백엔드의 SDK 를 불러 둡니다. 예열은 실패해도 무시하며, 분석을 시작하면 그때 다시 불러옵니다."""
+    try:
+        import engine  # noqa: F401
+        from backends import preload_backend_modules
+        preload_backend_modules()
+    except Exception:
+        pass
+
+
+def schedule_warmup(root):
+    """창이 뜬 뒤 WARMUP_DELAY_MS 가 지나면 작업 스레드에서 warm_up() 을 실행합니다."""
+    root.after(WARMUP_DELAY_MS, lambda: threading.Thread(target=warm_up, daemon=True).start())
+
+
+def probe_startup(root):
+    """ANALYZER_STARTUP_PROBE 가 있으면 첫 창이 그려진 시각(time.time())을 출력하고 창을 닫습니다. 아니면 아무것도 하지 않습니다."""
+    if not os.getenv(STARTUP_PROBE_ENV):
+        return
+
+    def mark():
+        root.update_idletasks()
+        print(f"{STARTUP_PROBE_MARK} {time.time():.6f}", flush=True)
+        root.destroy()
+    root.after(0, mark)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 분석기 모듈은 ai-analyzer/ 바로 아래의 평평한 모듈이라, 테스트에서 그대로 import 할 수 있게 경로에 넣음
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from backends import MAX_CONTINUATIONS, TRUNCATED_NOTE, BackendError, ModelBackend, RequestCancelled, StubBackend
+
+PACKED_PROMPT = "=== 기능 유닛: A ===\n--- 파일: A.java ---\nclass A {}\n=== 기능 유닛: B ===\n--- 파일: B.java ---\nclass B {}\n"
+
+
+class ScriptedBackend(ModelBackend):
+    """complete() 가 정해 둔 (텍스트, 잘렸는지) 를 차례로 돌려주는 백엔드"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.previous_seen = []
+
+    def complete(self, prompt, previous, on_text, timeout, context, cancel):
+        self.previous_seen.append(list(previous))
+        text, truncated = self.replies.pop(0)
+        if on_text:
+            on_text(text)
+        return text, truncated
+
+
+def test_truncated_answer_is_continued_with_previous_parts():
+    backend = ScriptedBackend([("첫 ", True), ("둘째 ", True), ("끝", False)])
+    continued = []
+    assert backend.generate("p", on_continue=lambda: continued.append(1)) == "첫 둘째 끝"
+    assert backend.previous_seen == [[], ["첫 "], ["첫 ", "둘째 "]]
+    assert len(continued) == 2
+
+
+def test_answer_still_truncated_after_the_limit_gets_a_note():
+    backend = ScriptedBackend([("조각", True)] * (MAX_CONTINUATIONS + 1))
+    streamed = []
+    result = backend.generate("p", on_text=streamed.append)
+    assert result == "조각" * (MAX_CONTINUATIONS + 1) + TRUNCATED_NOTE
+    assert streamed[-1] == TRUNCATED_NOTE
+
+
+def test_stub_is_deterministic_and_answers_each_packed_unit():
+    first, second = StubBackend(), StubBackend()
+    assert first.generate(PACKED_PROMPT) == second.generate(PACKED_PROMPT)
+    assert StubBackend(seed=1).generate(PACKED_PROMPT) != first.generate(PACKED_PROMPT)
+    answer = first.generate(PACKED_PROMPT)
+    assert answer.startswith("### 유닛: A\n") and "\n\n### 유닛: B\n" in answer
+
+
+def test_stub_output_limit_is_reassembled_by_continuations():
+    full = StubBackend().generate(PACKED_PROMPT)
+    limited = StubBackend(max_output_chars=len(full) // 2 + 1)
+    streamed = []
+    assert limited.generate(PACKED_PROMPT, on_text=streamed.append) == full
+    assert "".join(streamed) == full
+    assert limited.request_count == 2
+
+
+def test_stub_rejects_released_contexts_and_cancelled_calls():
+    backend = StubBackend()
+    context = backend.create_context("공통 지시문")
+    backend.release_context(context)
+    with pytest.raises(BackendError):
+        backend.generate("p", context=context)
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(RequestCancelled):
+        StubBackend(latency=5).generate("p", cancel=cancel)
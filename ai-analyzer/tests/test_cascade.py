@@ -0,0 +1,26 @@
+from cascade import needs_deep_analysis, parse_triage
+
+
+def test_score_line_is_removed_from_the_body():
+    score, critical, body = parse_triage("**위험도: 3/10**\n\n[권장] 로그 정리")
+    assert (score, critical, body) == (3.0, False, "[권장] 로그 정리")
+    assert parse_triage("위험도：7.5\n내용")[0] == 7.5
+    assert parse_triage("위험도: 42/10\n내용")[0] == 10.0
+
+
+def test_without_score_line_the_highest_tag_decides():
+    assert parse_triage("[경고] a\n[권장] b")[:2] == (5.0, False)
+    assert parse_triage("[심각] 널 참조")[:2] == (10.0, True)
+    assert parse_triage("특이사항 없음")[:2] == (0.0, False)
+
+
+def test_packed_request_only_scores_its_own_units():
+    text = "위험도: 2/10\n### 유닛: A\n[권장] a\n### 유닛: B\n특이사항 없음\n### 유닛: 다른 유닛\n[심각] 요청에 없는 유닛"
+    score, critical, _ = parse_triage(text, ["A", "B"])
+    assert score == 2.0 and not critical
+
+
+def test_critical_tag_escalates_even_below_threshold():
+    assert needs_deep_analysis(2.0, True, 6)
+    assert needs_deep_analysis(6.0, False, 6)
+    assert not needs_deep_analysis(5.9, False, 6)
@@ -0,0 +1,68 @@
+from checkpoint import CheckpointJournal, prepare_report_for_resume
+
+HEADING = "## 💎 기능 유닛: "
+
+
+def section(name, body):
+    return f"\n\n---\n\n{HEADING}{name}\n\n{body}"
+
+
+def test_resume_loads_units_and_ignores_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CheckpointJournal(path, [str(tmp_path)], "report.md")
+    journal.record("User", "ok", 100)
+    journal.record("Order", "failed", 180)
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"unit": "Pay", "sta')    # 기록 중에 꺼진 경우
+
+    resumed = CheckpointJournal(path, [str(tmp_path)], "report.md", resume=True)
+    assert resumed.completed_units == {"User"}
+    assert resumed.failed_units == {"Order"}
+    assert resumed.last_end == 180
+    resumed.close()
+
+
+def test_journal_for_other_target_is_not_resumed(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CheckpointJournal(path, [str(tmp_path / "a")], "report.md")
+    journal.record("User", "ok", 100)
+    journal.close()
+    other = CheckpointJournal(path, [str(tmp_path / "b")], "report.md", resume=True)
+    assert other.records == {}
+    other.close()
+
+
+def test_prepare_report_cuts_partial_tail_and_drops_failed_sections(tmp_path):
+    report_path = tmp_path / "report.md"
+    kept = "# 리포트" + section("User", "ok") + section("Order", "오류 발생")
+    report_path.write_text(kept + section("Pay", "쓰다 만"), encoding="utf-8")
+    trimmed = "# 리포트" + section("User", "ok")
+    assert prepare_report_for_resume(str(report_path), HEADING, {"User"}, len(kept.encode("utf-8"))) == [
+        ("User", len(trimmed.encode("utf-8")))]
+    assert report_path.read_text(encoding="utf-8") == trimmed
+    assert prepare_report_for_resume(str(tmp_path / "missing.md"), HEADING, set(), None) is None
+
+
+def test_second_resume_cuts_at_offsets_of_the_rewritten_report(tmp_path):
+    report_path = tmp_path / "report.md"
+    journal_path = str(tmp_path / "journal.jsonl")
+    user, order = "# 리포트" + section("User", "ok"), section("Order", "오류 발생")
+    report_path.write_text(user + order, encoding="utf-8")
+    journal = CheckpointJournal(journal_path, [str(tmp_path)], str(report_path))
+    journal.record("User", "ok", len(user.encode("utf-8")))
+    journal.record("Order", "failed", len((user + order).encode("utf-8")))
+    journal.close()
+
+    # 첫 번째 이어서 분석: 실패한 Order 섹션을 지우고 저널 위치를 다시 맞춤
+    journal = CheckpointJournal(journal_path, [str(tmp_path)], str(report_path), resume=True)
+    journal.restart_with(prepare_report_for_resume(str(report_path), HEADING, journal.completed_units, journal.last_end))
+    journal.close()
+    # Order 섹션을 쓰던 중 꺼짐 (저널 기록 전)
+    with open(report_path, "a", encoding="utf-8") as f:
+        f.write(section("Order", "새 결과") + "\n\n---")
+
+    journal = CheckpointJournal(journal_path, [str(tmp_path)], str(report_path), resume=True)
+    prepare_report_for_resume(str(report_path), HEADING, journal.completed_units, journal.last_end)
+    journal.close()
+    assert report_path.read_text(encoding="utf-8") == user
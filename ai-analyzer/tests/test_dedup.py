@@ -0,0 +1,51 @@
+import hashlib
+
+from dedup import SIMHASH_BITS, find_duplicate_files, find_duplicate_units, simhash
+
+
+def java_source(name, changed=""):
+    body = "\n".join(f"        total += order{i}.getAmount() * rate{i};" for i in range(40))
+    return f"public class {name} {{\n    int sum() {{\n        int total = 0;\n{body}\n{changed}        return total;\n    }}\n}}\n"
+
+
+def naive_simhash(shingles):
+    counts = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += (value >> bit) & 1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if counts[bit] > len(shingles) // 2)
+
+
+def test_simhash_matches_bit_by_bit_count():
+    shingles = {f"token{i} + {i * 7}" for i in range(100)}
+    assert simhash(shingles) == naive_simhash(shingles)
+    assert simhash({"too", "short"}) is None
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_whitespace_only_copy_is_an_exact_duplicate(tmp_path):
+    first = write(tmp_path, "Order.java", java_source("Order"))
+    second = write(tmp_path, "OrderCopy.java", java_source("Order").replace("    ", "\t"))
+    assert find_duplicate_files([first, second]) == {1: (0, True)}
+
+
+def test_small_edit_is_a_near_duplicate_and_other_code_is_not(tmp_path):
+    first = write(tmp_path, "Order.java", java_source("Order"))
+    edited = write(tmp_path, "Order2.java", java_source("Order", "        total -= 1;\n"))
+    other = write(tmp_path, "Report.java", "\n".join(f"String line{i} = format(\"{i}\");" for i in range(60)))
+    assert find_duplicate_files([first, edited, other]) == {1: (0, False)}
+    assert find_duplicate_files([first, edited], max_distance=0) == {}
+
+
+def test_units_are_only_compared_with_units_of_the_same_file_count(tmp_path):
+    order = write(tmp_path, "OrderService.java", java_source("Order"))
+    copy = write(tmp_path, "OrderCopyService.java", java_source("Order"))
+    extra = write(tmp_path, "OrderMapper.xml", "<mapper namespace=\"Order\"/>")
+    units = {"Order": [order], "OrderCopy": [copy], "OrderWithMapper": [copy, extra]}
+    assert find_duplicate_units(units) == {"OrderCopy": ("Order", True)}
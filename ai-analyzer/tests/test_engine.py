@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import packing
+from backends import StubBackend
+from engine import run_folder_analysis
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """기능 유닛 세 개짜리 작은 프로젝트. 캐시와 manifest 는 tmp_path 안에 생기도록 작업 폴더를 옮김"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ANALYZER_GROUPING", "name")
+    src = tmp_path / "src"
+    src.mkdir()
+    for name in ("User", "Order", "Pay"):
+        (src / f"{name}Service.java").write_text(f"public class {name}Service {{ void run() {{}} }}\n", encoding="utf-8")
+    return src
+
+
+def run(src, log=None, **options):
+    messages = []
+    summary = run_folder_analysis(str(src), log or messages.append, report_path="report.md", backend=StubBackend(),
+                                  **options)
+    return summary, messages
+
+
+def test_batch_run_counts_each_cache_hit_once(project):
+    _, messages = run(project, batch=True)
+    assert "캐시 적중 0건 / 신규 분석 1건" in messages
+    _, messages = run(project, batch=True)
+    assert "캐시 적중 1건 / 신규 분석 0건" in messages
+
+
+def test_top_without_prefilter_warns_instead_of_silently_ignoring(project, monkeypatch):
+    monkeypatch.setenv("ANALYZER_PREFILTER", "0")
+    summary, messages = run(project, top_units=1)
+    assert any("ANALYZER_PREFILTER=0" in message for message in messages)
+    assert summary["failed"] == 0
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_each_source_file_is_read_once_per_run(project, monkeypatch, batch):
+    reads = []
+    original = packing.read_part
+
+    def read_part(file_path, *args, **kwargs):
+        reads.append(os.path.basename(file_path))
+        return original(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(packing, "read_part", read_part)
+    _, messages = run(project, batch=batch)
+    assert sorted(reads) == ["OrderService.java", "PayService.java", "UserService.java"]
+    assert any("캐시 확인 생략" in message for message in messages)
@@ -0,0 +1,41 @@
+from findings import FindingsIndex, diff_findings, export_findings
+
+
+def finding(title, severity="경고", file="UserService.java", start_line=10, fingerprint=""):
+    return {"severity": severity, "file": file, "start_line": start_line, "end_line": start_line,
+            "category": "runtime", "title": title, "fingerprint": fingerprint}
+
+
+def record_run(path, findings_by_unit, report_path="report.md"):
+    index = FindingsIndex(path)
+    index.begin_run(report_path)
+    for unit, findings in findings_by_unit.items():
+        index.record(unit, findings)
+    index.finish_run(findings_by_unit)
+    index.close()
+
+
+def test_export_uses_latest_run_by_default(tmp_path):
+    path = str(tmp_path / "r.findings.sqlite3")
+    record_run(path, {"User": [finding("첫 실행")]})
+    record_run(path, {"User": [finding("두 번째 실행")]})
+    output = export_findings(path, str(tmp_path / "out.md"), "md")
+    text = open(output, encoding="utf-8").read()
+    assert "두 번째 실행" in text and "첫 실행" not in text
+
+
+def test_diff_matches_by_file_region_and_category():
+    baseline = [finding("같은 문제", fingerprint="f1"), finding("고쳐짐", fingerprint="f2"),
+                finding("심각도 상향", fingerprint="f3")]
+    current = [dict(finding("같은 문제, 문구만 다름", fingerprint="f1"), start_line=30),     # 줄이 밀려도 같은 영역
+               finding("심각도 상향", severity="심각", fingerprint="f3"), finding("새 문제", fingerprint="f4")]
+    diff = diff_findings(baseline, current)
+    assert [f["title"] for f in diff["new"]] == ["새 문제"]
+    assert [f["title"] for f in diff["resolved"]] == ["고쳐짐"]
+    assert [(old["severity"], new["severity"]) for old, new in diff["changed"]] == [("경고", "심각")]
+
+
+def test_diff_pairs_repeated_keys_in_order():
+    baseline = [finding("a"), finding("b")]
+    diff = diff_findings(baseline, [finding("a")])
+    assert diff["new"] == [] and [f["title"] for f in diff["resolved"]] == ["b"]
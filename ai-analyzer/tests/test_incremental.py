@@ -0,0 +1,59 @@
+import os
+
+from incremental import (build_manifest, commit_manifest, diff_manifests, load_manifest, merge_report,
+                         plan_incremental_run, split_report)
+
+HEADING = "## 💎 기능 유닛: "
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def by_name(file_list):
+    groups = {}
+    for file_path in file_list:
+        groups.setdefault(os.path.basename(file_path).split("Service")[0].split(".")[0], []).append(file_path)
+    return groups
+
+
+def test_manifest_diff_finds_edited_new_and_deleted_files(tmp_path):
+    kept = write(tmp_path, "Kept.java", "a")
+    edited = write(tmp_path, "Edited.java", "b")
+    deleted = write(tmp_path, "Deleted.java", "c")
+    previous = build_manifest([kept, edited, deleted], {})
+    os.remove(deleted)
+    write(tmp_path, "Edited.java", "b2")
+    added = write(tmp_path, "Added.java", "d")
+    current = build_manifest([kept, edited, added], previous)
+    assert current[kept] is previous[kept]          # 크기·mtime 이 그대로면 다시 해시하지 않음
+    assert diff_manifests(previous, current) == {edited, added, deleted}
+
+
+def test_plan_picks_changed_units_and_commit_keeps_pending_units(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    user = write(tmp_path, "UserService.java", "a")
+    order = write(tmp_path, "OrderService.java", "b")
+    units = by_name([user, order])
+    report = str(tmp_path / "report.md")
+
+    first, previous, current, manifest_path = plan_incremental_run([str(tmp_path)], [user, order], units, by_name, report)
+    assert set(first) == {"User", "Order"}          # 첫 실행은 전체
+    commit_manifest(manifest_path, previous, current, by_name, pending_names={"Order"})   # Order 는 실패
+    assert set(load_manifest(manifest_path)) == {user}
+
+    changed, previous, current, manifest_path = plan_incremental_run([str(tmp_path)], [user, order], units, by_name, report)
+    assert set(changed) == {"Order"}                # 실패한 유닛만 다시
+
+
+def test_merge_report_replaces_sections_keeps_order_and_drops_removed_units(tmp_path):
+    report = tmp_path / "report.md"
+    report.write_text("# 리포트" + "".join(f"\n\n---\n\n{HEADING}{name}\n\n{name} 이전" for name in ("A", "B", "C")),
+                      encoding="utf-8")
+    merge_report(str(report), "# 새 머리말", HEADING, {"B": "B 새 결과", "D": "D 결과"}, {"A", "B", "D"})
+    header, sections = split_report(report.read_text(encoding="utf-8"), HEADING)
+    assert header == "# 리포트"
+    assert sections == {"A": "A 이전", "B": "B 새 결과", "D": "D 결과"}
+    assert list(sections) == ["A", "B", "D"]
@@ -0,0 +1,54 @@
+from packing import AnalysisRequest, ReportAssembler, build_analysis_requests, demultiplex_response, estimate_file_tokens
+
+
+def chunk(index, count=3):
+    return AnalysisRequest([("Big", [("Big.java", index, index)])], index, count)
+
+
+def test_split_unit_is_written_only_when_every_chunk_arrived():
+    assembler = ReportAssembler()
+    assert assembler.add(chunk(1), "one") == []
+    assert assembler.add(chunk(3), "three") == []
+    [(name, body, ok)] = assembler.add(chunk(2), "two")
+    assert name == "Big" and ok
+    assert body.index("부분 1/3") < body.index("부분 2/3") < body.index("부분 3/3")
+
+
+def test_failed_chunk_marks_whole_unit_failed():
+    assembler = ReportAssembler()
+    assembler.add(chunk(1, 2), "one")
+    assert assembler.add(chunk(2, 2), "boom", False)[0][2] is False
+
+
+def test_demultiplex_splits_packed_response_by_unit_heading():
+    text = "### 유닛: A\n[심각] a\n\n### 유닛: **B**\n특이사항 없음\n### 유닛: 이름\n무시"
+    assert demultiplex_response(text, ["A", "B"]) == {"A": "[심각] a", "B": "특이사항 없음"}
+
+
+def test_packed_unit_without_heading_gets_whole_response():
+    assembler = ReportAssembler()
+    request = AnalysisRequest([("A", [("a", None, None)]), ("B", [("b", None, None)])])
+    sections = dict((name, body) for name, body, _ in assembler.add(request, "### 유닛: A\n결과"))
+    assert sections["A"] == "결과"
+    assert "분리하지 못해" in sections["B"]
+
+
+def test_flush_returns_partly_analyzed_unit_as_failed():
+    assembler = ReportAssembler()
+    assembler.add(chunk(1), "one")
+    [(name, body, ok)] = assembler.flush()
+    assert name == "Big" and not ok
+    assert "1개 조각만" in body and "one" in body
+    assert assembler.flush() == []
+
+
+def test_requests_carry_the_token_estimate_used_for_packing(tmp_path):
+    small, big = tmp_path / "Small.java", tmp_path / "Big.java"
+    small.write_text("class Small {}\n", encoding="utf-8")
+    big.write_text("void run() { call(); }\n" * 400, encoding="utf-8")
+    config = {"max_unit_tokens": 1000, "pack_tokens": 500, "max_units_per_pack": 4, "overlap_lines": 0}
+    requests = build_analysis_requests({"Small": [str(small)], "Big": [str(big)]}, config)
+    chunks = [request for request in requests if request.chunk_count > 1]
+    assert len(chunks) > 1 and all(0 < request.tokens <= 1000 for request in chunks)
+    [packed] = [request for request in requests if request.chunk_count == 1]
+    assert packed.tokens == estimate_file_tokens(str(small))
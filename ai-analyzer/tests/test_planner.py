@@ -0,0 +1,57 @@
+from packing import AnalysisRequest
+from planner import PlannedRequest, RunPlan, estimate_wall_seconds, plan_run
+
+RUNNER_CONFIG = {"max_workers": 2, "requests_per_minute": 600}
+PLAN_CONFIG = {"token_count": "local", "output_tokens_per_unit": 100, "output_tokens_per_second": 100,
+               "latency": 0.0, "token_budget": None}
+
+
+def planned(index, tokens, value, group=None, cached=False):
+    return PlannedRequest(index, f"r{index}", tokens, 0, 1.0, cached, value, group)
+
+
+def test_select_takes_highest_value_requests_within_token_budget():
+    plan = RunPlan([planned(0, 100, 1), planned(1, 100, 9), planned(2, 100, 5)], 1, 600)
+    assert plan.select(token_budget=200) == [1, 2]
+
+
+def test_select_skips_request_that_does_not_fit_and_keeps_smaller_ones():
+    plan = RunPlan([planned(0, 500, 9), planned(1, 100, 1)], 1, 600)
+    assert plan.select(token_budget=200) == [1]
+
+
+def test_select_keeps_or_drops_all_chunks_of_a_split_unit_together():
+    big = ("unit", "Big")
+    requests = [planned(0, 3000, 5, big), planned(1, 3000, 5, big), planned(2, 3000, 5, big), planned(3, 100, 1)]
+    plan = RunPlan(requests, 1, 600)
+    assert plan.select(token_budget=4500) == [3]
+    assert plan.select(token_budget=9000) == [0, 1, 2]
+    assert plan.select(token_budget=9100) == [0, 1, 2, 3]
+
+
+def test_cached_requests_do_not_use_the_budget():
+    plan = RunPlan([planned(0, 1000, 1, cached=True), planned(1, 100, 1)], 1, 600)
+    assert plan.select(token_budget=100) == [0, 1]
+
+
+def test_estimate_wall_seconds_is_bounded_by_workers_and_rate_limit():
+    assert estimate_wall_seconds([1.0] * 4, 2, 6000) == 2.0
+    assert estimate_wall_seconds([0.1] * 10, 10, 60) == 10.0
+
+
+def test_plan_run_groups_chunks_of_one_unit(tmp_path):
+    requests = [AnalysisRequest([("Big", [("a", 1, 10)])], 1, 2), AnalysisRequest([("Big", [("a", 11, 20)])], 2, 2),
+                AnalysisRequest([("Small", [("b", None, None)])])]
+    plan = plan_run(requests, lambda request: "x" * 40, lambda prompt: False, [0, 0, 0], 0, None,
+                    RUNNER_CONFIG, PLAN_CONFIG)
+    assert [request.group for request in plan.requests] == [("unit", "Big"), ("unit", "Big"), ("request", 2)]
+    assert plan.totals()["tokens_out"] == 300
+
+
+def test_plan_run_without_render_prompt_uses_packing_estimates():
+    requests = [AnalysisRequest([("A", [("a", None, None)])], tokens=100),
+                AnalysisRequest([("B", [("b", None, None)])], tokens=50)]
+    plan = plan_run(requests, None, lambda prompt: True, [0, 0], 10, None, RUNNER_CONFIG, PLAN_CONFIG)
+    assert [request.tokens_in for request in plan.requests] == [110, 60]
+    assert plan.totals()["cached"] == 0
+    assert "캐시 확인 생략" in plan.summary_lines()[0]
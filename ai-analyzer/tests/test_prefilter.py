@@ -0,0 +1,47 @@
+from packing import AnalysisRequest
+from prefilter import MAX_HITS_PER_RULE, order_requests, request_score, scan_file, score_hits, select_units
+
+
+def test_requests_are_ordered_by_risk_after_packing():
+    packed = AnalysisRequest([("Small", [("s", None, None)]), ("Tiny", [("t", None, None)])])
+    chunks = [AnalysisRequest([("Big", [("b", index, index)])], index, 2) for index in (1, 2)]
+    scores = {"Big": (3, {}), "Small": (9, {}), "Tiny": (0, {})}
+    ordered = order_requests(chunks + [packed], scores)
+    assert ordered[0] is packed
+    assert ordered[1:] == chunks     # 조각은 순서대로 붙어 있음
+    assert request_score(packed, scores) == 9
+    assert request_score(AnalysisRequest([("Unknown", [("u", None, None)])]), scores) == 0
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_rules_flag_risky_lines_and_selectlist_inside_loops(tmp_path):
+    mapper = write(tmp_path, "OrderMapper.xml", "<select>\n SELECT * FROM orders WHERE id = ${id}\n</select>\n")
+    service = write(tmp_path, "OrderService.java", "\n".join([
+        "List<Order> all = sqlSession.selectList(\"Order.all\");",
+        "for (Item item : items) {",
+        "    sqlSession.selectList(\"Order.byItem\", item);",
+        "}",
+        "String sql = \"SELECT * FROM orders WHERE id = \" + id;",
+    ]))
+    assert [(number, rule_id) for number, rule_id, _, _ in scan_file(mapper)] == [(2, "mapper-dollar")]
+    assert [(number, rule_id) for number, rule_id, _, _ in scan_file(service)] == [
+        (1, "selectlist-unbounded"), (3, "selectlist-loop"), (5, "sql-concat")]
+    assert scan_file(write(tmp_path, "notes.txt", "${id}")) == []
+
+
+def test_score_counts_each_rule_only_up_to_the_cap():
+    hits = [(number, "mapper-dollar", 10, "") for number in range(MAX_HITS_PER_RULE + 3)] + [(99, "null-deref", 3, "")]
+    assert score_hits(hits) == 10 * MAX_HITS_PER_RULE + 3
+
+
+def test_select_units_ranks_by_score_then_applies_limits():
+    units = {"A": ["a"], "B": ["b"], "C": ["c"], "D": ["d"]}
+    scores = {"A": (2, {}), "B": (10, {}), "C": (0, {}), "D": (10, {})}
+    assert list(select_units(units, scores)) == ["B", "D", "A", "C"]
+    assert list(select_units(units, scores, top_n=2)) == ["B", "D"]
+    assert list(select_units(units, scores, min_score=1)) == ["B", "D", "A"]
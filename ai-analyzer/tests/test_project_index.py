@@ -0,0 +1,52 @@
+import os
+
+from engine import group_files_by_name
+from project_index import HUB_FAN_IN, group_by_graph, normalize_url, parse_java
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def group(file_list, max_unit_files=12):
+    units = group_by_graph(file_list, group_files_by_name(file_list), {"mode": "graph", "max_unit_files": max_unit_files})
+    return {name: sorted(os.path.basename(p) for p in files) for name, files in units.items()}
+
+
+def java(name, body=""):
+    return f"package com.shop;\n\npublic class {name} {{\n{body}\n}}\n"
+
+
+def test_controller_urls_and_views_are_parsed_with_class_prefix():
+    facts = parse_java('package a;\n@RequestMapping("/user")\npublic class UserController {\n'
+                       '  @GetMapping({"/list.do", "detail/{id}"}) String list() { return "user/list"; }\n}\n')
+    assert facts["urls"] == ["/user/detail/{id}", "/user/list"]
+    assert facts["views"] == ["user/list"]
+    assert normalize_url("/user//list.do?id=1") == "/user/list"
+
+
+def test_mapper_xml_joins_its_namespace_interface(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    files = [write(tmp_path, "OrderDao.java", java("OrderDao")),
+             write(tmp_path, "OrderMapper.xml", '<mapper namespace="com.shop.OrderDao"></mapper>'),
+             write(tmp_path, "Report.java", java("Report"))]
+    assert group(files) == {"Order": ["OrderDao.java", "OrderMapper.xml"], "Report": ["Report.java"]}
+
+
+def test_merges_stop_at_the_unit_file_cap(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    files = [write(tmp_path, "Alpha.java", java("Alpha", "Beta beta;")),
+             write(tmp_path, "Beta.java", java("Beta", "Gamma gamma;")),
+             write(tmp_path, "Gamma.java", java("Gamma"))]
+    assert sorted(map(len, group(files, max_unit_files=2).values())) == [1, 2]
+    assert list(group(files, max_unit_files=3).values()) == [["Alpha.java", "Beta.java", "Gamma.java"]]
+
+
+def test_class_used_by_many_files_is_not_linked(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    users = [write(tmp_path, f"Page{i}.java", java(f"Page{i}", "Code code;")) for i in range(HUB_FAN_IN + 1)]
+    files = users + [write(tmp_path, "Code.java", java("Code"))]
+    assert all(len(unit) == 1 for unit in group(files).values())
+    assert len(group(users[1:] + files[-1:])) == 1    # 한도 이하로 참조되면 연결됨
@@ -0,0 +1,65 @@
+import time
+import sqlite3
+
+import result_cache
+from result_cache import ResultCache, make_cache_key
+
+
+def test_key_changes_with_model_or_prompt():
+    assert make_cache_key("m", "p") == make_cache_key("m", "p")
+    assert make_cache_key("m", "p") != make_cache_key("n", "p")
+    assert make_cache_key("m", "p") != make_cache_key("m", "p ")
+
+
+def test_get_counts_hits_and_misses(tmp_path):
+    cache = ResultCache(str(tmp_path / "r.sqlite3"))
+    assert cache.get("k") is None
+    cache.put("k", "m", "결과")
+    assert cache.get("k") == "결과"
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_contains_does_not_touch_counters_or_last_used(tmp_path):
+    cache = ResultCache(str(tmp_path / "r.sqlite3"))
+    cache.put("k", "m", "결과")
+    before = cache.conn.execute("SELECT last_used FROM results").fetchone()[0]
+    time.sleep(0.01)
+    assert cache.contains("k") and not cache.contains("x")
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert cache.conn.execute("SELECT last_used FROM results").fetchone()[0] == before
+    cache.close()
+
+
+def test_expired_entries_are_not_returned(tmp_path):
+    cache = ResultCache(str(tmp_path / "r.sqlite3"), max_age_days=1)
+    cache.put("k", "m", "결과")
+    cache.conn.execute("UPDATE results SET created_at = 0")
+    assert not cache.contains("k") and cache.get("k") is None
+    cache.close()
+
+
+def test_evict_drops_least_recently_used_over_size_limit(tmp_path):
+    cache = ResultCache(str(tmp_path / "r.sqlite3"), max_size_mb=1 / 1024)   # 1KB
+    cache.put("old", "m", "a" * 700)
+    cache.conn.execute("UPDATE results SET last_used = 0 WHERE key = 'old'")
+    cache.put("new", "m", "b" * 700)
+    cache.evict()
+    assert not cache.contains("old") and cache.contains("new")
+    cache.close()
+
+
+def test_put_returns_false_instead_of_raising_when_database_is_locked(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "BUSY_TIMEOUT_SECONDS", 0)
+    path = str(tmp_path / "results.sqlite3")
+    cache = ResultCache(path)
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")     # 다른 프로세스가 쓰기 잠금을 잡고 있는 상황
+    try:
+        assert cache.put("key", "stub", "result") is False
+    finally:
+        other.rollback()
+        other.close()
+    assert cache.put("key", "stub", "result") is True
+    assert cache.get("key") == "result"
+    cache.close()
@@ -0,0 +1,28 @@
+import threading
+
+import pytest
+
+from runner import run_units_concurrently
+
+
+def boom_on_two(i, unit):
+    if unit == 2:
+        raise ValueError("boom")
+    return unit * 10
+
+
+def test_worker_exception_goes_to_on_error_in_order():
+    events = []
+    processed = run_units_concurrently([1, 2, 3], boom_on_two, lambda i, unit, result: events.append(("ok", result)),
+                                       threading.Event(), 2,
+                                       on_error=lambda i, unit, error: events.append(("error", str(error))))
+    assert processed == 3
+    assert events == [("ok", 10), ("error", "boom"), ("ok", 30)]
+
+
+def test_worker_exception_is_raised_without_on_error():
+    results = []
+    with pytest.raises(ValueError):
+        run_units_concurrently([1, 2, 3], boom_on_two, lambda i, unit, result: results.append(result),
+                               threading.Event(), 1)
+    assert results == [10]
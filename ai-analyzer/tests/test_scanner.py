@@ -0,0 +1,54 @@
+import os
+import re
+
+import pytest
+
+from scanner import glob_to_regex, is_ignored, iter_project_files, parse_ignore_file
+
+
+@pytest.mark.parametrize("pattern, path, matched", [
+    ("*.log", "app.log", True),
+    ("*.log", "logs/app.log", False),         # * 는 폴더 구분자를 넘지 않음
+    ("**/gen", "a/b/gen", True),
+    ("build/**", "build/x/y.java", True),
+    ("?.jsp", "a.jsp", True),
+    ("[]]x", "]x", True),                      # 맨 앞의 ] 는 문자 그대로
+    ("[!a]b", "cb", True),
+    ("[!a]b", "ab", False),
+    ("x[!a]", "x/", False),                    # 부정 집합도 / 는 맞추지 않음
+    ("[[:digit:]]*", "3rd", True),
+    ("[[:digit:]]*", "a3", False),
+    ("a\\*", "a*", True),
+    ("a\\*", "ab", False),
+    ("[abc", "[abc", True),                    # 닫히지 않은 [ 는 문자 그대로
+])
+def test_glob_to_regex(pattern, path, matched):
+    assert bool(glob_to_regex(pattern).fullmatch(path)) is matched
+
+
+def test_glob_that_re_cannot_compile_raises_re_error():
+    with pytest.raises(re.error):
+        glob_to_regex("[z-a]")
+    with pytest.raises(re.error):
+        glob_to_regex("[[:nope:]]")
+
+
+def test_invalid_ignore_rules_are_skipped(tmp_path):
+    ignore = tmp_path / ".gitignore"
+    ignore.write_text("# 주석\n[z-a]\n*.log\n!keep.log\n/target/\ndocs/*.md\n", encoding="utf-8")
+    rules = parse_ignore_file(str(ignore), "")
+    assert len(rules) == 4
+    assert is_ignored(rules, "a/app.log", False)
+    assert not is_ignored(rules, "a/keep.log", False)          # 마지막 규칙이 이김
+    assert is_ignored(rules, "target", True)
+    assert not is_ignored(rules, "target", False)              # 끝의 / 는 폴더 전용
+    assert is_ignored(rules, "docs/a.md", False)
+    assert not is_ignored(rules, "src/docs/a.md", False)       # / 가 있으면 기준 폴더에 고정
+
+
+def test_scan_survives_a_bad_gitignore_line(tmp_path):
+    (tmp_path / ".gitignore").write_text("[z-a]\nOld*.java\n", encoding="utf-8")
+    for name in ("UserService.java", "OldService.java"):
+        (tmp_path / name).write_text("class A {}", encoding="utf-8")
+    files = sorted(os.path.basename(p) for p in iter_project_files(str(tmp_path), (".java",)))
+    assert files == ["UserService.java"]
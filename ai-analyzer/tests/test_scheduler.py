@@ -0,0 +1,22 @@
+import os
+
+from scheduler import plan_jobs, read_targets
+
+
+def test_targets_file_lines_are_resolved_next_to_the_file(tmp_path):
+    listing = tmp_path / "repos.txt"
+    listing.write_text("# 주석\n\nshop-api\n", encoding="utf-8")
+    assert read_targets([str(listing), "other"]) == [os.path.join(str(tmp_path), "shop-api"), "other"]
+
+
+def test_each_repo_gets_its_own_report_and_cache_path(tmp_path):
+    repos = [tmp_path / "a" / "shop", tmp_path / "b" / "shop"]
+    for repo in repos:
+        repo.mkdir(parents=True)
+        (repo / "UserService.java").write_text("class UserService {}", encoding="utf-8")
+    jobs = plan_jobs([str(repo) for repo in repos], "out")
+    assert sorted(job["name"] for job in jobs) == ["shop", "shop-2"]
+    assert len({job["report_path"] for job in jobs}) == 2
+    cache_paths = {job["cache_path"] for job in jobs}
+    assert cache_paths == {os.path.join("out", ".analysis_cache", "shop.sqlite3"),
+                           os.path.join("out", ".analysis_cache", "shop-2.sqlite3")}
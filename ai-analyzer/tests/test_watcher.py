@@ -0,0 +1,22 @@
+from watcher import apply_changes
+
+
+def test_apply_changes_maps_saved_deleted_and_new_files_to_units(tmp_path):
+    files = {name: tmp_path / name for name in ("UserController.java", "UserService.java", "Order.java", "PayService.java")}
+    for path in files.values():
+        path.write_text("class X {}")
+    user, service, order, pay = (str(files[name]) for name in files)
+    units = {"User": [user, service], "Order": [order]}
+    files["UserService.java"].unlink()
+
+    touched = apply_changes(units, {user, service, pay}, rescan=lambda: [user, order, pay])
+    assert touched == {"User", "Pay"}
+    assert units == {"User": [user], "Order": [order], "Pay": [pay]}
+
+
+def test_apply_changes_skips_new_files_the_scanner_ignores(tmp_path):
+    ignored = tmp_path / "Generated.java"
+    ignored.write_text("class G {}")
+    units = {}
+    assert apply_changes(units, {str(ignored)}, rescan=lambda: []) == set()
+    assert units == {}
@@ -0,0 +1,205 @@
+import os
+import time
+import queue
+import threading
+
+from engine import (DEFAULT_EXTENSIONS, FOLDER_REPORT_PATH, EngineError, find_project_files, group_files_by_feature,
+                    make_unit_lookup, run_folder_analysis)
+from incremental import normalize_target_dirs
+from metrics import RunMetrics
+from scanner import load_scanner_config
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 가 없으면 주기적으로 파일 목록을 비교(polling)
+    Observer = None
+
+# --- 감시 모드: 저장할 때마다 바뀐 파일이 속한 기능 유닛만 백그라운드에서 다시 분석해 리포트의 그 섹션만 교체 ---
+# 예) python main.py ./src --watch    (Ctrl+C 로 종료)
+DEFAULT_DEBOUNCE_MS = 1500      # 마지막 저장 뒤 이만큼 조용하면 분석 시작 (연속 저장/포매터/IDE 자동 저장을 한 번으로 묶음)
+DEFAULT_POLL_SECONDS = 1.0      # polling 감시 간격
+
+
+def load_watch_config():
+    """환경 변수에서 감시 설정을 읽어옵니다. ANALYZER_WATCH_POLLING=1 이면 watchdog 가 있어도 polling 을 씁니다."""
+    try:
+        debounce = max(0, int(os.getenv("ANALYZER_WATCH_DEBOUNCE_MS", DEFAULT_DEBOUNCE_MS))) / 1000
+    except ValueError:
+        debounce = DEFAULT_DEBOUNCE_MS / 1000
+    try:
+        poll_seconds = max(0.1, float(os.getenv("ANALYZER_WATCH_POLL_SECONDS", DEFAULT_POLL_SECONDS)))
+    except ValueError:
+        poll_seconds = DEFAULT_POLL_SECONDS
+    return {
+        "debounce": debounce,
+        "poll_seconds": poll_seconds,
+        "polling": os.getenv("ANALYZER_WATCH_POLLING", "0").strip().lower() in ("1", "true", "yes", "on"),
+    }
+
+
+# --- 1. 파일 변경 감지 (둘 다 바뀐 파일 경로를 changes 큐에 넣음) ---
+class PollingWatcher:
+    """poll_seconds 마다 분석 대상 파일의 (크기, mtime) 을 비교해 새로 생기거나 바뀌거나 지워진 파일을 알립니다."""
+
+    name = "polling"
+
+    def __init__(self, target_dirs, extensions, changes, poll_seconds=DEFAULT_POLL_SECONDS):
+        self.target_dirs = target_dirs
+        self.extensions = extensions
+        self.changes = changes
+        self.poll_seconds = poll_seconds
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def snapshot(self):
+        state = {}
+        for target_dir in self.target_dirs:
+            for file_path in find_project_files(target_dir, self.extensions):
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                state[file_path] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def run(self, previous):
+        while not self.stopped.wait(self.poll_seconds):
+            current = self.snapshot()
+            for file_path in set(previous) | set(current):
+                if previous.get(file_path) != current.get(file_path):
+                    self.changes.put(file_path)
+            previous = current
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, args=(self.snapshot(),), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class EventWatcher:
+    """watchdog(inotify / ReadDirectoryChangesW / FSEvents)로 파일 시스템 이벤트를 받아, 분석 대상 확장자만 알립니다."""
+
+    name = "events"
+
+    def __init__(self, target_dirs, extensions, changes):
+        self.observer = Observer()
+        prune_dirs = load_scanner_config()["prune_dirs"]
+        extensions = tuple(extensions)
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    # 빌드 폴더·.analysis_cache 등은 스캐너와 같은 기준으로 무시
+                    if path and path.endswith(extensions) and not prune_dirs.intersection(path.split(os.sep)):
+                        changes.put(path)
+
+        for target_dir in target_dirs:
+            self.observer.schedule(Handler(), target_dir, recursive=True)
+
+    def start(self):
+        self.observer.start()
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join(timeout=5)
+
+
+def open_watcher(target_dirs, extensions, changes, config):
+    if Observer is not None and not config["polling"]:
+        try:
+            return EventWatcher(target_dirs, extensions, changes)
+        except OSError:
+            pass    # inotify 감시 수 한도 초과 등 - polling 으로
+    return PollingWatcher(target_dirs, extensions, changes, config["poll_seconds"])
+
+
+# --- 2. 감시 루프 ---
+def wait_for_changes(changes, stop_event, debounce):
+    """첫 변경이 들어온 뒤 debounce 초 동안 더 들어오지 않을 때까지 모아, 바뀐 파일 경로 집합을 돌려줍니다. 중지되면 None."""
+    pending = set()
+    last_change = None
+    while not stop_event.is_set():
+        try:
+            pending.add(changes.get(timeout=0.2))
+            last_change = time.monotonic()
+        except queue.Empty:
+            if pending and time.monotonic() - last_change >= debounce:
+                return pending
+    return None
+
+
+def apply_changes(units, changed, rescan):
+    """바뀐 파일 경로를 감시 중인 유닛({유닛명: 파일 목록})에 반영하고, 다시 분석할 유닛 이름 집합을 돌려줍니다.
+
+    저장된 파일은 그 파일이 속한 유닛을, 지워진 파일은 유닛에서 빼고 그 유닛을 고릅니다. 새 파일은 rescan() 결과에
+    있을 때만(ignore 규칙 등 스캐너 기준) 파일명 규칙으로 유닛에 넣습니다.
+    """
+    lookup = make_unit_lookup(units)
+    known = {file_path for files in units.values() for file_path in files}
+    removed = {file_path for file_path in changed if file_path in known and not os.path.exists(file_path)}
+    added = {file_path for file_path in changed if file_path not in known and os.path.isfile(file_path)}
+    if added:
+        added &= set(rescan())
+    names = set(lookup(sorted(changed & known)))
+    for name, files in lookup(sorted(removed)).items():
+        units[name] = [file_path for file_path in units[name] if file_path not in removed]
+        if not units[name]:
+            del units[name]
+    for name, files in lookup(sorted(added)).items():
+        units.setdefault(name, []).extend(files)
+        names.add(name)
+    return names
+
+
+def watch_folder(target_dirs, log, stop_event, extensions=None, report_path=FOLDER_REPORT_PATH, on_cycle=None,
+                 **options):
+    """stop_event 가 설정될 때까지 폴더를 감시하며, 파일이 저장될 때마다 증분 분석으로 그 기능 유닛만 다시 분석합니다.
+
+    처음에 한 번 스캔·그룹핑하고 증분 분석으로 리포트를 최신 상태로 맞춘 뒤 감시를 시작합니다(이전 실행 기록이 없으면
+    전체 분석). 그 뒤로는 바뀐 파일을 그 유닛 목록에 반영해(apply_changes) 해당 유닛만 분석하며, 전체를 다시 스캔하거나
+    그룹핑하지 않습니다. 새 파일은 파일명 규칙으로 유닛에 들어가므로, 묶음 구조를 다시 맞추려면 감시를 다시 시작합니다.
+    분석 중에 저장된 파일은 모아 두었다가 끝나면 이어서 분석합니다. on_cycle(metrics) 는 분석을 시작할 때마다 불리며,
+    options 는 run_folder_analysis 에 그대로 넘깁니다.
+    """
+    target_dirs = normalize_target_dirs(target_dirs)
+    extensions = extensions or DEFAULT_EXTENSIONS
+    config = load_watch_config()
+    changes = queue.Queue()
+    watcher = open_watcher(target_dirs, extensions, changes, config)
+    watcher.start()
+    log(f"👀 감시 모드({watcher.name}): 파일을 저장하면 {config['debounce']:g}초 뒤 그 기능 유닛만 다시 분석합니다.")
+
+    def scan():
+        return [file_path for target_dir in target_dirs for file_path in find_project_files(target_dir, extensions)]
+
+    def analyze(units, touched_units=None):
+        metrics = RunMetrics()
+        if on_cycle:
+            on_cycle(metrics)
+        try:
+            run_folder_analysis(target_dirs, log, stop_event, extensions=extensions, report_path=report_path,
+                                incremental=True, metrics=metrics, units=units, touched_units=touched_units, **options)
+        except EngineError as e:
+            log(f"오류: {e}")
+
+    try:
+        log("파일을 스캔하고 기능 단위로 그룹핑합니다...")
+        units = group_files_by_feature(scan())
+        analyze(units)
+        while not stop_event.is_set():
+            changed = wait_for_changes(changes, stop_event, config["debounce"])
+            if not changed:
+                break
+            names = sorted(os.path.basename(path) for path in changed)
+            log(f"\n✏️ 변경 감지: {', '.join(names[:5])}{f' 외 {len(names) - 5}개' if len(names) > 5 else ''}")
+            touched_units = apply_changes(units, changed, scan)
+            if touched_units:
+                analyze(units, touched_units)
+    finally:
+        watcher.stop()
+    log("감시를 종료했습니다.")